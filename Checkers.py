@@ -1,16 +1,35 @@
 import arcade
+from arcade.gl import BufferDescription
 import math
+import numpy as np
 import random
 import time
-from typing import Optional, List
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, List, Tuple
+
+from PIL import Image, ImageDraw
+
+from checkers_core import BOARD_SIZE, NUM_SQUARES, AIPlayer, Game, Position, square_coords, square_index
+from checkers_core.book import OpeningBook
+from checkers_core.game import EVENT_GAME_OVER, EVENT_POSITION, EVENT_SCORE, EVENT_TURN
+from checkers_core.movegen import is_promotion, move_path, move_to
+from checkers_core.tablebase import Tablebase
+from checkers_core.worker import SearchWorker
 
 # Константы
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 800
 SCREEN_TITLE = "Шашки"
 SQUARE_SIZE = 100
-BOARD_SIZE = 8
 PIECE_RADIUS = 40
+PIECE_TEXTURE_PADDING = 4  # Запас под контур вокруг шашки в текстуре
+TEXTURE_SUPERSAMPLING = 4  # Во сколько раз крупнее рисуются текстуры перед уменьшением
+AI_TIME_LIMIT_MS = 1000  # Время на ход компьютера
+TABLEBASE_DIR = "tablebases"  # Таблицы эндшпиля (python -m checkers_core.tablebase)
+BOOK_PATH = "opening.book"  # Дебютная книга (python -m checkers_core.book)
+HISTORY_SLIDER_Y = 20  # Ползунок истории партии внизу экрана
+HISTORY_SLIDER_HIT = 12  # Полувысота области нажатия на ползунок
 
 # Цвета
 BLACK = arcade.color.BLACK
@@ -30,128 +49,335 @@ LIGHT_BLUE = arcade.color.LIGHT_BLUE
 HIGHLIGHT = arcade.color.YELLOW  # Полупрозрачный желтый
 
 
-class Particle:
-    """Класс для частиц анимации"""
+PARTICLE_GRAVITY = 0.1  # Ускорение вниз за кадр
+PARTICLE_DAMPING = 0.98  # Замедление скорости за кадр
+PARTICLE_CAPACITY = 8192  # Наибольшее число одновременно живых частиц в системе
 
-    def __init__(self, x, y, color, size=5, velocity_x=0, velocity_y=0, lifetime=1.0):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = size
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-        self.gravity = 0.1
-        self.fade = True
+# Вершина на частицу: центр, радиус и цвет (RGBA байтами)
+PARTICLE_VERTEX = np.dtype([("position", np.float32, 2), ("size", np.float32), ("color", np.uint8, 4)])
 
-    def update(self, delta_time):
-        self.lifetime -= delta_time
-        if self.lifetime <= 0:
-            return False
+PARTICLE_VERTEX_SHADER = """
+#version 330
 
-        # Применяем гравитацию
-        self.velocity_y -= self.gravity
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
 
-        # Обновляем позицию
-        self.x += self.velocity_x
-        self.y += self.velocity_y
+uniform float u_pixel_ratio;
 
-        # Немного замедляемся
-        self.velocity_x *= 0.98
-        self.velocity_y *= 0.98
+in vec2 in_position;
+in float in_size;
+in vec4 in_color;
 
-        return True
+out vec4 v_color;
 
-    def draw(self):
-        alpha = int(255 * (self.lifetime / self.max_lifetime)) if self.fade else 255
-        color_with_alpha = (self.color[0], self.color[1], self.color[2], alpha)
-        arcade.draw_circle_filled(self.x, self.y, self.size, color_with_alpha)
+void main() {
+    gl_Position = window.projection * window.view * vec4(in_position, 0.0, 1.0);
+    gl_PointSize = in_size * 2.0 * u_pixel_ratio;
+    v_color = in_color;
+}
+"""
 
+PARTICLE_FRAGMENT_SHADER = """
+#version 330
 
-class ParticleSystem:
-    """Система управления частицами"""
+in vec4 v_color;
+out vec4 out_color;
+
+void main() {
+    // Квадратная точка обрезается до круга
+    vec2 offset = gl_PointCoord - vec2(0.5);
+    if (dot(offset, offset) > 0.25) {
+        discard;
+    }
+    out_color = v_color;
+}
+"""
+
+
+# Вершина клетки доски: координаты, базовый цвет и фаза мерцания
+BOARD_VERTEX = np.dtype([("position", np.float32, 2), ("color", np.uint8, 4), ("phase", np.float32)])
+
+BOARD_VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+uniform float u_time;
+
+in vec2 in_position;
+in vec4 in_color;
+in float in_phase;
+
+out vec4 v_color;
+
+void main() {
+    gl_Position = window.projection * window.view * vec4(in_position, 0.0, 1.0);
+    // Легкое мерцание клеток со сдвигом фазы по диагоналям
+    float flicker = sin(u_time * 0.5 + in_phase) * 0.05 + 0.95;
+    v_color = vec4(in_color.rgb * flicker, in_color.a);
+}
+"""
+
+BOARD_FRAGMENT_SHADER = """
+#version 330
+
+in vec4 v_color;
+out vec4 out_color;
+
+void main() {
+    out_color = v_color;
+}
+"""
+
+class FrameStats:
+    """Счетчики кадра: время кадра, вызовы отрисовки частиц, обновления HUD
+    и раскладки текста (F3 - показать)"""
 
     def __init__(self):
-        self.particles = []
+        self.visible = False
+        self.frame_time = 0.0
+        self.draw_calls = 0
+        self.particles = 0
+        self.evicted = 0
+        # Обновления HUD и раскладки текста за цикл кадра (on_update + on_draw)
+        self.hud_updates = 0
+        self.text_layouts = 0
+        self.last_hud_updates = 0
+        self.last_text_layouts = 0
+        self._frame_start = time.perf_counter()
+        self._text = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self.frame_time = now - self._frame_start
+        self._frame_start = now
+        self.draw_calls = 0
+        self.particles = 0
+        self.evicted = 0
+        # События приходят из on_update до отрисовки, поэтому показываем итог прошлого цикла
+        self.last_hud_updates, self.hud_updates = self.hud_updates, 0
+        self.last_text_layouts, self.text_layouts = self.text_layouts, 0
+
+    def count_draw_call(self, particle_system):
+        self.draw_calls += 1
+        self.particles += particle_system.live
+        self.evicted += particle_system.evicted
+
+    def draw(self):
+        if not self.visible:
+            return
+        if self._text is None:
+            self._text = arcade.Text("", 10, 10, LIGHT_GRAY, 12)
+        self._text.text = (f"Кадр: {self.frame_time * 1000:.1f} мс   частиц: {self.particles} "
+                           f"(вытеснено {self.evicted})   вызовов отрисовки частиц: {self.draw_calls}   "
+                           f"обновлений HUD: {self.last_hud_updates}   "
+                           f"раскладок текста: {self.last_text_layouts}")
+        self._text.draw()
+
+
+frame_stats = FrameStats()
+
+
+class TextCache:
+    """Готовые arcade.Text по строке и размеру шрифта.
+
+    Раскладка глифов делается один раз на ключ; анимация меняет только
+    позицию и цвет уже разложенного текста. Редко используемые строки
+    вытесняются, чтобы кэш не рос при смене счета.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.layouts = 0  # Сколько раз текст раскладывался заново
+        self._texts = OrderedDict()
+
+    def get(self, text, x, y, color, font_size, **kwargs) -> arcade.Text:
+        key = (text, font_size, tuple(sorted(kwargs.items())))
+        label = self._texts.get(key)
+        if label is None:
+            label = arcade.Text(text, x, y, color, font_size, **kwargs)
+            self.layouts += 1
+            frame_stats.text_layouts += 1
+            self._texts[key] = label
+            if len(self._texts) > self.max_size:
+                self._texts.popitem(last=False)
+        else:
+            self._texts.move_to_end(key)
+            label.x = x
+            label.y = y
+            label.color = color
+        return label
+
+    def draw(self, text, x, y, color, font_size, **kwargs):
+        self.get(text, x, y, color, font_size, **kwargs).draw()
+
+
+text_cache = TextCache()
+
+
+class ParticleSystem:
+    """Система частиц: пул фиксированной емкости в массивах NumPy (по столбцу на свойство).
+
+    Живые частицы занимают начало массивов в порядке появления, свободные
+    слоты идут следом и переиспользуются новыми частицами. При заполненном
+    пуле вытесняются самые старые частицы, поэтому память не растет.
+    """
+
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        # Счетчики за все время: создано и вытеснено до конца жизни
+        self.spawned = 0
+        self.evicted = 0
+        self.rng = np.random.default_rng()
+
+        self.position = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.max_lifetime = np.ones(capacity, dtype=np.float32)
+        self._arrays = (self.position, self.velocity, self.size, self.color,
+                        self.lifetime, self.max_lifetime)
+        self._vertices = np.zeros(capacity, dtype=PARTICLE_VERTEX)
+
+        # Объекты OpenGL создаются при первой отрисовке, когда окно уже есть
+        self._program = None
+        self._buffer = None
+        self._geometry = None
+
+    @property
+    def live(self):
+        return self.count
+
+    def _evict(self, count):
+        """Удаление count самых старых частиц со сдвигом остальных в начало"""
+        for array in self._arrays:
+            array[:self.count - count] = array[count:self.count]
+        self.count -= count
+        self.evicted += count
+
+    def emit(self, x, y, color, count, speed, size, lifetime):
+        """Создание count частиц в точках (x, y) со случайным направлением полета;
+        x и y - число или массив длины count, speed/size/lifetime - диапазоны (min, max)"""
+        self.spawned += count
+        if count > self.capacity:
+            # Частицы сверх емкости вытеснились бы в этом же вызове
+            dropped = count - self.capacity
+            self.evicted += dropped
+            x = np.broadcast_to(x, count)[dropped:]
+            y = np.broadcast_to(y, count)[dropped:]
+            count = self.capacity
+        overflow = self.count + count - self.capacity
+        if overflow > 0:
+            self._evict(overflow)
+
+        start = self.count
+        end = start + count
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        velocity = self.rng.uniform(speed[0], speed[1], count)
+        self.position[start:end, 0] = x
+        self.position[start:end, 1] = y
+        self.velocity[start:end, 0] = np.cos(angle) * velocity
+        self.velocity[start:end, 1] = np.sin(angle) * velocity
+        self.size[start:end] = self.rng.uniform(size[0], size[1], count)
+        self.color[start:end] = color[:3]
+        self.lifetime[start:end] = self.rng.uniform(lifetime[0], lifetime[1], count)
+        self.max_lifetime[start:end] = self.lifetime[start:end]
+        self.count = end
 
     def create_capture_particles(self, x, y, is_white):
         """Создание частиц при взятии шашки"""
         color = WHITE if is_white else RED
-        for _ in range(15):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 6)
-            velocity_x = math.cos(angle) * speed
-            velocity_y = math.sin(angle) * speed
-            size = random.uniform(3, 8)
-            lifetime = random.uniform(0.5, 1.5)
-            particle = Particle(x, y, color, size, velocity_x, velocity_y, lifetime)
-            self.particles.append(particle)
+        self.emit(x, y, color, 15, speed=(2, 6), size=(3, 8), lifetime=(0.5, 1.5))
 
     def create_move_particles(self, from_x, from_y, to_x, to_y, is_white):
         """Создание частиц при перемещении шашки"""
         color = WHITE if is_white else RED
         steps = 10
-        for i in range(steps):
-            t = i / steps
-            px = from_x + (to_x - from_x) * t
-            py = from_y + (to_y - from_y) * t
-
-            for _ in range(3):
-                angle = random.uniform(0, 2 * math.pi)
-                speed = random.uniform(0.5, 2)
-                velocity_x = math.cos(angle) * speed
-                velocity_y = math.sin(angle) * speed
-                size = random.uniform(2, 4)
-                lifetime = random.uniform(0.3, 0.8)
-                particle = Particle(px, py, color, size, velocity_x, velocity_y, lifetime)
-                self.particles.append(particle)
+        # По 3 частицы в каждой из 10 точек на линии хода
+        t = np.repeat(np.arange(steps) / steps, 3)
+        self.emit(from_x + (to_x - from_x) * t, from_y + (to_y - from_y) * t, color, len(t),
+                  speed=(0.5, 2), size=(2, 4), lifetime=(0.3, 0.8))
 
     def create_king_particles(self, x, y, is_white):
         """Создание частиц при превращении в дамку"""
         crown_color = GOLD if is_white else YELLOW
-        for _ in range(25):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(1, 4)
-            velocity_x = math.cos(angle) * speed
-            velocity_y = math.sin(angle) * speed
-            size = random.uniform(2, 6)
-            lifetime = random.uniform(0.8, 1.5)
-            particle = Particle(x, y, crown_color, size, velocity_x, velocity_y, lifetime)
-            self.particles.append(particle)
+        self.emit(x, y, crown_color, 25, speed=(1, 4), size=(2, 6), lifetime=(0.8, 1.5))
 
     def create_button_press_particles(self, x, y, color):
         """Создание частиц при нажатии кнопки калькулятора"""
-        for _ in range(10):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(1, 3)
-            velocity_x = math.cos(angle) * speed
-            velocity_y = math.sin(angle) * speed
-            size = random.uniform(2, 4)
-            lifetime = random.uniform(0.5, 1.0)
-            particle = Particle(x, y, color, size, velocity_x, velocity_y, lifetime)
-            self.particles.append(particle)
+        self.emit(x, y, color, 10, speed=(1, 3), size=(2, 4), lifetime=(0.5, 1.0))
 
     def create_win_particles(self, x, y, color):
         """Создание частиц при победе"""
-        for _ in range(50):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(3, 8)
-            velocity_x = math.cos(angle) * speed
-            velocity_y = math.sin(angle) * speed
-            size = random.uniform(4, 10)
-            lifetime = random.uniform(1.0, 2.0)
-            particle = Particle(x, y, color, size, velocity_x, velocity_y, lifetime)
-            self.particles.append(particle)
+        self.emit(x, y, color, 50, speed=(3, 8), size=(4, 10), lifetime=(1.0, 2.0))
 
     def update(self, delta_time):
-        """Обновление всех частиц"""
-        self.particles = [p for p in self.particles if p.update(delta_time)]
+        """Обновление всех частиц одной векторной операцией на свойство"""
+        n = self.count
+        if n == 0:
+            return
+        lifetime = self.lifetime[:n]
+        lifetime -= delta_time
+        velocity = self.velocity[:n]
+        velocity[:, 1] -= PARTICLE_GRAVITY
+        self.position[:n] += velocity
+        velocity *= PARTICLE_DAMPING
+
+        # Сжатие: живые частицы сдвигаются в начало с сохранением порядка появления
+        alive = lifetime > 0
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count < n:
+            for array in self._arrays:
+                array[:alive_count] = array[:n][alive]
+            self.count = alive_count
+
+    def alpha(self):
+        """Прозрачность живых частиц по оставшемуся времени жизни"""
+        n = self.count
+        return (255 * self.lifetime[:n] / self.max_lifetime[:n]).astype(np.uint8)
+
+    def vertices(self):
+        """Вершины живых частиц в формате буфера видеокарты"""
+        n = self.count
+        data = self._vertices[:n]
+        data["position"] = self.position[:n]
+        data["size"] = self.size[:n]
+        data["color"][:, :3] = self.color[:n]
+        data["color"][:, 3] = self.alpha()
+        return data
+
+    def _setup_geometry(self, ctx):
+        """Программа и буфер вершин на всю емкость пула"""
+        self._program = ctx.program(vertex_shader=PARTICLE_VERTEX_SHADER,
+                                    fragment_shader=PARTICLE_FRAGMENT_SHADER)
+        self._buffer = ctx.buffer(reserve=self.capacity * PARTICLE_VERTEX.itemsize)
+        self._geometry = ctx.geometry(
+            [BufferDescription(self._buffer, "2f 1f 4f1", ["in_position", "in_size", "in_color"])],
+            mode=ctx.POINTS,
+        )
 
     def draw(self):
-        """Отрисовка всех частиц"""
-        for particle in self.particles:
-            particle.draw()
+        """Отрисовка всех частиц одним вызовом: точки с круглой маской в шейдере"""
+        n = self.count
+        if n == 0:
+            return
+        window = arcade.get_window()
+        ctx = window.ctx
+        if self._geometry is None:
+            self._setup_geometry(ctx)
+
+        self._buffer.write(self.vertices())
+        self._program["u_pixel_ratio"] = window.get_pixel_ratio()
+        with ctx.enabled(ctx.BLEND, ctx.PROGRAM_POINT_SIZE):
+            self._geometry.render(self._program, vertices=n)
+        frame_stats.count_draw_call(self)
 
 
 class Calculator:
@@ -250,7 +476,7 @@ class Calculator:
         # Текст на дисплее с мерцанием
         display_text = self.display if len(self.display) <= 20 else "..." + self.display[-17:]
         text_alpha = int(255 * (0.8 + 0.2 * math.sin(current_time * 2)))
-        arcade.draw_text(
+        text_cache.draw(
             display_text,
             self.position_x,
             (display_top + display_bottom) // 2,
@@ -289,7 +515,7 @@ class Calculator:
             )
 
             # Текст на кнопке
-            arcade.draw_text(
+            text_cache.draw(
                 button['text'],
                 button['x'],
                 button['y'] + button_offset,
@@ -317,7 +543,7 @@ class Calculator:
 
         # Инструкция с мерцанием
         blink = int(255 * (0.5 + 0.5 * math.sin(current_time * 10)))
-        arcade.draw_text(
+        text_cache.draw(
             "Нажмите K чтобы закрыть калькулятор",
             self.position_x,
             self.position_y - self.height // 2 + 30,
@@ -392,7 +618,112 @@ class Calculator:
                     '*' if button_text == '×' else '/'
 
 
+class BoardLayer:
+    """Клетки доски в одном буфере вершин: строится один раз, мерцание - в шейдере"""
+
+    def __init__(self, offset_x: int = 0, offset_y: int = 0):
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.dirty = True
+        # Объекты OpenGL создаются при первой отрисовке, когда окно уже есть
+        self._program = None
+        self._buffer = None
+        self._geometry = None
+
+    def set_offset(self, offset_x: int, offset_y: int):
+        if (offset_x, offset_y) != (self.offset_x, self.offset_y):
+            self.offset_x = offset_x
+            self.offset_y = offset_y
+            self.dirty = True
+
+    def vertices(self):
+        """Два треугольника на клетку"""
+        squares = np.arange(BOARD_SIZE * BOARD_SIZE)
+        rows, cols = np.divmod(squares, BOARD_SIZE)
+        corners = np.array([(0, 0), (1, 0), (1, 1), (0, 0), (1, 1), (0, 1)], dtype=np.float32)
+
+        data = np.empty((len(squares), len(corners)), dtype=BOARD_VERTEX)
+        origin = np.stack([cols, rows], axis=1)[:, None, :]
+        data["position"] = (origin + corners) * SQUARE_SIZE + (self.offset_x, self.offset_y)
+        light = (rows + cols) % 2 == 0
+        data["color"] = np.where(light[:, None], LIGHT_BROWN[:3] + (255,), DARK_BROWN[:3] + (255,))[:, None, :]
+        data["phase"] = ((rows + cols) * 0.5)[:, None]
+        return data.ravel()
+
+    def draw(self, current_time: float):
+        ctx = arcade.get_window().ctx
+        if self._geometry is None:
+            self._program = ctx.program(vertex_shader=BOARD_VERTEX_SHADER,
+                                        fragment_shader=BOARD_FRAGMENT_SHADER)
+            self._buffer = ctx.buffer(reserve=BOARD_SIZE * BOARD_SIZE * 6 * BOARD_VERTEX.itemsize)
+            self._geometry = ctx.geometry(
+                [BufferDescription(self._buffer, "2f 4f1 1f", ["in_position", "in_color", "in_phase"])],
+                mode=ctx.TRIANGLES,
+            )
+        if self.dirty:
+            self._buffer.write(self.vertices())
+            self.dirty = False
+
+        self._program["u_time"] = current_time
+        self._geometry.render(self._program)
+
+
+def _render_texture(name: str, paint) -> arcade.Texture:
+    """Текстура шашки из рисунка PIL; рисуем крупнее и уменьшаем для сглаживания краев"""
+    size = 2 * (PIECE_RADIUS + PIECE_TEXTURE_PADDING)
+    scale = TEXTURE_SUPERSAMPLING
+    image = Image.new("RGBA", (size * scale, size * scale), (0, 0, 0, 0))
+    paint(ImageDraw.Draw(image), size * scale / 2, scale)
+    return arcade.Texture(image.resize((size, size), Image.LANCZOS), hash=name)
+
+
+def _rgba(color) -> tuple:
+    return tuple(color[:3]) + (255,)
+
+
+@lru_cache(maxsize=None)
+def piece_body_texture(is_white: bool) -> arcade.Texture:
+    """Шашка с черным контуром"""
+    def paint(draw, center, scale):
+        radius = PIECE_RADIUS * scale
+        draw.ellipse((center - radius, center - radius, center + radius, center + radius),
+                     fill=_rgba(WHITE if is_white else RED), outline=_rgba(BLACK), width=2 * scale)
+
+    return _render_texture(f"piece-{'white' if is_white else 'red'}", paint)
+
+
+@lru_cache(maxsize=None)
+def piece_crown_texture(is_white: bool) -> arcade.Texture:
+    """Корона дамки с буквой K (буква нарисована линиями, без растеризации шрифта)"""
+    def paint(draw, center, scale):
+        radius = PIECE_RADIUS * 0.4 * scale
+        draw.ellipse((center - radius, center - radius, center + radius, center + radius),
+                     fill=_rgba(GOLD if is_white else YELLOW))
+        half = 7 * scale
+        stem = center - 4 * scale
+        width = int(2.5 * scale)
+        draw.line((stem, center - half, stem, center + half), fill=_rgba(BLACK), width=width)
+        draw.line((stem, center + 1 * scale, center + 5 * scale, center - half), fill=_rgba(BLACK), width=width)
+        draw.line((stem + 2 * scale, center - 1 * scale, center + 5 * scale, center + half),
+                  fill=_rgba(BLACK), width=width)
+
+    return _render_texture(f"crown-{'white' if is_white else 'red'}", paint)
+
+
+@lru_cache(maxsize=None)
+def selection_outline_texture() -> arcade.Texture:
+    """Желтый контур выбранной шашки; мигает прозрачностью поверх черного"""
+    def paint(draw, center, scale):
+        radius = PIECE_RADIUS * scale + scale
+        draw.ellipse((center - radius, center - radius, center + radius, center + radius),
+                     outline=_rgba(YELLOW), width=3 * scale)
+
+    return _render_texture("piece-selection", paint)
+
+
 class CheckerPiece:
+    """Шашка на доске; рисуется спрайтами из общего SpriteList доски"""
+
     def __init__(self, row: int, col: int, is_white: bool, board_offset_x: int = 0, board_offset_y: int = 0):
         self.row = row
         self.col = col
@@ -408,6 +739,12 @@ class CheckerPiece:
         self.selected_time = 0
         self.start_time = time.time()
 
+        # Тело шашки, корона дамки и контур выделения
+        self.body_sprite = arcade.Sprite(piece_body_texture(is_white))
+        self.crown_sprite = arcade.Sprite(piece_crown_texture(is_white))
+        self.outline_sprite = arcade.Sprite(selection_outline_texture())
+        self.sprites = (self.body_sprite, self.crown_sprite, self.outline_sprite)
+
     def update_position(self):
         self.x = self.col * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_x
         self.y = self.row * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_y
@@ -426,42 +763,33 @@ class CheckerPiece:
         if self.selected_time > 0:
             self.selected_time -= delta_time
 
-    def draw(self):
-        # Плавная анимация подпрыгивания на основе синуса
-        bounce_offset = math.sin(self.bounce_time) * self.bounce_amplitude
+    def add_to(self, sprite_list: arcade.SpriteList):
+        for sprite in self.sprites:
+            sprite_list.append(sprite)
 
-        color = WHITE if self.is_white else RED
+    def remove_sprites(self):
+        for sprite in self.sprites:
+            sprite.remove_from_sprite_lists()
 
-        # Рисуем шашку
-        arcade.draw_circle_filled(self.x, self.y + bounce_offset, PIECE_RADIUS, color)
+    def update_sprites(self):
+        """Анимация как преобразования спрайтов: сдвиг, масштаб и прозрачность"""
+        # Плавная анимация подпрыгивания на основе синуса
+        y = self.y + math.sin(self.bounce_time) * self.bounce_amplitude
+        for sprite in self.sprites:
+            sprite.center_x = self.x
+            sprite.center_y = y
 
+        self.crown_sprite.visible = self.is_king
         if self.is_king:
-            crown_color = GOLD if self.is_white else YELLOW
-            # Анимация короны
+            # Пульсация короны
             current_time = time.time() - self.start_time
-            crown_scale = 1 + 0.1 * math.sin(current_time * 2)
-            arcade.draw_circle_filled(self.x, self.y + bounce_offset, PIECE_RADIUS * 0.4 * crown_scale, crown_color)
-
-            # Рисуем букву K для дамки с пульсацией
-            k_scale = 1 + 0.1 * math.sin(current_time * 1.5)
-            arcade.draw_text("K", self.x, self.y + bounce_offset, BLACK, int(20 * k_scale),
-                             align="center", anchor_x="center", anchor_y="center")
-
-        # Контур шашки с анимацией выделения
-        outline_width = 2
-        outline_color = BLACK
+            self.crown_sprite.scale = 1 + 0.1 * math.sin(current_time * 2)
 
+        # Пульсирующий контур для выбранной шашки
+        self.outline_sprite.visible = self.selected_time > 0
         if self.selected_time > 0:
-            # Пульсирующий контур для выбранной шашки
             pulse = math.sin(self.selected_time * 10) * 0.5 + 0.5
-            outline_color = (
-                int(YELLOW[0] * pulse + BLACK[0] * (1 - pulse)),
-                int(YELLOW[1] * pulse + BLACK[1] * (1 - pulse)),
-                int(YELLOW[2] * pulse + BLACK[2] * (1 - pulse))
-            )
-            outline_width = 3
-
-        arcade.draw_circle_outline(self.x, self.y + bounce_offset, PIECE_RADIUS, outline_color, outline_width)
+            self.outline_sprite.alpha = int(255 * pulse)
 
     def start_selection_animation(self):
         """Запуск анимации выделения"""
@@ -469,20 +797,23 @@ class CheckerPiece:
 
 
 class GameBoard:
-    def __init__(self, board_offset_x: int = 0, board_offset_y: int = 0):
+    """Отрисовка и анимация партии; правила - в checkers_core.Game"""
+
+    def __init__(self, board_offset_x: int = 0, board_offset_y: int = 0,
+                 tablebase: Optional[Tablebase] = None):
+        self.game = Game(tablebase=tablebase)
         self.board = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
         self.selected_piece = None
         self.valid_moves = []
-        self.current_player = True  # True - белые, False - черные
-        self.white_pieces = 12
-        self.black_pieces = 12
-        self.white_score = 0
-        self.black_score = 0
-        self.game_over = False
-        self.winner = None
+        # Цепочки взятий с общим началом и концом: (ход, путь) до выбора игрока
+        self.capture_choices: List[Tuple[int, List[int]]] = []
+        self.choice_ply = 0
         self.board_offset_x = board_offset_x
         self.board_offset_y = board_offset_y
+        self.board_layer = BoardLayer(board_offset_x, board_offset_y)
+        self.piece_sprites = arcade.SpriteList()
         self.setup_pieces()
+        self.game.subscribe(EVENT_POSITION, self.on_position_changed)
 
         # Анимационные параметры
         self.last_move_from = None
@@ -492,20 +823,92 @@ class GameBoard:
         self.win_animation_time = 0
         self.start_time = time.time()
 
+    @property
+    def position(self) -> Position:
+        return self.game.position
+
+    @property
+    def current_player(self) -> bool:
+        """True - ходят белые, False - черные"""
+        return self.game.current_player
+
+    @property
+    def white_pieces(self) -> int:
+        return self.game.white_pieces
+
+    @property
+    def black_pieces(self) -> int:
+        return self.game.black_pieces
+
+    @property
+    def white_score(self) -> int:
+        return self.game.white_score
+
+    @property
+    def black_score(self) -> int:
+        return self.game.black_score
+
+    @property
+    def game_over(self) -> bool:
+        return self.game.game_over
+
+    @property
+    def winner(self) -> Optional[str]:
+        if self.game.winner is None:
+            return "Ничья" if self.game.game_over else None
+        return "Белые" if self.game.winner else "Черные"
+
+    def subscribe(self, event: str, callback):
+        """Подписка на события партии (счет, очередь хода, конец игры)"""
+        self.game.subscribe(event, callback)
+
     def setup_pieces(self):
+        # Шашки расставляются по битборду позиции (только черные клетки)
+        for index in range(NUM_SQUARES):
+            piece = self.position.piece_at(index)
+            if piece:
+                row, col = square_coords(index)
+                is_white, is_king = piece
+                self.board[row][col] = CheckerPiece(row, col, is_white,
+                                                    self.board_offset_x, self.board_offset_y)
+                self.board[row][col].is_king = is_king
+                self.board[row][col].add_to(self.piece_sprites)
+
+    def on_position_changed(self, game: Game):
+        """Переход по истории: шашки расставляются заново по новой позиции"""
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
-                if (row + col) % 2 == 1:  # Только на черных клетках
-                    if row < 3:
-                        self.board[row][col] = CheckerPiece(row, col, False,
-                                                            self.board_offset_x, self.board_offset_y)
-                    elif row > 4:
-                        self.board[row][col] = CheckerPiece(row, col, True,
-                                                            self.board_offset_x, self.board_offset_y)
+                piece = self.board[row][col]
+                if piece:
+                    piece.remove_sprites()
+                    self.board[row][col] = None
+        self.setup_pieces()
+        self.selected_piece = None
+        self.valid_moves = []
+        self.capture_choices = []
+        self.last_move_from = None
+        self.last_move_to = None
+        self.move_animation_time = 0
+        self.win_animation_active = False
+        self.win_animation_time = 0
+
+    def seek(self, ply: int):
+        """Переход к позиции после ply полуходов партии"""
+        self.game.seek(ply)
+        self.check_game_over()
+
+    def undo(self):
+        if self.game.history.can_undo:
+            self.seek(self.game.history.ply - 1)
+
+    def redo(self):
+        if self.game.history.can_redo:
+            self.seek(self.game.history.ply + 1)
 
     def update_offset(self, offset_x: int, offset_y: int):
         self.board_offset_x = offset_x
         self.board_offset_y = offset_y
+        self.board_layer.set_offset(offset_x, offset_y)
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
                 piece = self.board[row][col]
@@ -530,31 +933,9 @@ class GameBoard:
                     piece.update_animation(delta_time)
 
     def draw(self):
-        # Анимация доски (легкое мерцание клеток)
+        # Клетки доски с легким мерцанием: готовый буфер, один вызов отрисовки
         current_time = time.time() - self.start_time
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                base_color = LIGHT_BROWN if (row + col) % 2 == 0 else DARK_BROWN
-
-                # Добавляем легкое мерцание
-                flicker = math.sin(current_time * 0.5 + row * 0.5 + col * 0.5) * 0.05 + 0.95
-                color = (
-                    int(base_color[0] * flicker),
-                    int(base_color[1] * flicker),
-                    int(base_color[2] * flicker)
-                )
-
-                x = col * SQUARE_SIZE + self.board_offset_x
-                y = row * SQUARE_SIZE + self.board_offset_y
-
-                # Рисуем квадрат доски
-                arcade.draw_lrbt_rectangle_filled(
-                    left=x,
-                    right=x + SQUARE_SIZE,
-                    top=y + SQUARE_SIZE,
-                    bottom=y,
-                    color=color
-                )
+        self.board_layer.draw(current_time)
 
         # Анимация возможных ходов (пульсирующие кружки)
         for move in self.valid_moves:
@@ -567,12 +948,13 @@ class GameBoard:
             alpha_pulse = int(100 * (0.7 + 0.3 * math.sin(current_time * 15)))
             arcade.draw_circle_filled(x, y, pulse, (255, 255, 0, alpha_pulse))
 
-        # Отрисовка шашек
+        # Отрисовка шашек: все спрайты одним вызовом
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
                 piece = self.board[row][col]
                 if piece:
-                    piece.draw()
+                    piece.update_sprites()
+        self.piece_sprites.draw()
 
         # Анимация траектории последнего хода
         if self.last_move_from and self.last_move_to and self.move_animation_time > 0:
@@ -613,6 +995,7 @@ class GameBoard:
         if piece and piece.is_white == self.current_player:
             self.selected_piece = piece
             self.valid_moves = self.get_valid_moves(piece)
+            self.capture_choices = []
 
             # Запускаем анимацию выделения
             piece.start_selection_animation()
@@ -621,35 +1004,23 @@ class GameBoard:
         return False
 
     def get_valid_moves(self, piece: CheckerPiece) -> List[tuple]:
-        moves = []
-        row, col = piece.row, piece.col
-
-        # Направления движения
-        directions = []
-        if piece.is_white or piece.is_king:
-            directions.extend([(-1, -1), (-1, 1)])  # Вверх
-        if not piece.is_white or piece.is_king:
-            directions.extend([(1, -1), (1, 1)])  # Вниз
-
-        # Проверка простых ходов
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                if not self.get_piece_at(new_row, new_col):
-                    moves.append((new_row, new_col))
-
-        # Проверка взятия
-        for dr, dc in directions:
-            new_row, new_col = row + 2 * dr, col + 2 * dc
-            mid_row, mid_col = row + dr, col + dc
-
-            if (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE and
-                    not self.get_piece_at(new_row, new_col)):
-                mid_piece = self.get_piece_at(mid_row, mid_col)
-                if mid_piece and mid_piece.is_white != piece.is_white:
-                    moves.append((new_row, new_col))
-
-        return moves
+        # Ходы берутся из общего списка легальных ходов (взятие обязательно)
+        # Несколько цепочек взятий с одним концом дают одну клетку
+        moves = self.game.moves_from(square_index(piece.row, piece.col))
+        return list(dict.fromkeys(square_coords(move_to(move)) for move in moves))
+
+    def choice_squares(self) -> List[tuple]:
+        """Клетки, которыми различаются оставшиеся цепочки взятий.
+
+        Это первое поле пути, на котором цепочки расходятся; его номер в пути
+        запоминается в choice_ply.
+        """
+        paths = [path for _, path in self.capture_choices]
+        self.choice_ply = next((ply for ply in range(1, min(map(len, paths)))
+                                if len({path[ply] for path in paths}) > 1), 0)
+        if not self.choice_ply:
+            return []
+        return list(dict.fromkeys(square_coords(path[self.choice_ply]) for path in paths))
 
     def move_piece(self, row: int, col: int, particle_system: ParticleSystem) -> bool:
         if not self.selected_piece or (row, col) not in self.valid_moves:
@@ -658,111 +1029,149 @@ class GameBoard:
         # Преобразуем в целые числа, если это еще не сделано
         row = int(row)
         col = int(col)
+        square = square_index(row, col)
 
-        # Сохраняем позиции для анимации
-        old_x, old_y = self.selected_piece.x, self.selected_piece.y
-        new_x = col * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_x
-        new_y = row * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_y
+        if self.capture_choices:
+            # Игрок указал промежуточное поле, через которое пойдет цепочка
+            self.capture_choices = [(move, path) for move, path in self.capture_choices
+                                    if path[self.choice_ply] == square]
+        else:
+            origin = square_index(self.selected_piece.row, self.selected_piece.col)
+            self.capture_choices = [(move, move_path(self.game.position, move))
+                                    for move in self.game.moves_between(origin, square)]
+
+        if len(self.capture_choices) > 1:
+            # Цепочки кончаются на одной клетке: подсвечиваем поля, где они расходятся
+            choices = self.choice_squares()
+            if choices:
+                self.valid_moves = choices
+                return True
+            # Пути не различаются промежуточными полями: выбирать нечего
+        self.play_move(self.capture_choices[0][0], particle_system)
+        return True
 
-        # Проверка на взятие
-        dr = row - self.selected_piece.row
-        dc = col - self.selected_piece.col
+    def play_move(self, move: int, particle_system: ParticleSystem):
+        """Применение легального хода (от игрока или компьютера)"""
+        # Правила применяются к партии, анимация проигрывается отдельно
+        path = self.game.play(move)
+        self.replay_move(move, path, particle_system)
 
-        if abs(dr) == 2:  # Взятие
-            mid_row = self.selected_piece.row + dr // 2
-            mid_col = self.selected_piece.col + dc // 2
-            captured_piece = self.get_piece_at(mid_row, mid_col)
+        self.selected_piece = None
+        self.valid_moves = []
+        self.capture_choices = []
 
-            if captured_piece:
-                # Создаем частицы при взятии
-                particle_system.create_capture_particles(
-                    captured_piece.x, captured_piece.y, captured_piece.is_white
-                )
+        # Проверка окончания игры
+        self.check_game_over()
 
-                self.board[mid_row][mid_col] = None
-                if captured_piece.is_white:
-                    self.white_pieces -= 1
-                    self.black_score += 1
-                else:
-                    self.black_pieces -= 1
-                    self.white_score += 1
+    def replay_move(self, move: int, path: List[int], particle_system: ParticleSystem):
+        """Повтор уже сделанного хода на сетке шашек: анимация и частицы"""
+        from_row, from_col = square_coords(path[0])
+        row, col = square_coords(path[-1])
+        piece = self.board[from_row][from_col]
 
-        # Перемещение шашки
-        old_row, old_col = self.selected_piece.row, self.selected_piece.col
-        self.board[old_row][old_col] = None
+        # Сохраняем позиции для анимации
+        old_x, old_y = piece.x, piece.y
+        new_x = col * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_x
+        new_y = row * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_y
 
-        self.selected_piece.row = row
-        self.selected_piece.col = col
-        self.selected_piece.update_position()
+        # Проходим цепочку прыжков и снимаем взятые шашки
+        for hop_from, hop_to in zip(path, path[1:]):
+            hop_from_row, hop_from_col = square_coords(hop_from)
+            hop_to_row, hop_to_col = square_coords(hop_to)
+            hop_from_x = hop_from_col * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_x
+            hop_from_y = hop_from_row * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_y
+            hop_to_x = hop_to_col * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_x
+            hop_to_y = hop_to_row * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_y
+
+            if abs(hop_to_row - hop_from_row) == 2:  # Взятие
+                mid_row = (hop_from_row + hop_to_row) // 2
+                mid_col = (hop_from_col + hop_to_col) // 2
+                captured_piece = self.get_piece_at(mid_row, mid_col)
+
+                if captured_piece:
+                    # Создаем частицы при взятии
+                    particle_system.create_capture_particles(
+                        captured_piece.x, captured_piece.y, captured_piece.is_white
+                    )
+
+                    captured_piece.remove_sprites()
+                    self.board[mid_row][mid_col] = None
+
+            # Создаем частицы при перемещении
+            particle_system.create_move_particles(
+                hop_from_x, hop_from_y, hop_to_x, hop_to_y, piece.is_white
+            )
 
-        # Проверка на превращение в дамку
-        became_king = False
-        if (self.selected_piece.is_white and row == 0) or \
-                (not self.selected_piece.is_white and row == BOARD_SIZE - 1):
-            if not self.selected_piece.is_king:  # Только если еще не дамка
-                self.selected_piece.is_king = True
-                became_king = True
-                # Создаем частицы при превращении в дамку
-                particle_system.create_king_particles(
-                    self.selected_piece.x, self.selected_piece.y, self.selected_piece.is_white
-                )
+        # Перемещение шашки
+        self.board[from_row][from_col] = None
+        piece.row = row
+        piece.col = col
+        piece.update_position()
 
-        self.board[row][col] = self.selected_piece
+        # Проверка на превращение в дамку
+        if is_promotion(move):
+            piece.is_king = True
+            # Создаем частицы при превращении в дамку
+            particle_system.create_king_particles(piece.x, piece.y, piece.is_white)
 
-        # Создаем частицы при перемещении
-        particle_system.create_move_particles(
-            old_x, old_y, new_x, new_y, self.selected_piece.is_white
-        )
+        self.board[row][col] = piece
 
         # Устанавливаем анимацию последнего хода
         self.last_move_from = (old_x, old_y)
         self.last_move_to = (new_x, new_y)
         self.move_animation_time = 0.5  # Полсекунды анимации
 
-        # Смена игрока
-        self.current_player = not self.current_player
-        self.selected_piece = None
-        self.valid_moves = []
+    def check_game_over(self):
+        if self.game.game_over:
+            self.win_animation_active = True
 
-        # Проверка окончания игры
-        self.check_game_over()
 
-        return True
+class HistorySlider:
+    """Ползунок истории партии: перемотка к любому полуходу"""
 
-    def check_game_over(self):
-        if self.white_pieces == 0:
-            self.game_over = True
-            self.winner = "Черные"
-            self.win_animation_active = True
-        elif self.black_pieces == 0:
-            self.game_over = True
-            self.winner = "Белые"
-            self.win_animation_active = True
+    def __init__(self, left: int, right: int, y: int):
+        self.left = left
+        self.right = right
+        self.y = y
+        self.dragging = False
+        self.ply = 0
+        self.length = 0
+        self.label = ""
 
-        # Проверка наличия ходов
-        has_moves = False
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.get_piece_at(row, col)
-                if piece and piece.is_white == self.current_player:
-                    if self.get_valid_moves(piece):
-                        has_moves = True
-                        break
-            if has_moves:
-                break
-
-        if not has_moves:
-            self.game_over = True
-            self.winner = "Белые" if not self.current_player else "Черные"
-            self.win_animation_active = True
+    def contains(self, x, y) -> bool:
+        return self.left <= x <= self.right and abs(y - self.y) <= HISTORY_SLIDER_HIT
+
+    def ply_at(self, x, length: int) -> int:
+        fraction = min(max((x - self.left) / (self.right - self.left), 0.0), 1.0)
+        return round(fraction * length)
+
+    def set_position(self, ply: int, length: int):
+        """Новый полуход и длина партии; подпись строится здесь, а не в каждом кадре"""
+        self.ply = ply
+        self.length = length
+        self.label = f"Ход {ply}/{length}"
+
+    def draw(self):
+        if not self.length:
+            return
+        knob_x = self.left + (self.right - self.left) * self.ply / self.length
+        arcade.draw_lrbt_rectangle_filled(
+            left=self.left, right=self.right, bottom=self.y - 3, top=self.y + 3, color=(0, 0, 0, 160)
+        )
+        arcade.draw_lrbt_rectangle_filled(
+            left=self.left, right=knob_x, bottom=self.y - 3, top=self.y + 3, color=LIGHT_BLUE
+        )
+        arcade.draw_circle_filled(knob_x, self.y, 9 if self.dragging else 7, WHITE)
+        text_cache.draw(self.label, self.right + 12, self.y, WHITE, 12, anchor_y="center")
 
 
 class StartView(arcade.View):
-    def __init__(self):
+    def __init__(self, book: Optional[OpeningBook] = None):
         super().__init__()
-        self.title_text = None
-        self.instruction_text = None
-        self.control_text = None
+        # Дебютная книга открыта один раз на все партии (см. main)
+        self.book = book
+        # Заголовок и подсказки анимированы и рисуются через text_cache
+        self.ai_text = None
         self.particle_system = ParticleSystem()
         self.start_time = time.time()
 
@@ -771,32 +1180,12 @@ class StartView(arcade.View):
         self.setup_text()
 
     def setup_text(self):
-        self.title_text = arcade.Text(
-            "ШАШКИ",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.7,
-            WHITE,
-            50,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.instruction_text = arcade.Text(
-            "Нажмите любую клавишу для начала игры",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.4,
-            YELLOW,
-            24,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.control_text = arcade.Text(
-            "После окончания игры при нажатии на K будет открыт калькулятор",
+        self.ai_text = arcade.Text(
+            "Нажмите A для игры против компьютера",
             SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.3,
-            LIGHT_GRAY,
-            18,
+            SCREEN_HEIGHT * 0.2,
+            LIGHT_BLUE,
+            20,
             anchor_x="center",
             anchor_y="center"
         )
@@ -815,6 +1204,7 @@ class StartView(arcade.View):
 
     def on_draw(self):
         self.clear()
+        frame_stats.begin_frame()
         current_time = time.time() - self.start_time
 
         # Рисуем частицы
@@ -822,7 +1212,7 @@ class StartView(arcade.View):
 
         # Анимация заголовка (пульсация)
         scale = 1 + 0.1 * math.sin(current_time * 2)
-        arcade.Text(
+        text_cache.draw(
             "ШАШКИ",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.7,
@@ -830,12 +1220,12 @@ class StartView(arcade.View):
             int(50 * scale),
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
 
         # Анимация текста инструкции (мерцание)
         blink = 0.5 + 0.5 * math.sin(current_time * 3)
         alpha = int(255 * blink)
-        arcade.Text(
+        text_cache.draw(
             "Нажмите любую клавишу для начала игры",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.4,
@@ -843,11 +1233,11 @@ class StartView(arcade.View):
             24,
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
 
         # Анимация управляющего текста
         slide = math.sin(current_time) * 10
-        arcade.Text(
+        text_cache.draw(
             "После окончания игры при нажатии на K будет открыт калькулятор",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.3 + slide,
@@ -855,19 +1245,39 @@ class StartView(arcade.View):
             18,
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
+
+        self.ai_text.draw()
+        frame_stats.draw()
 
     def on_key_press(self, key, modifiers):
-        game_view = GameView()
+        if key == arcade.key.F3:
+            frame_stats.visible = not frame_stats.visible
+            return
+        if key == arcade.key.A:
+            # Компьютер играет черными
+            game_view = GameView(AIPlayer(False, AI_TIME_LIMIT_MS, book=self.book))
+        else:
+            game_view = GameView()
         self.window.show_view(game_view)
 
 
 class GameView(arcade.View):
-    def __init__(self):
+    def __init__(self, ai_player: Optional[AIPlayer] = None):
         super().__init__()
         self.board_offset_x = (SCREEN_WIDTH - BOARD_SIZE * SQUARE_SIZE) // 2
         self.board_offset_y = (SCREEN_HEIGHT - BOARD_SIZE * SQUARE_SIZE) // 2
-        self.board = GameBoard(self.board_offset_x, self.board_offset_y)
+
+        # Таблицы эндшпиля, если они построены: партия в решенной позиции
+        # заканчивается сразу, а фоновый поиск открывает те же файлы сам
+        self.tablebase = Tablebase(TABLEBASE_DIR)
+        tablebase = self.tablebase if len(self.tablebase) else None
+
+        # Компьютерный игрок (None - игра двух людей) и его фоновый поиск
+        self.ai_player = ai_player
+        tablebase_dir = TABLEBASE_DIR if tablebase is not None else None
+        self.search_worker = SearchWorker(ai_player.tt_size_mb, tablebase_dir) if ai_player else None
+        self.board = GameBoard(self.board_offset_x, self.board_offset_y, tablebase)
 
         # Калькулятор
         self.calculator = Calculator()
@@ -875,14 +1285,17 @@ class GameView(arcade.View):
         # Система частиц
         self.particle_system = ParticleSystem()
 
-        # Текстовые объекты
-        self.score_text = None
+        # Ползунок истории; стрелки - ход назад и вперед, Home и End - начало и конец
+        self.history_slider = HistorySlider(40, SCREEN_WIDTH - 120, HISTORY_SLIDER_Y)
+
+        # Текстовые объекты; анимированные строки рисуются через text_cache
+        self.score_line = ""
+        self.pieces_line = ""
+        self.winner_line = ""
         self.player_text = None
-        self.pieces_text = None
         self.exit_button_text = None
-        self.winner_text = None
-        self.final_text = None
         self.calculator_hint_text = None
+        self.ai_status_text = None
 
         # Анимационные параметры
         self.start_time = time.time()
@@ -890,6 +1303,16 @@ class GameView(arcade.View):
         # Инициализируем текстовые объекты сразу
         self.setup_text()
 
+        # Тексты HUD меняются только по событиям партии, а не каждый кадр
+        self.board.subscribe(EVENT_SCORE, self.on_score_changed)
+        self.board.subscribe(EVENT_TURN, self.on_turn_changed)
+        self.board.subscribe(EVENT_GAME_OVER, self.on_game_over)
+        self.board.subscribe(EVENT_POSITION, self.on_position_changed)
+        self.on_score_changed(self.board.game)
+        self.on_turn_changed(self.board.game)
+        if self.board.game_over:
+            self.on_game_over(self.board.game)
+
     def setup_text(self):
         # Статические тексты (не меняются)
         self.exit_button_text = arcade.Text(
@@ -902,26 +1325,6 @@ class GameView(arcade.View):
             anchor_y="center"
         )
 
-        self.winner_text = arcade.Text(
-            "",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT // 2 + 30,
-            YELLOW,
-            36,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.final_text = arcade.Text(
-            "",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT // 2 - 40,
-            WHITE,
-            20,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
         self.calculator_hint_text = arcade.Text(
             "Нажмите K для открытия калькулятора",
             SCREEN_WIDTH // 2,
@@ -933,14 +1336,6 @@ class GameView(arcade.View):
         )
 
         # Динамические тексты (будут обновляться)
-        self.score_text = arcade.Text(
-            "",
-            20,
-            SCREEN_HEIGHT - 30,
-            WHITE,
-            18
-        )
-
         self.player_text = arcade.Text(
             "",
             20,
@@ -949,22 +1344,52 @@ class GameView(arcade.View):
             18
         )
 
-        self.pieces_text = arcade.Text(
+        self.ai_status_text = arcade.Text(
             "",
             20,
-            SCREEN_HEIGHT - 90,
-            WHITE,
-            18
+            SCREEN_HEIGHT - 120,
+            BLACK,
+            14
         )
 
     def on_show_view(self):
         arcade.set_background_color(DARK_GREEN)
-        self.update_text()
+
+    def on_hide_view(self):
+        # Останавливаем фоновый поиск при уходе с экрана игры
+        if self.search_worker:
+            self.search_worker.shutdown()
+        self.tablebase.close()
+
+    def is_ai_turn(self) -> bool:
+        return (self.ai_player is not None and not self.board.game_over and
+                self.board.current_player == self.ai_player.is_white)
 
     def on_update(self, delta_time):
         self.board.update_animations(delta_time)
         self.particle_system.update(delta_time)
 
+        # Ход компьютера после завершения анимации предыдущего хода.
+        # Поиск идет в фоновом процессе, кадр только опрашивает результат.
+        # При просмотре истории компьютер ждет, пока партия не вернется к концу
+        if (self.is_ai_turn() and self.board.move_animation_time <= 0 and
+                self.board.game.history.at_end):
+            worker = self.search_worker
+            for result in worker.poll():
+                self.ai_status_text.text = (f"Компьютер думает: глубина {result.depth}, "
+                                            f"оценка {result.score}")
+            if worker.ready():
+                self.ai_player.last_result = worker.result()
+                self.ai_status_text.text = ""
+                self.board.play_move(self.ai_player.last_result.move, self.particle_system)
+            elif not worker.busy:
+                # В дебюте ход берется из книги сразу, без фонового поиска
+                book_move = self.ai_player.book_move(self.board.position)
+                if book_move is not None:
+                    self.board.play_move(book_move, self.particle_system)
+                else:
+                    worker.start(self.board.position, self.ai_player.time_limit_ms, self.ai_player.max_depth)
+
         # Создаем частицы победы если игра окончена
         if self.board.game_over and self.board.win_animation_active:
             color = WHITE if self.board.winner == "Белые" else RED
@@ -982,33 +1407,38 @@ class GameView(arcade.View):
                 y = random.randint(self.board_offset_y, self.board_offset_y + BOARD_SIZE * SQUARE_SIZE)
                 self.particle_system.create_button_press_particles(x, y, color)
 
-    def update_text(self):
-        """Обновление текстов с текущими значениями"""
-        current_time = time.time() - self.start_time
+    def on_score_changed(self, game: Game):
+        """Счет и остаток шашек меняются только при взятии"""
+        frame_stats.hud_updates += 1
+        self.score_line = f"Белые: {game.white_score}   Черные: {game.black_score}"
+        self.pieces_line = f"Осталось шашек: Белые - {game.white_pieces}, Черные - {game.black_pieces}"
+
+    def on_turn_changed(self, game: Game):
+        frame_stats.hud_updates += 1
+        self.player_text.text = "Ходят: Белые" if game.current_player else "Ходят: Черные"
+        # Ход и переход по истории (seek) оба сообщают EVENT_TURN
+        self.history_slider.set_position(game.history.ply, len(game.history))
+
+    def on_game_over(self, game: Game):
+        frame_stats.hud_updates += 1
+        if game.winner is None:
+            self.winner_line = "Ничья!"
+        else:
+            self.winner_line = f"Победили {self.board.winner}!"
 
-        if self.score_text:
-            self.score_text.text = f"Белые: {self.board.white_score}   Черные: {self.board.black_score}"
-            # Меняем цвет текста счета на черный
-            self.score_text.color = BLACK
-
-            # Анимация текста текущего игрока
-            if self.board.current_player:
-                alpha = int(255 * (0.7 + 0.3 * math.sin(current_time * 3)))
-                # Меняем цвет текста текущего игрока на черный
-                self.player_text.color = (BLACK[0], BLACK[1], BLACK[2], alpha)
-                self.player_text.text = f"Ходят: Белые"
-            else:
-                alpha = int(255 * (0.7 + 0.3 * math.sin(current_time * 3)))
-                # Меняем цвет текста текущего игрока на черный
-                self.player_text.color = (BLACK[0], BLACK[1], BLACK[2], alpha)
-                self.player_text.text = f"Ходят: Черные"
+    def on_position_changed(self, game: Game):
+        # Поиск компьютера шел из позиции, которой больше нет на доске
+        if self.search_worker:
+            self.search_worker.cancel()
+        self.ai_status_text.text = ""
 
-            # Меняем цвет текста остатка шашек на черный
-            self.pieces_text.color = BLACK
-            self.pieces_text.text = f"Осталось шашек: Белые - {self.board.white_pieces}, Черные - {self.board.black_pieces}"
+    def seek_history(self, ply: int):
+        if ply != self.board.game.history.ply:
+            self.board.seek(ply)
 
     def on_draw(self):
         self.clear()
+        frame_stats.begin_frame()
         current_time = time.time() - self.start_time
 
         # Рисуем частицы
@@ -1046,30 +1476,39 @@ class GameView(arcade.View):
             self.calculator_hint_text.color = (LIGHT_BLUE[0], LIGHT_BLUE[1], LIGHT_BLUE[2], alpha)
             self.calculator_hint_text.draw()
 
-        # Обновляем и рисуем тексты
-        self.update_text()
-        if self.score_text:
+        # Рисуем тексты HUD (строки обновляются по событиям партии)
+        if self.score_line:
             # Анимация текста счета
             scale = 1 + 0.05 * math.sin(current_time * 1.5)
-            arcade.Text(
-                self.score_text.text,
-                self.score_text.x,
-                self.score_text.y,
-                self.score_text.color,
+            text_cache.draw(
+                self.score_line,
+                20,
+                SCREEN_HEIGHT - 30,
+                BLACK,
                 int(18 * scale)
-            ).draw()
+            )
 
+            # Мерцание текста текущего игрока
+            alpha = int(255 * (0.7 + 0.3 * math.sin(current_time * 3)))
+            self.player_text.color = (BLACK[0], BLACK[1], BLACK[2], alpha)
             self.player_text.draw()
 
             # Анимация текста остатка шашек
             slide = math.sin(current_time) * 2
-            arcade.Text(
-                self.pieces_text.text,
-                self.pieces_text.x,
+            text_cache.draw(
+                self.pieces_line,
+                20,
                 SCREEN_HEIGHT - 90 + slide,
-                self.pieces_text.color,
-                self.pieces_text.font_size
-            ).draw()
+                BLACK,
+                18
+            )
+
+        # Ход мысли компьютера
+        if self.is_ai_turn() and self.ai_status_text.text:
+            self.ai_status_text.draw()
+
+        # Ползунок истории партии
+        self.history_slider.draw()
 
         # Рисуем калькулятор, если он активен
         self.calculator.draw()
@@ -1091,37 +1530,46 @@ class GameView(arcade.View):
                 color=(0, 0, 0, int(200 * pulse))
             )
 
-            if self.winner_text:
+            if self.winner_line:
                 # Анимация текста победителя
                 winner_scale = 1 + 0.1 * math.sin(current_time * 3)
-                arcade.Text(
-                    f"Победили {self.board.winner}!",
-                    self.winner_text.x,
-                    self.winner_text.y,
-                    self.winner_text.color,
+                text_cache.draw(
+                    self.winner_line,
+                    SCREEN_WIDTH // 2,
+                    SCREEN_HEIGHT // 2 + 30,
+                    YELLOW,
                     int(36 * winner_scale),
                     anchor_x="center",
                     anchor_y="center"
-                ).draw()
+                )
 
                 # Анимация финального текста
                 blink = 0.5 + 0.5 * math.sin(current_time * 2)
                 alpha = int(255 * blink)
-                arcade.Text(
+                text_cache.draw(
                     "Нажмите любую клавишу для завершения",
-                    self.final_text.x,
-                    self.final_text.y,
+                    SCREEN_WIDTH // 2,
+                    SCREEN_HEIGHT // 2 - 40,
                     (WHITE[0], WHITE[1], WHITE[2], alpha),
                     20,
                     anchor_x="center",
                     anchor_y="center"
-                ).draw()
+                )
+
+        frame_stats.draw()
 
     def on_mouse_press(self, x, y, button, modifiers):
         # Обработка кликов по калькулятору
         if self.calculator.is_active and self.calculator.handle_click(x, y, self.particle_system):
             return
 
+        # Перемотка истории ползунком (в том числе после конца партии)
+        history = self.board.game.history
+        if len(history) and not self.calculator.is_active and self.history_slider.contains(x, y):
+            self.history_slider.dragging = True
+            self.seek_history(self.history_slider.ply_at(x, len(history)))
+            return
+
         if self.board.game_over and not self.calculator.is_active:
             end_view = EndView(self.board.winner, self.board.white_score, self.board.black_score)
             self.window.show_view(end_view)
@@ -1152,13 +1600,43 @@ class GameView(arcade.View):
             row = int(row)
             col = int(col)
 
+            # Во время хода компьютера доска не реагирует на клики
+            if self.is_ai_turn():
+                return
+
             if self.board.selected_piece:
                 if self.board.move_piece(row, col, self.particle_system):
                     return
 
             self.board.select_piece(row, col)
 
+    def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
+        if self.history_slider.dragging:
+            self.seek_history(self.history_slider.ply_at(x, len(self.board.game.history)))
+
+    def on_mouse_release(self, x, y, button, modifiers):
+        self.history_slider.dragging = False
+
     def on_key_press(self, key, modifiers):
+        if key == arcade.key.F3:
+            frame_stats.visible = not frame_stats.visible
+            return
+
+        # Перемотка истории: ход назад и вперед, начало и конец партии
+        if not self.calculator.is_active:
+            if key == arcade.key.LEFT:
+                self.board.undo()
+                return
+            if key == arcade.key.RIGHT:
+                self.board.redo()
+                return
+            if key == arcade.key.HOME:
+                self.seek_history(0)
+                return
+            if key == arcade.key.END:
+                self.seek_history(len(self.board.game.history))
+                return
+
         # Обработка клавиши K для открытия/закрытия калькулятора
         if key == arcade.key.K and self.board.game_over:
             if not self.calculator.is_active:
@@ -1185,79 +1663,10 @@ class EndView(arcade.View):
         self.winner = winner
         self.white_score = white_score
         self.black_score = black_score
-        self.title_text = None
-        self.winner_text = None
-        self.score_title_text = None
-        self.score_text = None
-        self.instruction_text = None
-        self.control_text = None
+        # Все тексты анимированы и рисуются через text_cache
         self.particle_system = ParticleSystem()
         self.start_time = time.time()
 
-        # Инициализируем текстовые объекты сразу
-        self.setup_text()
-
-    def setup_text(self):
-        self.title_text = arcade.Text(
-            "ИГРА ОКОНЧЕНА",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.7,
-            GOLD,
-            50,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.winner_text = arcade.Text(
-            f"Победитель: {self.winner}",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.5,
-            WHITE,
-            36,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.score_title_text = arcade.Text(
-            "Финальный счет:",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.4,
-            LIGHT_BLUE,
-            28,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.score_text = arcade.Text(
-            f"Белые: {self.white_score}   Черные: {self.black_score}",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.33,
-            WHITE,
-            32,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.instruction_text = arcade.Text(
-            "Нажмите любую клавишу для выхода",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.2,
-            YELLOW,
-            24,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        self.control_text = arcade.Text(
-            "ESC для выхода, R для рестарта",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT * 0.1,
-            LIGHT_GRAY,
-            20,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
     def on_show_view(self):
         arcade.set_background_color(DARK_PURPLE)
         # Создаем частицы победы
@@ -1280,6 +1689,7 @@ class EndView(arcade.View):
 
     def on_draw(self):
         self.clear()
+        frame_stats.begin_frame()
         current_time = time.time() - self.start_time
 
         # Рисуем частицы
@@ -1287,7 +1697,7 @@ class EndView(arcade.View):
 
         # Анимация заголовка
         title_scale = 1 + 0.1 * math.sin(current_time * 2)
-        arcade.Text(
+        text_cache.draw(
             "ИГРА ОКОНЧЕНА",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.7,
@@ -1295,13 +1705,13 @@ class EndView(arcade.View):
             int(50 * title_scale),
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
 
         # Анимация текста победителя
         winner_color = WHITE if self.winner == "Белые" else RED
         blink = 0.7 + 0.3 * math.sin(current_time * 3)
         alpha = int(255 * blink)
-        arcade.Text(
+        text_cache.draw(
             f"Победитель: {self.winner}",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.5,
@@ -1309,11 +1719,11 @@ class EndView(arcade.View):
             36,
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
 
         # Анимация заголовка счета
         slide = math.sin(current_time) * 5
-        arcade.Text(
+        text_cache.draw(
             "Финальный счет:",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.4 + slide,
@@ -1321,11 +1731,11 @@ class EndView(arcade.View):
             28,
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
 
         # Анимация текста счета
         score_scale = 1 + 0.05 * math.sin(current_time * 1.5)
-        arcade.Text(
+        text_cache.draw(
             f"Белые: {self.white_score}   Черные: {self.black_score}",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.33,
@@ -1333,12 +1743,12 @@ class EndView(arcade.View):
             int(32 * score_scale),
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
 
         # Анимация текста инструкции
         blink = 0.5 + 0.5 * math.sin(current_time * 2)
         alpha = int(255 * blink)
-        arcade.Text(
+        text_cache.draw(
             "Нажмите любую клавишу для выхода",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.2,
@@ -1346,11 +1756,11 @@ class EndView(arcade.View):
             24,
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
 
         # Анимация управляющего текста
         control_alpha = int(255 * (0.6 + 0.4 * math.sin(current_time * 1.5)))
-        arcade.Text(
+        text_cache.draw(
             "ESC для выхода, R для рестарта",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT * 0.1,
@@ -1358,9 +1768,13 @@ class EndView(arcade.View):
             20,
             anchor_x="center",
             anchor_y="center"
-        ).draw()
+        )
+        frame_stats.draw()
 
     def on_key_press(self, key, modifiers):
+        if key == arcade.key.F3:
+            frame_stats.visible = not frame_stats.visible
+            return
         if key == arcade.key.R:
             game_view = GameView()
             self.window.show_view(game_view)
@@ -1372,9 +1786,10 @@ class EndView(arcade.View):
 
 def main():
     window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
-    start_view = StartView()
-    window.show_view(start_view)
-    arcade.run()
+    with OpeningBook(BOOK_PATH) as book:
+        start_view = StartView(book)
+        window.show_view(start_view)
+        arcade.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+"""Правила шашек без зависимостей от arcade.
+
+Пакет использует только стандартную библиотеку и быстро импортируется,
+поэтому подходит для пакетного анализа и самоигры на серверах без дисплея.
+Только пакетная оценка позиций (checkers_core.evaluation) требует NumPy
+и импортирует его при первом вызове.
+"""
+
+from checkers_core.game import Game
+from checkers_core.movegen import (
+    MoveList,
+    generate_legal_moves,
+    move_captures,
+    move_from,
+    move_to,
+)
+from checkers_core.position import (
+    BOARD_SIZE,
+    NUM_SQUARES,
+    Position,
+    square_coords,
+    square_index,
+)
+from checkers_core.search import AIPlayer, Searcher, SearchResult
+from checkers_core.tt import TranspositionTable
+
+__all__ = [
+    "AIPlayer",
+    "BOARD_SIZE",
+    "Game",
+    "MoveList",
+    "NUM_SQUARES",
+    "Position",
+    "SearchResult",
+    "Searcher",
+    "TranspositionTable",
+    "generate_legal_moves",
+    "move_captures",
+    "move_from",
+    "move_to",
+    "square_coords",
+    "square_index",
+]
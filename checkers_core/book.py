@@ -0,0 +1,216 @@
+"""Дебютная книга: статистика ходов по хешу позиции, собранная из сыгранных партий.
+
+Файл книги - заголовок и записи фиксированной длины (хеш Зобриста позиции,
+ход, число партий, набранные очки в полуочках), отсортированные по хешу и
+ходу. Поиск - двоичный поиск прямо по файлу, отображенному в память (mmap),
+поэтому книга открывается мгновенно и не занимает память процесса.
+Ходы из книги проверяются по списку легальных ходов: совпадение хешей
+разных позиций не приводит к нелегальному ходу.
+
+    python -m checkers_core.book games.ckg more.pdn -o opening.book --plies 16
+    python -m checkers_core.book --show "W:W21-32:B1-12" --book opening.book
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from checkers_core.movegen import generate_legal_moves
+from checkers_core.notation import format_move, position_from_fen
+from checkers_core.pdn import read_pdn
+from checkers_core.position import Position
+from checkers_core.records import RESULT_DRAW, RESULT_UNFINISHED, RESULT_WHITE_WIN, read_games
+
+DEFAULT_BOOK_PATH = "opening.book"
+DEFAULT_BOOK_PLIES = 16
+DEFAULT_MIN_GAMES = 2
+
+MAGIC = b"CKOB"
+VERSION = 1
+# MAGIC, версия, выравнивание, число записей
+HEADER = struct.Struct("<4sB3xI")
+# Хеш позиции, ход, число партий, очки стороны, чей ход (победа - 2, ничья - 1)
+ENTRY = struct.Struct("<QQII")
+_HASH = struct.Struct("<Q")
+
+
+class BookMove(NamedTuple):
+    move: int
+    games: int
+    points: int  # Полуочки стороны, сделавшей ход
+
+    @property
+    def score(self) -> float:
+        """Доля набранных очков от 0 до 1"""
+        return self.points / (2 * self.games)
+
+
+def _game_moves(path: str) -> Iterator[Tuple[Position, List[int], str]]:
+    """Начальная позиция, ходы и результат законченных партий из архива или PDN"""
+    if path.lower().endswith(".pdn"):
+        for game in read_pdn(path, strict=False):
+            if game.result != RESULT_UNFINISHED:
+                yield game.start_position(), game.moves, game.result
+    else:
+        for record in read_games(path):
+            if record.result != RESULT_UNFINISHED:
+                yield record.start_position(), record.moves, record.result
+
+
+def collect(paths: Iterable[str], max_plies: int = DEFAULT_BOOK_PLIES) -> Tuple[Dict[Tuple[int, int], List[int]], int]:
+    """Статистика (хеш, ход) -> [партии, полуочки] по первым max_plies ходам; и число партий"""
+    stats: Dict[Tuple[int, int], List[int]] = {}
+    games = 0
+    for path in paths:
+        for position, moves, result in _game_moves(path):
+            games += 1
+            # Полуочки белых; черные получают 2 - white_points
+            white_points = 2 if result == RESULT_WHITE_WIN else 1 if result == RESULT_DRAW else 0
+            for move in moves[:max_plies]:
+                entry = stats.get((position.hash, move))
+                if entry is None:
+                    entry = stats[(position.hash, move)] = [0, 0]
+                entry[0] += 1
+                entry[1] += white_points if position.white_to_move else 2 - white_points
+                position.make_move(move)
+    return stats, games
+
+
+def write_book(path: str, stats: Dict[Tuple[int, int], List[int]], min_games: int = DEFAULT_MIN_GAMES) -> int:
+    """Запись книги, отсортированной по хешу и ходу; возвращает число записей"""
+    keys = sorted(key for key, (games, _) in stats.items() if games >= min_games)
+    data = bytearray(HEADER.size + ENTRY.size * len(keys))
+    HEADER.pack_into(data, 0, MAGIC, VERSION, len(keys))
+    offset = HEADER.size
+    for key in keys:
+        games, points = stats[key]
+        ENTRY.pack_into(data, offset, key[0], key[1], games, points)
+        offset += ENTRY.size
+    with open(path + ".tmp", "wb") as stream:
+        stream.write(data)
+    os.replace(path + ".tmp", path)
+    return len(keys)
+
+
+class OpeningBook:
+    """Книга, отображенная в память; нет файла или он пуст либо обрезан - пустая книга"""
+
+    def __init__(self, path: str = DEFAULT_BOOK_PATH):
+        self.path = path
+        self.count = 0
+        self._data: Optional[mmap.mmap] = None
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as stream:
+            # Пустой файл не отображается в память, а в обрезанном нет целых записей
+            size = os.fstat(stream.fileno()).st_size
+            if size < HEADER.size or (size - HEADER.size) % ENTRY.size:
+                return
+            data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(data)
+        if (magic, version) != (MAGIC, VERSION) or len(data) < HEADER.size + count * ENTRY.size:
+            data.close()
+            raise ValueError(f"{path} is not an opening book (version {VERSION})")
+        self._data = data
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _first(self, key: int) -> int:
+        """Номер первой записи с хешем не меньше key"""
+        low, high = 0, self.count
+        data = self._data
+        while low < high:
+            middle = (low + high) // 2
+            if _HASH.unpack_from(data, HEADER.size + middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, position: Position) -> List[BookMove]:
+        """Легальные ходы книги для позиции, самые частые первыми"""
+        if not self.count:
+            return []
+        key = position.hash
+        index = self._first(key)
+        found = []
+        while index < self.count:
+            entry_key, move, games, points = ENTRY.unpack_from(self._data, HEADER.size + index * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append(BookMove(move, games, points))
+            index += 1
+        if found:
+            legal = set(generate_legal_moves(position))
+            found = [entry for entry in found if entry.move in legal]
+            found.sort(key=lambda entry: entry.games, reverse=True)
+        return found
+
+    def choose(self, position: Position, rng: random.Random) -> Optional[int]:
+        """Случайный ход книги с весом по набранным очкам; None - позиции нет в книге"""
+        moves = self.lookup(position)
+        total = sum(entry.points for entry in moves)
+        if not total:
+            return None
+        pick = rng.randrange(total)
+        for entry in moves:
+            pick -= entry.points
+            if pick < 0:
+                return entry.move
+        return None
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Построение и просмотр дебютной книги")
+    parser.add_argument("inputs", nargs="*", help="архивы партий (checkers_core.records) или файлы .pdn")
+    parser.add_argument("-o", "--output", default=DEFAULT_BOOK_PATH, help="файл книги")
+    parser.add_argument("--plies", type=int, default=DEFAULT_BOOK_PLIES, help="глубина книги в полуходах")
+    parser.add_argument("--min-games", type=int, default=DEFAULT_MIN_GAMES,
+                        help="ход попадает в книгу, если сыгран хотя бы в стольких партиях")
+    parser.add_argument("--book", default=DEFAULT_BOOK_PATH, help="книга для --show")
+    parser.add_argument("--show", metavar="FEN", help="ходы книги в позиции")
+    args = parser.parse_args()
+
+    if args.show:
+        position = position_from_fen(args.show)
+        with OpeningBook(args.book) as book:
+            start = time.perf_counter()
+            repeats = 10000
+            for _ in range(repeats):
+                moves = book.lookup(position)
+            elapsed = time.perf_counter() - start
+            entries = len(book)
+        for entry in moves:
+            print(f"{format_move(position, entry.move):<8} партий {entry.games:>7}  очки {100 * entry.score:5.1f}%")
+        print(f"Записей в книге: {entries}; поиск {elapsed / repeats * 1e6:.1f} мкс")
+        return
+
+    if not args.inputs:
+        parser.error("no game files to build the book from")
+    start = time.perf_counter()
+    stats, games = collect(args.inputs, args.plies)
+    entries = write_book(args.output, stats, args.min_games)
+    print(f"Партий: {games}, позиций и ходов: {len(stats)}, в книге: {entries} "
+          f"({os.path.getsize(args.output)} байт) за {time.perf_counter() - start:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Пакетная оценка позиций: признаки features.py для тысяч позиций сразу.
+
+extract_features и evaluate_batch считают те же признаки, что
+features.features и features.evaluate (быстрый путь поиска), сдвигами и
+масками над массивами NumPy. NumPy импортируется только при вызове
+пакетных функций, поэтому остальной пакет по-прежнему работает без него.
+
+    python -m checkers_core.evaluation games.ckg more.pdn --limit 100000
+"""
+
+import argparse
+import time
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence
+
+from checkers_core.features import (
+    BLACK_BACK_RANK,
+    BLACK_CONES,
+    BLACK_RUNAWAY_ZONE,
+    CENTRE_MASK,
+    FEATURES,
+    WEIGHTS,
+    WHITE_BACK_RANK,
+    WHITE_CONES,
+    WHITE_RUNAWAY_ZONE,
+    evaluate,
+    features,
+)
+from checkers_core.notation import position_from_fen
+from checkers_core.position import (
+    BLACK_MAN,
+    JUMP_GROUPS,
+    KIND_DIRECTIONS,
+    NUM_SQUARES,
+    STEP_GROUPS,
+    WHITE_MAN,
+    Position,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Пакеты для NumPy: больше позиций - больше памяти под промежуточные массивы
+BATCH_SIZE = 1 << 16
+
+
+def position_array(positions: Sequence[Position]) -> "np.ndarray":
+    """Позиции в виде массива (N, 4) uint32: белые, черные, дамки, ход белых"""
+    import numpy as np
+
+    return np.array([(position.white, position.black, position.kings, position.white_to_move)
+                     for position in positions], dtype=np.uint32).reshape(-1, 4)
+
+
+def _popcount(masks: "np.ndarray") -> "np.ndarray":
+    """Число единичных битов в каждом элементе массива uint32"""
+    masks = masks - ((masks >> 1) & 0x55555555)
+    masks = (masks & 0x33333333) + ((masks >> 2) & 0x33333333)
+    masks = (masks + (masks >> 4)) & 0x0F0F0F0F
+    # Умножение uint32 переполняется по модулю 2**32: старший байт - сумма всех байтов
+    return ((masks * 0x01010101) >> 24).astype("int32")
+
+
+def _shifted(masks: "np.ndarray", delta: int) -> "np.ndarray":
+    return masks >> delta if delta > 0 else masks << -delta
+
+
+def _mobile_batch(own: "np.ndarray", enemies: "np.ndarray", kings: "np.ndarray",
+                  man_kind: int) -> "np.ndarray":
+    """Число подвижных фигур own: те же сдвиги масок, что в position.mobility_masks"""
+    empty = ~(own | enemies)
+    own_kings = own & kings
+    man_directions = KIND_DIRECTIONS[man_kind]
+    mobile = own & 0
+    for direction in range(len(STEP_GROUPS)):
+        pieces = own if direction in man_directions else own_kings
+        for mask, delta in STEP_GROUPS[direction]:
+            mobile |= pieces & mask & _shifted(empty, delta)
+        for mask, over, landing in JUMP_GROUPS[direction]:
+            mobile |= pieces & mask & _shifted(enemies, over) & _shifted(empty, landing)
+    return _popcount(mobile)
+
+
+def _runaways_batch(men: "np.ndarray", cones: "np.ndarray", occupied: "np.ndarray") -> "np.ndarray":
+    """Число проходных шашек: матрица (позиция, поле) вместо цикла по шашкам"""
+    import numpy as np
+
+    bits = (men[:, None] >> np.arange(NUM_SQUARES, dtype=np.uint32)) & 1
+    free = (occupied[:, None] & cones) == 0
+    return (bits.astype(bool) & free).sum(axis=1, dtype=np.int32)
+
+
+def array_features(array: "np.ndarray") -> "np.ndarray":
+    """Матрица признаков (N, len(FEATURES)) int32 для массива из position_array"""
+    import numpy as np
+
+    result = np.empty((len(array), len(FEATURES)), dtype=np.int32)
+    white_cones = np.array(WHITE_CONES, dtype=np.uint32)
+    black_cones = np.array(BLACK_CONES, dtype=np.uint32)
+    for start in range(0, len(array), BATCH_SIZE):
+        chunk = array[start:start + BATCH_SIZE]
+        white, black, kings = chunk[:, 0], chunk[:, 1], chunk[:, 2]
+        white_kings = white & kings
+        black_kings = black & kings
+        white_men = white ^ white_kings
+        black_men = black ^ black_kings
+        occupied = white | black
+        block = result[start:start + len(chunk)]
+        block[:, 0] = _popcount(white_men) - _popcount(black_men)
+        block[:, 1] = _popcount(white_kings) - _popcount(black_kings)
+        block[:, 2] = _popcount(white_men & WHITE_BACK_RANK) - _popcount(black_men & BLACK_BACK_RANK)
+        block[:, 3] = _popcount(white & CENTRE_MASK) - _popcount(black & CENTRE_MASK)
+        block[:, 4] = (_mobile_batch(white, black, kings, WHITE_MAN) -
+                       _mobile_batch(black, white, kings, BLACK_MAN))
+        block[:, 5] = (_runaways_batch(white_men & WHITE_RUNAWAY_ZONE, white_cones, occupied) -
+                       _runaways_batch(black_men & BLACK_RUNAWAY_ZONE, black_cones, occupied))
+    return result
+
+
+def extract_features(positions: Sequence[Position]) -> "np.ndarray":
+    """Матрица признаков; строка i совпадает с features(positions[i])"""
+    return array_features(position_array(positions))
+
+
+def evaluate_batch(positions: Sequence[Position], weights: Optional[Sequence[float]] = None) -> "np.ndarray":
+    """Оценки позиций с точки зрения стороны, чей ход; с весами WEIGHTS совпадают с evaluate.
+
+    Другие веса (например, при подборе весов) передаются через weights.
+    """
+    import numpy as np
+
+    weights = np.asarray(WEIGHTS if weights is None else weights)
+    if weights.shape != (len(FEATURES),):
+        raise ValueError(f"expected {len(FEATURES)} weights, got {weights.shape}")
+    array = position_array(positions)
+    scores = array_features(array).astype(np.int64) @ weights
+    return np.where(array[:, 3] != 0, scores, -scores)
+
+
+def _game_positions(paths: Iterable[str], limit: int) -> List[Position]:
+    """Позиции после каждого хода партий из архивов и файлов PDN"""
+    from checkers_core.pdn import read_pdn
+    from checkers_core.records import read_games
+
+    positions: List[Position] = []
+    for path in paths:
+        games = read_pdn(path, strict=False) if path.lower().endswith(".pdn") else read_games(path)
+        for game in games:
+            position = game.start_position()
+            for move in game.moves:
+                position.make_move(move)
+                positions.append(position.copy())
+                if len(positions) >= limit:
+                    return positions
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Оценка позиций: признаки и скорость пакетной оценки")
+    parser.add_argument("inputs", nargs="*", help="архивы партий (checkers_core.records) или файлы .pdn")
+    parser.add_argument("--limit", type=int, default=100_000, help="не больше стольких позиций")
+    parser.add_argument("--fen", help="признаки и оценка одной позиции")
+    args = parser.parse_args()
+
+    if args.fen:
+        position = position_from_fen(args.fen)
+        for name, value, weight in zip(FEATURES, features(position), WEIGHTS):
+            print(f"{name:<10} {value:>4} x {weight:>3}")
+        print(f"Оценка для стороны, чей ход: {evaluate(position)}")
+        return
+
+    if not args.inputs:
+        parser.error("no game files to take positions from")
+    positions = _game_positions(args.inputs, args.limit)
+    if not positions:
+        parser.error("no positions in the given files")
+
+    start = time.perf_counter()
+    scalar = [evaluate(position) for position in positions]
+    scalar_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = evaluate_batch(positions)
+    batch_time = time.perf_counter() - start
+
+    mismatches = sum(1 for expected, score in zip(scalar, batch.tolist()) if expected != score)
+    print(f"Позиций: {len(positions)}")
+    print(f"По одной: {scalar_time:.2f} с, {len(positions) / scalar_time:,.0f} позиций/с")
+    print(f"Пакетом:  {batch_time:.2f} с, {len(positions) / batch_time:,.0f} позиций/с")
+    print(f"Расхождений с evaluate: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Признаки позиции и линейная оценка по ним - быстрый путь для поиска.
+
+Признаки считаются как разность белых и черных: простые шашки, дамки,
+шашки на своей последней горизонтали (защита от превращения), фигуры в
+центре, подвижные фигуры и проходные шашки (на пути к полю превращения нет
+ни одной фигуры). Оценка - скалярное произведение признаков на веса
+WEIGHTS с точки зрения стороны, чей ход. Только операции над масками одной
+позиции, без зависимостей; те же признаки пакетами над массивами NumPy -
+в checkers_core.evaluation.
+"""
+
+from typing import List, Tuple
+
+from checkers_core.position import (
+    BLACK_MAN,
+    NUM_SQUARES,
+    SQUARE_BITS,
+    STEPS_BY_KIND,
+    WHITE_MAN,
+    Position,
+)
+
+FEATURES = ("men", "kings", "back_rank", "centre", "mobility", "runaways")
+
+MAN_VALUE = 100
+KING_VALUE = 160
+BACK_RANK_VALUE = 8
+CENTRE_VALUE = 6
+MOBILITY_VALUE = 3
+RUNAWAY_VALUE = 40
+
+# Веса в порядке FEATURES; evaluate использует их же через константы выше
+WEIGHTS = (MAN_VALUE, KING_VALUE, BACK_RANK_VALUE, CENTRE_VALUE, MOBILITY_VALUE, RUNAWAY_VALUE)
+
+# Последние горизонтали: белые защищают строку 7, черные - строку 0
+WHITE_BACK_RANK = 0xF0000000
+BLACK_BACK_RANK = 0x0000000F
+# Четыре центральных поля в строках 3 и 4
+CENTRE_MASK = SQUARE_BITS[13] | SQUARE_BITS[14] | SQUARE_BITS[17] | SQUARE_BITS[18]
+# Проходные шашки ищутся только в половине доски ближе к превращению
+WHITE_RUNAWAY_ZONE = 0x0000FFF0
+BLACK_RUNAWAY_ZONE = 0x0FFF0000
+
+
+def _build_cones(kind: int) -> Tuple[int, ...]:
+    """Для каждого поля - маска полей, куда шашка вида kind может дойти простыми ходами"""
+    cones = []
+    for index in range(NUM_SQUARES):
+        cone = 0
+        frontier = [index]
+        while frontier:
+            square = frontier.pop()
+            for step in STEPS_BY_KIND[kind][square]:
+                if not cone & SQUARE_BITS[step]:
+                    cone |= SQUARE_BITS[step]
+                    frontier.append(step)
+        cones.append(cone)
+    return tuple(cones)
+
+
+WHITE_CONES = _build_cones(WHITE_MAN)
+BLACK_CONES = _build_cones(BLACK_MAN)
+
+
+def _runaways(men: int, cones: Tuple[int, ...], occupied: int) -> int:
+    """Число шашек men, перед которыми до поля превращения нет фигур"""
+    count = 0
+    while men:
+        low = men & -men
+        men ^= low
+        if not cones[low.bit_length() - 1] & occupied:
+            count += 1
+    return count
+
+
+def _mobile(position: Position, white: bool) -> int:
+    movers, jumpers = position.mobility(white)
+    return (movers | jumpers).bit_count()
+
+
+def features(position: Position) -> List[int]:
+    """Признаки позиции в порядке FEATURES: разность белых и черных"""
+    white, black = position.white, position.black
+    white_kings = white & position.kings
+    black_kings = black & position.kings
+    white_men = white ^ white_kings
+    black_men = black ^ black_kings
+    occupied = white | black
+    return [
+        white_men.bit_count() - black_men.bit_count(),
+        white_kings.bit_count() - black_kings.bit_count(),
+        (white_men & WHITE_BACK_RANK).bit_count() - (black_men & BLACK_BACK_RANK).bit_count(),
+        (white & CENTRE_MASK).bit_count() - (black & CENTRE_MASK).bit_count(),
+        _mobile(position, True) - _mobile(position, False),
+        (_runaways(white_men & WHITE_RUNAWAY_ZONE, WHITE_CONES, occupied) -
+         _runaways(black_men & BLACK_RUNAWAY_ZONE, BLACK_CONES, occupied)),
+    ]
+
+
+def evaluate(position: Position) -> int:
+    """Оценка позиции с точки зрения стороны, чей ход"""
+    men, kings, back_rank, centre, mobility, runaways = features(position)
+    score = (men * MAN_VALUE + kings * KING_VALUE + back_rank * BACK_RANK_VALUE +
+             centre * CENTRE_VALUE + mobility * MOBILITY_VALUE + runaways * RUNAWAY_VALUE)
+    return score if position.white_to_move else -score
@@ -0,0 +1,174 @@
+"""Партия без графики: позиция, легальные ходы, счет и результат.
+
+GameBoard в Checkers.py оборачивает Game и отвечает только за отрисовку
+и анимацию, поэтому пакетные задачи и анализ на сервере работают с Game
+напрямую, без arcade и без дисплея. Изменения счета, очереди хода и конец
+партии Game сообщает подписчикам (subscribe), так что интерфейсу не нужно
+опрашивать партию каждый кадр. Все ходы записываются в историю
+(history.GameHistory): партию можно отмотать к любому полуходу.
+"""
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence
+
+from checkers_core.history import GameHistory
+from checkers_core.movegen import (
+    generate_legal_moves,
+    move_captures,
+    move_from,
+    move_path,
+    move_to,
+)
+from checkers_core.position import Position
+from checkers_core.wdl import WDL_LOSS, WDL_WIN
+
+if TYPE_CHECKING:
+    from checkers_core.tablebase import Tablebase
+
+# События партии; подписчик получает объект Game
+EVENT_SCORE = "score"  # Взятие: изменились счет и число шашек
+EVENT_TURN = "turn"  # Ход сделан, очередь перешла к другой стороне
+EVENT_GAME_OVER = "game_over"
+EVENT_POSITION = "position"  # Переход по истории: позиция заменена целиком
+
+
+class Game:
+    """Партия: позиция, список легальных ходов, счет взятий и победитель"""
+
+    def __init__(self, position: Optional[Position] = None,
+                 tablebase: Optional["Tablebase"] = None):
+        self.position = position if position is not None else Position.initial()
+        self.history = GameHistory(self.position)
+        # Таблицы эндшпиля: решенная позиция заканчивает партию досрочно
+        self.tablebase = tablebase
+        self.legal_moves = generate_legal_moves(self.position)
+        self.white_score = 0
+        self.black_score = 0
+        self.game_over = False
+        self.winner: Optional[bool] = None  # True - белые, False - черные, None - ничья
+        self._listeners: Dict[str, List[Callable[["Game"], None]]] = {}
+        self.check_game_over()
+
+    @property
+    def current_player(self) -> bool:
+        """True - ходят белые, False - черные"""
+        return self.position.white_to_move
+
+    @property
+    def white_pieces(self) -> int:
+        return self.position.white_count
+
+    @property
+    def black_pieces(self) -> int:
+        return self.position.black_count
+
+    def subscribe(self, event: str, callback: Callable[["Game"], None]):
+        self._listeners.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable[["Game"], None]):
+        if callback in self._listeners.get(event, ()):
+            self._listeners[event].remove(callback)
+
+    def emit(self, event: str):
+        for callback in self._listeners.get(event, ()):
+            callback(self)
+
+    def moves_from(self, index: int) -> List[int]:
+        """Легальные ходы фигуры с поля index"""
+        return [move for move in self.legal_moves if move_from(move) == index]
+
+    def moves_between(self, from_index: int, to_index: int) -> List[int]:
+        """Легальные ходы с поля from_index на to_index.
+
+        Их может быть несколько: две цепочки взятий начинаются и кончаются на
+        одних полях, но берут разные шашки (например, 18x9x2 и 18x11x2).
+        """
+        return [move for move in self.legal_moves
+                if move_from(move) == from_index and move_to(move) == to_index]
+
+    def find_move(self, from_index: int, to_index: int, via: Sequence[int] = ()) -> Optional[int]:
+        """Единственный легальный ход from_index -> to_index через поля via.
+
+        None, если хода нет или он неоднозначен: тогда промежуточные поля
+        цепочки (move_path) нужно уточнить через via.
+        """
+        candidates = [move for move in self.moves_between(from_index, to_index)
+                      if all(square in move_path(self.position, move)[1:-1] for square in via)]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def play(self, move: int) -> List[int]:
+        """Применение легального хода; возвращает путь фигуры по полям"""
+        path = move_path(self.position, move)
+        captured = move_captures(move).bit_count()
+        if self.position.white_to_move:
+            self.white_score += captured
+        else:
+            self.black_score += captured
+
+        self.position.make_move(move)
+        self.history.push(move, self.position)
+        self.legal_moves = generate_legal_moves(self.position, self.legal_moves)
+        if captured:
+            self.emit(EVENT_SCORE)
+        self.emit(EVENT_TURN)
+        self.check_game_over()
+        return path
+
+    def seek(self, ply: int):
+        """Переход к позиции после ply полуходов; счет и конец партии пересчитываются"""
+        self.position = self.history.seek(ply)
+        start = self.history.start_position()
+        self.white_score = start.black_count - self.position.black_count
+        self.black_score = start.white_count - self.position.white_count
+        self.legal_moves = generate_legal_moves(self.position, self.legal_moves)
+        self.game_over = False
+        self.winner = None
+        self.emit(EVENT_POSITION)
+        self.emit(EVENT_SCORE)
+        self.emit(EVENT_TURN)
+        self.check_game_over()
+
+    def undo(self) -> bool:
+        """Отмена последнего хода; False, если отменять нечего"""
+        if not self.history.can_undo:
+            return False
+        self.seek(self.history.ply - 1)
+        return True
+
+    def redo(self) -> bool:
+        """Повтор отмененного хода; False, если повторять нечего"""
+        if not self.history.can_redo:
+            return False
+        self.seek(self.history.ply + 1)
+        return True
+
+    def has_legal_moves(self) -> bool:
+        """Есть ли ходы у стороны, чей ход: маски подвижности позиции за O(1).
+
+        Запись таблицы транспозиций поиска здесь не проверяется: ответ по
+        маскам дешевле пробы таблицы и не зависит от того, что в ней лежит,
+        поэтому check_game_over не делит таблицу с поиском.
+        """
+        return self.position.has_moves()
+
+    def check_game_over(self):
+        was_over = self.game_over
+        if self.white_pieces == 0:
+            self.game_over = True
+            self.winner = False
+        elif self.black_pieces == 0:
+            self.game_over = True
+            self.winner = True
+        # Проверка наличия ходов
+        elif not self.has_legal_moves():
+            self.game_over = True
+            self.winner = not self.current_player
+        elif self.tablebase is not None:
+            result = self.tablebase.probe(self.position)
+            if result is not None:
+                self.game_over = True
+                if result == WDL_WIN:
+                    self.winner = self.current_player
+                elif result == WDL_LOSS:
+                    self.winner = not self.current_player
+        if self.game_over and not was_over:
+            self.emit(EVENT_GAME_OVER)
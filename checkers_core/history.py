@@ -0,0 +1,98 @@
+"""История партии: все ходы и контрольные позиции для быстрого перехода к любому полуходу.
+
+Каждые checkpoint_interval полуходов сохраняется упакованная позиция
+(Position.pack - одно целое число). Позиция на полуходе ply - ближайшая
+контрольная точка не дальше ply плюс не больше checkpoint_interval - 1
+ходов, поэтому время перехода не растет с длиной партии. Отмена и повтор
+хода - тот же переход на полуход назад или вперед; новый ход после
+отмены отбрасывает отмененное продолжение.
+
+Время перехода на партиях из архива: python -m checkers_core.records games.ckg --seek
+"""
+
+from typing import List, Optional
+
+from checkers_core.position import Position
+
+DEFAULT_CHECKPOINT_INTERVAL = 16
+
+
+class GameHistory:
+    """Ходы партии, текущий полуход и контрольные позиции"""
+
+    def __init__(self, start: Optional[Position] = None,
+                 checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        if checkpoint_interval < 1:
+            raise ValueError(f"checkpoint interval must be positive, got {checkpoint_interval}")
+        start = start if start is not None else Position.initial()
+        self.checkpoint_interval = checkpoint_interval
+        self.moves: List[int] = []
+        # checkpoints[i] - позиция после i * checkpoint_interval полуходов
+        self.checkpoints: List[int] = [start.pack()]
+        self.ply = 0
+
+    @classmethod
+    def from_moves(cls, moves: List[int], start: Optional[Position] = None,
+                   checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL) -> "GameHistory":
+        """История готовой партии (например, из архива) с курсором в конце"""
+        history = cls(start, checkpoint_interval)
+        position = history.start_position()
+        for move in moves:
+            position.make_move(move)
+            history.push(move, position)
+        return history
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def start_position(self) -> Position:
+        return Position.unpack(self.checkpoints[0])
+
+    @property
+    def can_undo(self) -> bool:
+        return self.ply > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self.ply < len(self.moves)
+
+    @property
+    def at_end(self) -> bool:
+        """Курсор на последнем сделанном ходе: партию можно продолжать"""
+        return self.ply == len(self.moves)
+
+    def push(self, move: int, position: Position):
+        """Запись хода, после которого получилась позиция position.
+
+        Если курсор не в конце, отмененное продолжение отбрасывается.
+        """
+        if self.ply < len(self.moves):
+            del self.moves[self.ply:]
+            del self.checkpoints[self.ply // self.checkpoint_interval + 1:]
+        self.moves.append(move)
+        self.ply += 1
+        if self.ply % self.checkpoint_interval == 0:
+            self.checkpoints.append(position.pack())
+
+    def position_at(self, ply: int) -> Position:
+        """Позиция после ply полуходов: контрольная точка и меньше checkpoint_interval ходов"""
+        if not 0 <= ply <= len(self.moves):
+            raise IndexError(f"ply {ply} is out of range 0-{len(self.moves)}")
+        checkpoint = ply // self.checkpoint_interval
+        position = Position.unpack(self.checkpoints[checkpoint])
+        for move in self.moves[checkpoint * self.checkpoint_interval:ply]:
+            position.make_move(move)
+        return position
+
+    def seek(self, ply: int) -> Position:
+        """Перевод курсора на полуход ply; возвращает позицию на нем"""
+        position = self.position_at(ply)
+        self.ply = ply
+        return position
+
+    def undo(self) -> Position:
+        return self.seek(self.ply - 1)
+
+    def redo(self) -> Position:
+        return self.seek(self.ply + 1)
+
@@ -0,0 +1,194 @@
+"""Генерация всех легальных ходов стороны.
+
+Взятие обязательно, цепочка взятий продолжается до конца. Простая шашка
+бьет и ходит только вперед, дамка - на одно поле в любую сторону.
+Шашка, дошедшая до последней строки во время взятия, становится дамкой,
+и на этом ход заканчивается.
+
+Ход кодируется одним целым числом:
+    биты 0-4   - поле, откуда идет фигура
+    биты 5-9   - поле, куда она приходит
+    бит 10     - превращение в дамку
+    биты 11-42 - маска взятых фигур
+"""
+
+from itertools import islice
+from typing import List
+
+from checkers_core.position import (
+    BLACK_MAN,
+    BLACK_PROMOTION_MASK,
+    JUMPS_BY_KIND,
+    KING,
+    MOVE_CAPTURE_SHIFT,
+    MOVE_PROMOTION,
+    MOVE_SQUARE_MASK,
+    MOVE_TO_SHIFT,
+    SQUARE_BITS,
+    STEPS_BY_KIND,
+    WHITE_MAN,
+    WHITE_PROMOTION_MASK,
+    Position,
+)
+
+MAX_MOVES = 128
+
+
+def encode_move(from_index: int, to_index: int, captured: int = 0, promotion: bool = False) -> int:
+    move = from_index | (to_index << MOVE_TO_SHIFT) | (captured << MOVE_CAPTURE_SHIFT)
+    if promotion:
+        move |= MOVE_PROMOTION
+    return move
+
+
+def move_from(move: int) -> int:
+    return move & MOVE_SQUARE_MASK
+
+
+def move_to(move: int) -> int:
+    return (move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK
+
+
+def move_captures(move: int) -> int:
+    """Маска взятых фигур"""
+    return move >> MOVE_CAPTURE_SHIFT
+
+
+def is_capture(move: int) -> bool:
+    return move >> MOVE_CAPTURE_SHIFT != 0
+
+
+def is_promotion(move: int) -> bool:
+    return bool(move & MOVE_PROMOTION)
+
+
+class MoveList:
+    """Плоский заранее выделенный список ходов"""
+
+    __slots__ = ("moves", "count")
+
+    def __init__(self, capacity: int = MAX_MOVES):
+        self.moves = [0] * capacity
+        self.count = 0
+
+    def clear(self):
+        self.count = 0
+
+    def add(self, move: int):
+        self.moves[self.count] = move
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        if not -self.count <= index < self.count:
+            raise IndexError("move list index out of range")
+        return self.moves[index % self.count]
+
+    def __iter__(self):
+        return islice(self.moves, self.count)
+
+    def __contains__(self, move: int) -> bool:
+        return move in islice(self.moves, self.count)
+
+    def __repr__(self):
+        return f"MoveList({list(self)})"
+
+
+def _add_jumps(move_list: MoveList, origin: int, square: int, kind: int, enemies: int,
+               empty: int, captured: int, promotion_mask: int) -> bool:
+    """Рекурсивный поиск цепочек взятий с поля square; True, если взятие было"""
+    found = False
+    for over, landing in JUMPS_BY_KIND[kind][square]:
+        over_bit = SQUARE_BITS[over]
+        landing_bit = SQUARE_BITS[landing]
+        if not (enemies & over_bit) or captured & over_bit or not (empty & landing_bit):
+            continue
+        found = True
+        chain = captured | over_bit
+        if kind != KING and landing_bit & promotion_mask:
+            # Превращение в дамку завершает ход
+            move_list.add(origin | (landing << MOVE_TO_SHIFT) | MOVE_PROMOTION |
+                          (chain << MOVE_CAPTURE_SHIFT))
+        elif not _add_jumps(move_list, origin, landing, kind, enemies,
+                            empty, chain, promotion_mask):
+            move = origin | (landing << MOVE_TO_SHIFT) | (chain << MOVE_CAPTURE_SHIFT)
+            # Дамка может прийти к одному результату разными путями
+            if kind != KING or move not in move_list:
+                move_list.add(move)
+    return found
+
+
+def generate_legal_moves(position: Position, move_list: MoveList = None) -> MoveList:
+    """Все полные ходы стороны, чей ход: сначала взятия, иначе простые ходы"""
+    if move_list is None:
+        move_list = MoveList()
+    else:
+        move_list.clear()
+
+    if position.white_to_move:
+        own, enemies = position.white, position.black
+        man_kind, promotion_mask = WHITE_MAN, WHITE_PROMOTION_MASK
+    else:
+        own, enemies = position.black, position.white
+        man_kind, promotion_mask = BLACK_MAN, BLACK_PROMOTION_MASK
+    kings = position.kings
+    empty = position.empty
+    # Обходим только фигуры, у которых по маскам подвижности есть ход
+    movers, jumpers = position.mobility()
+
+    # Взятия
+    pieces = jumpers
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        square = low.bit_length() - 1
+        kind = KING if kings & low else man_kind
+        _add_jumps(move_list, square, square, kind, enemies, empty | low, 0, promotion_mask)
+    if move_list.count:
+        return move_list
+
+    # Простые ходы
+    pieces = movers
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        square = low.bit_length() - 1
+        kind = KING if kings & low else man_kind
+        for target in STEPS_BY_KIND[kind][square]:
+            target_bit = SQUARE_BITS[target]
+            if empty & target_bit:
+                move = square | (target << MOVE_TO_SHIFT)
+                if kind != KING and target_bit & promotion_mask:
+                    move |= MOVE_PROMOTION
+                move_list.add(move)
+    return move_list
+
+
+def move_path(position: Position, move: int) -> List[int]:
+    """Поля, через которые проходит фигура при ходе (для анимации и записи)"""
+    origin = move_from(move)
+    target = move_to(move)
+    captured = move_captures(move)
+    if not captured:
+        return [origin, target]
+
+    kind = position.piece_kind(origin)
+    empty = position.empty | SQUARE_BITS[origin]
+
+    def search(square, remaining):
+        if not remaining:
+            return [square] if square == target else None
+        for over, landing in JUMPS_BY_KIND[kind][square]:
+            over_bit = SQUARE_BITS[over]
+            if remaining & over_bit and empty & SQUARE_BITS[landing]:
+                rest = search(landing, remaining ^ over_bit)
+                if rest is not None:
+                    return [square] + rest
+        return None
+
+    path = search(origin, captured)
+    if path is None:
+        raise ValueError(f"move {move} is not playable in {position!r}")
+    return path
@@ -0,0 +1,101 @@
+"""Текстовая запись позиций и ходов в стиле PDN.
+
+Поля нумеруются от 1 до 32: номер поля равен индексу битборда плюс один,
+черные начинают на полях 1-12, белые - на полях 21-32.
+Позиция (FEN): "W:W21,22,K30:B1,2,3" - очередь хода, затем белые и черные
+фигуры, дамки с префиксом K. Ход: "22-18" или "26x17x10" для взятий.
+"""
+
+from typing import Optional
+
+from checkers_core.movegen import generate_legal_moves, move_captures, move_path
+from checkers_core.position import NUM_SQUARES, SQUARE_BITS, Position
+
+
+def square_number(index: int) -> int:
+    return index + 1
+
+
+def square_from_number(number: int) -> int:
+    if not 1 <= number <= NUM_SQUARES:
+        raise ValueError(f"square number {number} is out of range 1-{NUM_SQUARES}")
+    return number - 1
+
+
+def position_to_fen(position: Position) -> str:
+    parts = ["W" if position.white_to_move else "B"]
+    for colour, pieces in (("W", position.white), ("B", position.black)):
+        squares = []
+        for index in range(NUM_SQUARES):
+            if pieces & SQUARE_BITS[index]:
+                prefix = "K" if position.kings & SQUARE_BITS[index] else ""
+                squares.append(f"{prefix}{square_number(index)}")
+        parts.append(colour + ",".join(squares))
+    return ":".join(parts)
+
+
+def position_from_fen(fen: str) -> Position:
+    """Разбор FEN; диапазоны вида 1-12 тоже допускаются"""
+    fields = fen.strip().strip('"').rstrip(".").split(":")
+    if not fields or fields[0].upper() not in ("W", "B"):
+        raise ValueError(f"bad FEN side to move: {fen!r}")
+    white_to_move = fields[0].upper() == "W"
+
+    masks = {"W": 0, "B": 0}
+    kings = 0
+    for field in fields[1:]:
+        field = field.strip()
+        if not field:
+            continue
+        colour = field[0].upper()
+        if colour not in masks:
+            raise ValueError(f"bad FEN colour in {field!r}")
+        for token in field[1:].split(","):
+            token = token.strip()
+            if not token:
+                continue
+            is_king = token[0].upper() == "K"
+            if is_king:
+                token = token[1:]
+            if "-" in token:
+                first, last = (int(part) for part in token.split("-"))
+            else:
+                first = last = int(token)
+            for number in range(first, last + 1):
+                bit = SQUARE_BITS[square_from_number(number)]
+                masks[colour] |= bit
+                if is_king:
+                    kings |= bit
+    if masks["W"] & masks["B"]:
+        raise ValueError(f"FEN puts both colours on one square: {fen!r}")
+    return Position(masks["W"], masks["B"], kings, white_to_move)
+
+
+def format_move(position: Position, move: int) -> str:
+    """Запись хода в позиции, где он еще не сделан"""
+    path = move_path(position, move)
+    separator = "x" if move_captures(move) else "-"
+    return separator.join(str(square_number(index)) for index in path)
+
+
+def parse_move(position: Position, text: str) -> Optional[int]:
+    """Легальный ход по записи "a-b", "axbxc" или сокращенной "axc"; None, если хода нет"""
+    text = text.strip().rstrip("*!?")
+    separator = "x" if "x" in text.lower() else "-"
+    try:
+        squares = [square_from_number(int(part)) for part in text.lower().split(separator)]
+    except ValueError:
+        return None
+    if len(squares) < 2:
+        return None
+
+    candidates = []
+    for move in generate_legal_moves(position):
+        path = move_path(position, move)
+        if path[0] != squares[0] or path[-1] != squares[-1]:
+            continue
+        if len(squares) > 2 and path != squares:
+            continue
+        candidates.append(move)
+    # Сокращенная запись неоднозначна, если ей подходит несколько ходов
+    return candidates[0] if len(candidates) == 1 else None
@@ -0,0 +1,191 @@
+"""Параллельный поиск Lazy SMP на пуле процессов.
+
+Все процессы ищут одну и ту же позицию с итеративным углублением и делят
+таблицу транспозиций в multiprocessing.shared_memory. Процесс 0 проходит
+все глубины подряд, остальные пропускают глубины по своему номеру
+(таблицы SKIP_SIZE и SKIP_PHASE): каждый процесс в группе идет по своему
+расписанию глубин, поэтому они расходятся по дереву и заполняют таблицу
+результатами друг для друга. Процесс, закончивший поиск, останавливает
+остальных. Ход берется из самого глубокого завершенного поиска, при равной
+глубине - у процесса 0: у вспомогательных процессов пропущены глубины и
+другие окна, и наибольшая оценка среди них смещена в сторону оптимизма. Позиция передается в упакованном виде (Position.pack).
+
+Замер узлов в секунду и времени до заданной глубины от 1 до N процессов:
+    python -m checkers_core.parallel --workers 8 --depth 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+from checkers_core.movegen import generate_legal_moves
+from checkers_core.position import Position
+from checkers_core.search import MAX_PLY, Searcher, SearchResult
+from checkers_core.tt import (
+    DEFAULT_SIZE_MB,
+    attach_shared_table,
+    close_shared_table,
+    create_shared_table,
+)
+
+# Расписание глубин вспомогательных процессов: процесс i > 0 берет строку
+# (i - 1) % 20 и пропускает глубину d, если (d + фаза) // размер нечетно.
+# Группы по 2, 4, 6 и 8 процессов со сдвинутыми фазами не повторяют друг друга
+SKIP_SIZE = (1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4)
+SKIP_PHASE = (0, 1, 0, 1, 2, 3, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5, 6, 7)
+# Поиск на заданную глубину без ограничения времени
+UNLIMITED_TIME_MS = 10 ** 9
+
+# Состояние процесса пула (сегмент держим, чтобы буфер таблицы оставался жив)
+_shared_memory: Optional[shared_memory.SharedMemory] = None
+_searcher: Optional[Searcher] = None
+_stop = None
+
+
+def _init_worker(shm_name: str, tt_size_mb: float, stop):
+    global _shared_memory, _searcher, _stop
+    tt, _shared_memory = attach_shared_table(shm_name, tt_size_mb)
+    _searcher = Searcher(tt=tt)
+    _stop = stop
+
+
+def skip_schedule(worker_index: int) -> Tuple[int, int]:
+    """Размер и фаза пропуска глубин процесса; процесс 0 не пропускает ничего"""
+    if worker_index == 0:
+        return 0, 0
+    row = (worker_index - 1) % len(SKIP_SIZE)
+    return SKIP_SIZE[row], SKIP_PHASE[row]
+
+
+def _smp_task(worker_index: int, packed_position: int, time_limit_ms: int,
+              max_depth: int, generation: int) -> SearchResult:
+    """Поиск одного процесса по его расписанию глубин"""
+    _searcher.reset()
+    _searcher.tt.generation = generation
+    skip_size, skip_phase = skip_schedule(worker_index)
+    result = _searcher.search(Position.unpack(packed_position), time_limit_ms, max_depth,
+                              should_stop=_stop.is_set, skip_size=skip_size, skip_phase=skip_phase)
+    if not _searcher.stopped:
+        # Поиск дошел до max_depth или нашел выигрыш - остальным искать незачем
+        _stop.set()
+    return result
+
+
+class ParallelSearcher:
+    """Lazy SMP: несколько процессов с общей таблицей транспозиций"""
+
+    def __init__(self, workers: Optional[int] = None, tt_size_mb: float = DEFAULT_SIZE_MB):
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_size_mb = tt_size_mb
+
+        self.tt, self._shared_memory = create_shared_table(tt_size_mb)
+        context = multiprocessing.get_context()
+        self._stop = context.Event()
+        self._pool = context.Pool(
+            self.workers, initializer=_init_worker,
+            initargs=(self._shared_memory.name, tt_size_mb, self._stop),
+        )
+
+    def search(self, position: Position, time_limit_ms: int, max_depth: int = MAX_PLY) -> SearchResult:
+        """Ход самого глубокого завершенного поиска; при равной глубине - процесса 0"""
+        self._stop.clear()
+        self.tt.new_search()
+        packed = position.pack()
+        pending = [
+            self._pool.apply_async(_smp_task, (index, packed, time_limit_ms, max_depth, self.tt.generation))
+            for index in range(self.workers)
+        ]
+        results = [result.get() for result in pending]
+        # Результаты идут по номеру процесса, max берет первый из равных
+        best = max(results, key=lambda result: result.depth)
+        return best._replace(nodes=sum(result.nodes for result in results),
+                             elapsed=max(result.elapsed for result in results))
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+        close_shared_table(self.tt, self._shared_memory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def benchmark_positions(count: int = 4, seed: int = 1) -> List[Position]:
+    """Начальная позиция и несколько позиций после случайных дебютных ходов"""
+    rng = random.Random(seed)
+    positions = [Position.initial()]
+    while len(positions) < count:
+        position = Position.initial()
+        for _ in range(rng.randint(6, 16)):
+            moves = list(generate_legal_moves(position))
+            if not moves:
+                break
+            position.make_move(rng.choice(moves))
+        if generate_legal_moves(position).count:
+            positions.append(position.copy())
+    return positions
+
+
+def benchmark(max_workers: int, depth: int, tt_size_mb: float = DEFAULT_SIZE_MB,
+              positions: int = 4):
+    """Узлы в секунду, время до глубины depth и их рост относительно одного процесса.
+
+    Сумма узлов в секунду показывает, насколько процессы загружены, но не
+    пользу Lazy SMP: процессы могут повторять одну и ту же работу. Поэтому
+    рядом выводится ускорение по времени, за которое первый из процессов
+    завершает поиск на глубину depth.
+    """
+    test_positions = benchmark_positions(positions)
+    worker_counts = sorted({1, max_workers} | {1 << power for power in range(max_workers.bit_length())
+                                               if 1 << power <= max_workers})
+    baseline = None
+    baseline_rate = 0.0
+    print(f"{'процессы':>9} {'узлов/с':>12} {'рост':>6} {'время, с':>10} {'ускорение':>10} "
+          f"{'узлов':>12} {'совпало ходов':>14}")
+    reference: List[int] = []
+    for workers in worker_counts:
+        with ParallelSearcher(workers, tt_size_mb) as searcher:
+            # Первый поиск прогревает процессы пула
+            searcher.search(Position.initial(), 50)
+            nodes = 0
+            elapsed = 0.0
+            moves = []
+            for position in test_positions:
+                searcher.tt.clear()
+                start = time.perf_counter()
+                result = searcher.search(position, UNLIMITED_TIME_MS, depth)
+                elapsed += time.perf_counter() - start
+                nodes += result.nodes
+                moves.append(result.move)
+        rate = nodes / elapsed if elapsed else 0.0
+        if baseline is None:
+            baseline = elapsed
+            baseline_rate = rate
+            reference = moves
+        same = sum(move == expected for move, expected in zip(moves, reference))
+        print(f"{workers:>9} {rate:>12.0f} {rate / baseline_rate if baseline_rate else 0:>6.2f} "
+              f"{elapsed:>10.2f} {baseline / elapsed if elapsed else 0:>10.2f} "
+              f"{nodes:>12} {same:>8}/{len(test_positions)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер параллельного поиска Lazy SMP")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="максимальное число процессов")
+    parser.add_argument("--depth", type=int, default=10, help="глубина поиска каждой позиции")
+    parser.add_argument("--tt-mb", type=float, default=DEFAULT_SIZE_MB,
+                        help="размер общей таблицы транспозиций, МБ")
+    parser.add_argument("--positions", type=int, default=4, help="число тестовых позиций")
+    args = parser.parse_args()
+    benchmark(args.workers, args.depth, args.tt_mb, args.positions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""Импорт и экспорт партий в PDN (Portable Draughts Notation).
+
+Чтение потоковое: файл читается построчно, в памяти только текущая
+партия, поэтому базы в гигабайты проходятся в постоянной памяти. Каждый
+ход сверяется с генератором легальных ходов; номера полей и FEN - как в
+notation.py. Комментарии {...}, варианты (...) и оценки $N пропускаются.
+
+Номера полей notation.py совпадают со стандартным PDN английских шашек
+(GameType 21): черные на полях 1-12, белые на 21-32. Отличается только
+очередь первого хода: по стандарту первыми ходят черные, а в этой игре -
+белые. Поэтому партия без тега FEN начинается с хода черных, а при
+экспорте всегда пишутся теги GameType и FEN начальной позиции.
+
+    python -m checkers_core.pdn games.pdn
+    python -m checkers_core.pdn games.ckg --export games.pdn
+    python -m checkers_core.pdn games.pdn --archive games.ckg
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from checkers_core.movegen import MoveList, generate_legal_moves, move_from, move_path, move_to
+from checkers_core.notation import format_move, position_from_fen, position_to_fen, square_from_number
+from checkers_core.position import (
+    BLACK_MAN,
+    BLACK_PROMOTION_MASK,
+    KING,
+    MOVE_PROMOTION,
+    MOVE_TO_SHIFT,
+    SQUARE_BITS,
+    STEPS_BY_KIND,
+    WHITE_MAN,
+    WHITE_PROMOTION_MASK,
+    Position,
+)
+from checkers_core.records import (
+    REASON_UNKNOWN,
+    REASONS,
+    RESULT_BLACK_WIN,
+    RESULT_DRAW,
+    RESULT_UNFINISHED,
+    RESULT_WHITE_WIN,
+    GameArchive,
+    GameRecord,
+    GameWriter,
+)
+
+# Результаты в записи стоклеточных шашек (2 очка за победу) тоже встречаются в базах
+RESULT_TOKENS = {
+    RESULT_WHITE_WIN: RESULT_WHITE_WIN,
+    RESULT_BLACK_WIN: RESULT_BLACK_WIN,
+    RESULT_DRAW: RESULT_DRAW,
+    RESULT_UNFINISHED: RESULT_UNFINISHED,
+    "2-0": RESULT_WHITE_WIN,
+    "0-2": RESULT_BLACK_WIN,
+    "1-1": RESULT_DRAW,
+}
+
+# Английские шашки в PDN и их начальная позиция: первыми ходят черные
+GAME_TYPE = "21"
+STANDARD_START_FEN = "B:W21-32:B1-12"
+_STANDARD_START = position_from_fen(STANDARD_START_FEN).pack()
+_INITIAL = Position.initial().pack()
+
+# Порядок обязательных тегов при записи
+TAG_ORDER = ("Event", "White", "Black", "Result", "GameType")
+LINE_WIDTH = 79
+
+_TAG_RE = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Результат, номер хода (12. или 12...), ход, оценка $N или одиночный символ
+_TOKEN_RE = re.compile(r"(?:1/2-1/2|[012]-[012])(?![-x\d])|\d+\.+|\d+(?:[-x]\d+)+[*!?]*|\$\d+|\S")
+_MOVE_NUMBER_RE = re.compile(r"\d+\.+$")
+
+
+class PdnGame(NamedTuple):
+    tags: Dict[str, str]
+    moves: List[int]
+    result: str
+    # Начальная позиция (Position.pack) или None для начальной расстановки
+    start: Optional[int] = None
+
+    def start_position(self) -> Position:
+        return Position.unpack(self.start) if self.start is not None else Position.initial()
+
+    def positions(self) -> Iterator[Tuple[Position, int]]:
+        """Позиции перед каждым ходом партии и сам ход.
+
+        Отдается один и тот же объект Position, ход делается после
+        возврата управления; для хранения позицию нужно копировать.
+        """
+        position = self.start_position()
+        for move in self.moves:
+            yield position, move
+            position.make_move(move)
+
+    def to_record(self) -> GameRecord:
+        """Партия для двоичного архива; зерно и причина окончания берутся из тегов, если они есть"""
+        seed = self.tags.get("Seed", "0")
+        reason = self.tags.get("Termination", REASON_UNKNOWN)
+        return GameRecord(self.tags.get("White", "?"), self.tags.get("Black", "?"),
+                          int(seed) if seed.lstrip("-").isdigit() else 0, self.moves, self.result,
+                          reason if reason in REASONS else REASON_UNKNOWN, self.start)
+
+
+def _unescape(value: str) -> str:
+    return value.replace('\\"', '"').replace("\\\\", "\\")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def match_move(position: Position, text: str, moves: MoveList) -> Optional[int]:
+    """Легальный ход по записи, как notation.parse_move, но со своим списком ходов.
+
+    Простой ход проверяется по маскам подвижности без генерации списка;
+    путь взятия строится, только если запись полная (с промежуточными
+    полями).
+    """
+    text = text.rstrip("*!?")
+    separator = "x" if "x" in text else "-"
+    try:
+        squares = [square_from_number(int(part)) for part in text.split(separator)]
+    except ValueError:
+        return None
+    if len(squares) < 2:
+        return None
+    if separator == "-":
+        return _quiet_move(position, squares)
+
+    generate_legal_moves(position, moves)
+    found = None
+    for index in range(moves.count):
+        move = moves.moves[index]
+        if move_from(move) != squares[0] or move_to(move) != squares[-1]:
+            continue
+        if len(squares) > 2 and move_path(position, move) != squares:
+            continue
+        if found is not None:
+            # Неполная запись подходит нескольким ходам: уточняем по пути
+            return None
+        found = move
+    return found
+
+
+def _quiet_move(position: Position, squares: List[int]) -> Optional[int]:
+    """Простой ход, если он легален: у фигуры есть ход, а взятий у стороны нет"""
+    if len(squares) != 2:
+        return None
+    origin, target = squares
+    movers, jumpers = position.mobility()
+    origin_bit = SQUARE_BITS[origin]
+    if jumpers or not movers & origin_bit or not position.empty & SQUARE_BITS[target]:
+        return None
+    if position.kings & origin_bit:
+        kind = KING
+    else:
+        kind = WHITE_MAN if position.white_to_move else BLACK_MAN
+    if target not in STEPS_BY_KIND[kind][origin]:
+        return None
+    move = origin | (target << MOVE_TO_SHIFT)
+    promotion_mask = WHITE_PROMOTION_MASK if position.white_to_move else BLACK_PROMOTION_MASK
+    if kind != KING and SQUARE_BITS[target] & promotion_mask:
+        move |= MOVE_PROMOTION
+    return move
+
+
+class PdnReader:
+    """Потоковый разбор PDN с проверкой ходов.
+
+    strict=False пропускает партии с нелегальными ходами или плохим FEN
+    (их число - в skipped) вместо исключения ValueError.
+    """
+
+    def __init__(self, stream: TextIO, strict: bool = True):
+        self.stream = stream
+        self.strict = strict
+        self.games = 0
+        self.skipped = 0
+        self._moves = MoveList()
+        self._reset()
+
+    def _reset(self):
+        self.tags: Dict[str, str] = {}
+        self.position: Optional[Position] = None
+        self.start: Optional[int] = None
+        self.moves: List[int] = []
+        self.error: Optional[str] = None
+        self.has_movetext = False
+
+    def _begin(self):
+        """Начальная позиция по тегу FEN при первом ходе партии; без FEN - стандартная"""
+        game_type = self.tags.get("GameType", GAME_TYPE).split(",")[0].strip()
+        if game_type != GAME_TYPE:
+            self.error = f"unsupported GameType {game_type!r}, only English draughts ({GAME_TYPE})"
+            self.position = Position.initial()
+            return
+        fen = self.tags.get("FEN", STANDARD_START_FEN)
+        try:
+            self.position = position_from_fen(fen)
+        except ValueError as error:
+            self.error = f"bad FEN {fen!r}: {error}"
+            self.position = Position.initial()
+            return
+        # Начальная расстановка этой игры хранится в записях как start=None
+        self.start = self.position.pack()
+        if self.start == _INITIAL:
+            self.start = None
+
+    def _finish(self, result: str) -> Optional[PdnGame]:
+        """Готовая партия или None, если она пропущена"""
+        if self.position is None:
+            self._begin()
+        game = None
+        if self.error is None:
+            game = PdnGame(self.tags, self.moves, result, self.start)
+        elif self.strict:
+            raise ValueError(f"game {self.games + self.skipped + 1}: {self.error}")
+        if game is None:
+            self.skipped += 1
+        else:
+            self.games += 1
+        self._reset()
+        return game
+
+    def _play(self, text: str):
+        if self.error is not None:
+            return
+        if self.position is None:
+            self._begin()
+            if self.error is not None:
+                return
+        move = match_move(self.position, text, self._moves)
+        if move is None and not self.moves and "FEN" not in self.tags and "GameType" not in self.tags:
+            # Файлы прежних версий без тегов: партия от начальной расстановки этой игры
+            initial = Position.initial()
+            move = match_move(initial, text, self._moves)
+            if move is not None:
+                self.position = initial
+                self.start = None
+        if move is None:
+            self.error = (f"illegal or ambiguous move {text!r} at ply {len(self.moves) + 1} "
+                          f"in {position_to_fen(self.position)}")
+            return
+        self.position.make_move(move)
+        self.moves.append(move)
+
+    def __iter__(self) -> Iterator[PdnGame]:
+        comment_depth = 0
+        variation_depth = 0
+        for line in self.stream:
+            if comment_depth == 0 and variation_depth == 0:
+                stripped = line.lstrip()
+                if stripped.startswith("["):
+                    # Теги после ходов без результата начинают новую партию
+                    if self.has_movetext:
+                        game = self._finish(RESULT_UNFINISHED)
+                        if game is not None:
+                            yield game
+                    for name, value in _TAG_RE.findall(stripped):
+                        self.tags[name] = _unescape(value)
+                    continue
+                if stripped.startswith("%"):
+                    continue
+
+            for token in _TOKEN_RE.findall(line):
+                if comment_depth:
+                    if token == "}":
+                        comment_depth = 0
+                    continue
+                if token == "{":
+                    comment_depth = 1
+                elif token == "(":
+                    variation_depth += 1
+                elif token == ")":
+                    variation_depth = max(0, variation_depth - 1)
+                elif variation_depth:
+                    continue
+                elif token == ";":
+                    break  # Комментарий до конца строки
+                elif token in RESULT_TOKENS:
+                    game = self._finish(RESULT_TOKENS[token])
+                    if game is not None:
+                        yield game
+                elif token[0].isdigit() and not _MOVE_NUMBER_RE.match(token):
+                    self.has_movetext = True
+                    self._play(token)
+
+        if self.has_movetext or self.tags:
+            game = self._finish(RESULT_TOKENS.get(self.tags.get("Result", ""), RESULT_UNFINISHED))
+            if game is not None:
+                yield game
+
+
+def read_pdn(path: str, strict: bool = True) -> Iterator[PdnGame]:
+    """Потоковое чтение партий PDN из файла"""
+    with open(path, encoding="utf-8", errors="replace") as stream:
+        yield from PdnReader(stream, strict)
+
+
+def movetext(moves: List[int], position: Optional[Position] = None) -> List[str]:
+    """Ходы с номерами: "1. 22-18 10-14 2. ..."; номер стоит перед ходом стороны, начавшей партию"""
+    position = position.copy() if position is not None else Position.initial()
+    first_side = position.white_to_move
+    tokens = []
+    number = 1
+    for move in moves:
+        if position.white_to_move == first_side:
+            tokens.append(f"{number}.")
+        else:
+            number += 1
+        tokens.append(format_move(position, move))
+        position.make_move(move)
+    return tokens
+
+
+def format_game(record: GameRecord, tags: Optional[Dict[str, str]] = None) -> str:
+    """Партия в PDN; tags дополняют или заменяют теги из записи.
+
+    FEN пишется всегда: без него другие программы начнут партию с хода черных.
+    """
+    start = record.start_position()
+    fen = STANDARD_START_FEN if start.pack() == _STANDARD_START else position_to_fen(start)
+    game_tags = {
+        "Event": "Self-play",
+        "White": record.white,
+        "Black": record.black,
+        "Result": record.result,
+        "GameType": GAME_TYPE,
+    }
+    if fen != STANDARD_START_FEN:
+        game_tags["SetUp"] = "1"
+    game_tags["FEN"] = fen
+    game_tags["Seed"] = str(record.seed)
+    if record.reason != REASON_UNKNOWN:
+        game_tags["Termination"] = record.reason
+    if tags:
+        game_tags.update(tags)
+
+    names = [name for name in TAG_ORDER if name in game_tags]
+    names += [name for name in game_tags if name not in TAG_ORDER]
+    lines = [f'[{name} "{_escape(game_tags[name])}"]' for name in names]
+    lines.append("")
+
+    line = ""
+    for token in movetext(record.moves, start) + [game_tags["Result"]]:
+        if line and len(line) + 1 + len(token) > LINE_WIDTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n\n"
+
+
+class PdnWriter:
+    """Партии в файл PDN; тот же интерфейс, что у records.GameWriter"""
+
+    def __init__(self, path: str):
+        self.stream = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, record: GameRecord, tags: Optional[Dict[str, str]] = None) -> int:
+        self.stream.write(format_game(record, tags))
+        self.count += 1
+        return self.count - 1
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Чтение, проверка и преобразование партий PDN")
+    parser.add_argument("path", help="файл PDN (или двоичный архив для --export)")
+    parser.add_argument("--export", metavar="PDN", help="записать партии двоичного архива PATH в PDN")
+    parser.add_argument("--archive", metavar="CKG", help="записать партии PDN в двоичный архив")
+    parser.add_argument("--skip-invalid", action="store_true",
+                        help="пропускать партии с нелегальными ходами вместо ошибки")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.export:
+        with GameArchive(args.path) as archive, PdnWriter(args.export) as writer:
+            for record in archive:
+                writer.write(record)
+        elapsed = time.perf_counter() - start
+        print(f"Партий записано в PDN: {writer.count} за {elapsed:.2f} с, "
+              f"{writer.count / elapsed if elapsed else 0:.0f} партий/с", file=sys.stderr)
+        return
+
+    archive = GameWriter(args.archive) if args.archive else None
+    plies = 0
+    try:
+        with open(args.path, encoding="utf-8", errors="replace") as stream:
+            reader = PdnReader(stream, strict=not args.skip_invalid)
+            try:
+                for game in reader:
+                    plies += len(game.moves)
+                    if archive is not None:
+                        archive.write(game.to_record())
+            except ValueError as error:
+                parser.exit(1, f"{args.path}: {error}\n")
+    finally:
+        if archive is not None:
+            archive.close()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.path)
+    print(f"Партий: {reader.games}, пропущено: {reader.skipped}, полуходов: {plies}")
+    print(f"Разбор с проверкой ходов: {elapsed:.2f} с, {reader.games / elapsed if elapsed else 0:.0f} партий/с, "
+          f"{size / elapsed / 2 ** 20 if elapsed else 0:.1f} МБ/с")
+
+
+if __name__ == "__main__":
+    main()
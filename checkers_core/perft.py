@@ -0,0 +1,126 @@
+"""perft: подсчет листьев дерева ходов до заданной глубины.
+
+Проверка корректности и скорости генератора ходов. Эталон для начальной
+расстановки - известные значения perft английских шашек; для остальных
+позиций значения сверены с независимой реализацией правил на сетке клеток.
+
+    python -m checkers_core.perft --depth 7
+    python -m checkers_core.perft --fen "W:WK18,27:B14,22" --depth 5 --divide
+    python -m checkers_core.perft --verify
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Tuple
+
+from checkers_core.movegen import MoveList, generate_legal_moves
+from checkers_core.notation import format_move, position_from_fen, position_to_fen
+from checkers_core.position import Position
+
+INITIAL_FEN = "W:W21-32:B1-12"
+
+# (FEN, {глубина: число листьев})
+REFERENCE_POSITIONS = [
+    # Начальная расстановка
+    (INITIAL_FEN, {1: 7, 2: 49, 3: 302, 4: 1469, 5: 7361, 6: 36768, 7: 179740, 8: 845931}),
+    # Дамки в центре, взятия дамками во все стороны
+    ("W:WK14,K19,26,27,30:BK10,K23,6,7,16",
+     {1: 2, 2: 4, 3: 12, 4: 43, 5: 275, 6: 1696, 7: 10033}),
+    # Многоходовые цепочки взятий с развилками и превращением в конце цепочки
+    ("W:W27,28,30,31,32:B6,7,15,16,22,23,24",
+     {1: 5, 2: 38, 3: 76, 4: 351, 5: 1291, 6: 5110, 7: 23680}),
+    # Середина партии: двойное взятие с превращением в дамку
+    ("B:WK3,17,25,26,27,28,29,30,32:B1,2,4,5,11,13,14,20",
+     {1: 2, 2: 16, 3: 91, 4: 449, 5: 2551, 6: 12461, 7: 67096}),
+    # Эндшпиль дамок
+    ("W:WK5,K28:BK13,K17,K32",
+     {1: 3, 2: 12, 3: 42, 4: 232, 5: 907, 6: 5008, 7: 20324}),
+]
+
+
+class Perft:
+    """perft со списками ходов, выделенными заранее на каждую глубину"""
+
+    def __init__(self, max_depth: int = 64):
+        self.move_lists = [MoveList() for _ in range(max_depth + 1)]
+
+    def count(self, position: Position, depth: int, ply: int = 0) -> int:
+        moves = generate_legal_moves(position, self.move_lists[ply])
+        if depth <= 1:
+            return moves.count if depth == 1 else 1
+        nodes = 0
+        for index in range(moves.count):
+            move = moves.moves[index]
+            position.make_move(move)
+            nodes += self.count(position, depth - 1, ply + 1)
+            position.unmake_move(move)
+        return nodes
+
+    def divide(self, position: Position, depth: int) -> List[Tuple[str, int]]:
+        """Число листьев отдельно для каждого хода из корня"""
+        result = []
+        for move in list(generate_legal_moves(position)):
+            notation = format_move(position, move)
+            position.make_move(move)
+            result.append((notation, self.count(position, depth - 1, 1) if depth > 1 else 1))
+            position.unmake_move(move)
+        return result
+
+
+def perft(position: Position, depth: int) -> int:
+    return Perft(depth).count(position.copy(), depth)
+
+
+def verify(max_depth: int = 8) -> bool:
+    """Сверка с эталонными значениями; True, если все совпало"""
+    counter = Perft()
+    ok = True
+    for fen, expected in REFERENCE_POSITIONS:
+        position = position_from_fen(fen)
+        for depth, reference in sorted(expected.items()):
+            if depth > max_depth:
+                continue
+            start = time.perf_counter()
+            nodes = counter.count(position, depth)
+            elapsed = time.perf_counter() - start
+            status = "ok" if nodes == reference else f"ОШИБКА, ожидалось {reference}"
+            ok &= nodes == reference
+            print(f"{fen:<40} глубина {depth:>2}: {nodes:>10} {_rate(nodes, elapsed)}  {status}")
+    return ok
+
+
+def _rate(nodes: int, elapsed: float) -> str:
+    return f"{nodes / elapsed:>12.0f} узлов/с" if elapsed > 0 else f"{'-':>12} узлов/с"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подсчет perft для генератора ходов")
+    parser.add_argument("--fen", default=INITIAL_FEN, help="позиция в формате FEN")
+    parser.add_argument("--depth", type=int, default=6, help="глубина подсчета")
+    parser.add_argument("--divide", action="store_true", help="число листьев по каждому ходу из корня")
+    parser.add_argument("--verify", action="store_true", help="сверка с эталонными значениями")
+    parser.add_argument("--max-depth", type=int, default=8,
+                        help="наибольшая глубина эталонов для --verify")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(0 if verify(args.max_depth) else 1)
+
+    position = position_from_fen(args.fen)
+    counter = Perft(args.depth)
+    print(f"Позиция: {position_to_fen(position)}")
+    start = time.perf_counter()
+    if args.divide:
+        split = counter.divide(position, args.depth)
+        for notation, nodes in split:
+            print(f"{notation:<12} {nodes}")
+        total = sum(nodes for _, nodes in split)
+    else:
+        total = counter.count(position, args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"Глубина {args.depth}: {total} листьев за {elapsed:.3f} с, {_rate(total, elapsed).strip()}")
+
+
+if __name__ == "__main__":
+    main()
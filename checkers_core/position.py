@@ -0,0 +1,365 @@
+"""Битбордовое представление позиции в шашках.
+
+Позиция хранится тремя 32-битными масками над тёмными полями доски:
+белые шашки, черные шашки и дамки. Индекс поля равен row * 4 + col // 2,
+где row и col - координаты клетки в сетке GameBoard.
+"""
+
+import random
+from typing import Optional, Tuple
+
+BOARD_SIZE = 8
+NUM_SQUARES = 32
+FULL_MASK = (1 << NUM_SQUARES) - 1
+
+# Диагональные направления (dr, dc)
+DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+# Виды фигур для таблиц ходов
+WHITE_MAN = 0
+BLACK_MAN = 1
+KING = 2
+
+# Белые идут к строке 0, черные - к строке BOARD_SIZE - 1
+KIND_DIRECTIONS = (
+    (0, 1),
+    (2, 3),
+    (0, 1, 2, 3),
+)
+
+# Поля превращения в дамку
+WHITE_PROMOTION_MASK = 0x0000000F
+BLACK_PROMOTION_MASK = 0xF0000000
+
+# Кодирование хода одним целым числом (см. checkers_core.movegen)
+MOVE_SQUARE_MASK = 0x1F
+MOVE_TO_SHIFT = 5
+MOVE_PROMOTION = 1 << 10
+MOVE_CAPTURE_SHIFT = 11
+
+# Начальный размер стека отмены ходов
+UNDO_STACK_SIZE = 256
+
+# Фиксированное зерно: хеши совпадают между запусками и процессами
+ZOBRIST_SEED = 0x5EED
+
+# Начальная расстановка: черные в строках 0-2, белые в строках 5-7
+INITIAL_BLACK = 0x00000FFF
+INITIAL_WHITE = 0xFFF00000
+
+
+def square_index(row: int, col: int) -> int:
+    """Индекс тёмного поля по координатам клетки или -1"""
+    if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and (row + col) % 2 == 1:
+        return row * 4 + col // 2
+    return -1
+
+
+def square_coords(index: int) -> Tuple[int, int]:
+    """Координаты клетки (row, col) по индексу тёмного поля"""
+    row = index // 4
+    col = (index % 4) * 2 + (1 if row % 2 == 0 else 0)
+    return row, col
+
+
+def _build_tables():
+    """Предрасчет таблиц соседей и прыжков для всех полей"""
+    neighbours = []
+    jumps = []
+    for index in range(NUM_SQUARES):
+        row, col = square_coords(index)
+        square_neighbours = []
+        square_jumps = []
+        for dr, dc in DIRECTIONS:
+            neighbour = square_index(row + dr, col + dc)
+            landing = square_index(row + 2 * dr, col + 2 * dc)
+            square_neighbours.append(neighbour)
+            square_jumps.append((neighbour, landing) if landing >= 0 else None)
+        neighbours.append(tuple(square_neighbours))
+        jumps.append(tuple(square_jumps))
+
+    # Те же таблицы, отфильтрованные по виду фигуры
+    steps_by_kind = []
+    jumps_by_kind = []
+    for directions in KIND_DIRECTIONS:
+        steps_by_kind.append(tuple(
+            tuple(neighbours[index][d] for d in directions if neighbours[index][d] >= 0)
+            for index in range(NUM_SQUARES)
+        ))
+        jumps_by_kind.append(tuple(
+            tuple(jumps[index][d] for d in directions if jumps[index][d] is not None)
+            for index in range(NUM_SQUARES)
+        ))
+    return tuple(neighbours), tuple(jumps), tuple(steps_by_kind), tuple(jumps_by_kind)
+
+
+# NEIGHBOURS[index][direction] - соседнее поле или -1
+# JUMPS[index][direction] - пара (перепрыгиваемое поле, поле приземления) или None
+# STEPS_BY_KIND[kind][index] - поля для простого хода фигуры данного вида
+# JUMPS_BY_KIND[kind][index] - пары (перепрыгиваемое поле, поле приземления)
+NEIGHBOURS, JUMPS, STEPS_BY_KIND, JUMPS_BY_KIND = _build_tables()
+SQUARE_BITS = tuple(1 << index for index in range(NUM_SQUARES))
+
+
+def _build_shift_groups():
+    """Группы полей с одинаковым сдвигом индекса до соседа (и до поля приземления)
+    по каждому направлению: по ним ходы всех фигур считаются сдвигами масок"""
+    step_groups = []
+    jump_groups = []
+    for direction in range(len(DIRECTIONS)):
+        steps = {}
+        jumps = {}
+        for index in range(NUM_SQUARES):
+            neighbour = NEIGHBOURS[index][direction]
+            if neighbour >= 0:
+                delta = neighbour - index
+                steps[delta] = steps.get(delta, 0) | SQUARE_BITS[index]
+            jump = JUMPS[index][direction]
+            if jump is not None:
+                deltas = (jump[0] - index, jump[1] - index)
+                jumps[deltas] = jumps.get(deltas, 0) | SQUARE_BITS[index]
+        step_groups.append(tuple((mask, delta) for delta, mask in steps.items()))
+        jump_groups.append(tuple((mask, over, landing) for (over, landing), mask in jumps.items()))
+    return tuple(step_groups), tuple(jump_groups)
+
+
+# STEP_GROUPS[direction] - пары (маска полей, сдвиг до соседа)
+# JUMP_GROUPS[direction] - тройки (маска полей, сдвиг до перепрыгиваемого поля, сдвиг до приземления)
+STEP_GROUPS, JUMP_GROUPS = _build_shift_groups()
+
+
+def _shifted(mask: int, delta: int) -> int:
+    """Маска, в которой бит поля i стоит, если в mask стоит бит поля i + delta"""
+    return mask >> delta if delta > 0 else mask << -delta
+
+
+def mobility_masks(own: int, enemies: int, kings: int, man_kind: int) -> Tuple[int, int]:
+    """Фигуры own с простым ходом и со взятием: несколько сдвигов масок вместо обхода полей"""
+    empty = ~(own | enemies) & FULL_MASK
+    own_kings = own & kings
+    man_directions = KIND_DIRECTIONS[man_kind]
+    movers = 0
+    jumpers = 0
+    for direction in range(len(DIRECTIONS)):
+        pieces = own if direction in man_directions else own_kings
+        if not pieces:
+            continue
+        for mask, delta in STEP_GROUPS[direction]:
+            movers |= pieces & mask & _shifted(empty, delta)
+        for mask, over, landing in JUMP_GROUPS[direction]:
+            jumpers |= pieces & mask & _shifted(enemies, over) & _shifted(empty, landing)
+    return movers, jumpers
+
+
+def _build_zobrist():
+    """Случайные 64-битные ключи Зобриста для каждой фигуры на каждом поле"""
+    rng = random.Random(ZOBRIST_SEED)
+    keys = tuple(
+        tuple(rng.getrandbits(64) for _ in range(NUM_SQUARES))
+        for _ in range(4)
+    )
+    return keys, rng.getrandbits(64)
+
+
+# Ключи: белая шашка, черная шашка, белая дамка, черная дамка; плюс ключ очереди хода
+(ZOBRIST_WHITE_MAN, ZOBRIST_BLACK_MAN,
+ ZOBRIST_WHITE_KING, ZOBRIST_BLACK_KING), ZOBRIST_BLACK_TO_MOVE = _build_zobrist()
+
+
+def compute_hash(white: int, black: int, kings: int, white_to_move: bool) -> int:
+    """Хеш Зобриста позиции, посчитанный с нуля"""
+    key = 0 if white_to_move else ZOBRIST_BLACK_TO_MOVE
+    for pieces, man_keys, king_keys in ((white, ZOBRIST_WHITE_MAN, ZOBRIST_WHITE_KING),
+                                        (black, ZOBRIST_BLACK_MAN, ZOBRIST_BLACK_KING)):
+        while pieces:
+            low = pieces & -pieces
+            pieces ^= low
+            square = low.bit_length() - 1
+            key ^= king_keys[square] if kings & low else man_keys[square]
+    return key
+
+
+class Position:
+    """Позиция на доске: маски белых, черных и дамок плюс очередь хода"""
+
+    __slots__ = ("white", "black", "kings", "white_to_move", "white_count", "black_count",
+                 "hash", "ply", "_undo_kings", "_undo_hashes", "_mobility")
+
+    def __init__(self, white: int = 0, black: int = 0, kings: int = 0, white_to_move: bool = True):
+        self.white = white
+        self.black = black
+        self.kings = kings
+        self.white_to_move = white_to_move
+        self.white_count = white.bit_count()
+        self.black_count = black.bit_count()
+        self.hash = compute_hash(white, black, kings, white_to_move)
+        # Маски подвижности стороны, чей ход; считаются при первом запросе после хода
+        self._mobility: Optional[Tuple[int, int]] = None
+
+        # Стек отмены: маски дамок и хеши до каждого сделанного хода
+        self.ply = 0
+        self._undo_kings = [0] * UNDO_STACK_SIZE
+        self._undo_hashes = [0] * UNDO_STACK_SIZE
+
+    @classmethod
+    def initial(cls) -> "Position":
+        """Начальная расстановка, первыми ходят белые"""
+        return cls(INITIAL_WHITE, INITIAL_BLACK, 0, True)
+
+    def copy(self) -> "Position":
+        """Копия позиции без истории ходов"""
+        return Position(self.white, self.black, self.kings, self.white_to_move)
+
+    def pack(self) -> int:
+        """Упаковка позиции в одно целое число для передачи между процессами"""
+        return (self.white | (self.black << 32) | (self.kings << 64) |
+                (int(self.white_to_move) << 96))
+
+    @classmethod
+    def unpack(cls, packed: int) -> "Position":
+        return cls(packed & FULL_MASK, (packed >> 32) & FULL_MASK,
+                   (packed >> 64) & FULL_MASK, bool(packed >> 96))
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.pack() == other.pack()
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return (f"Position(white=0x{self.white:08x}, black=0x{self.black:08x}, "
+                f"kings=0x{self.kings:08x}, white_to_move={self.white_to_move})")
+
+    @property
+    def occupied(self) -> int:
+        return self.white | self.black
+
+    @property
+    def empty(self) -> int:
+        return ~(self.white | self.black) & FULL_MASK
+
+    def piece_at(self, index: int) -> Optional[Tuple[bool, bool]]:
+        """Фигура на поле в виде (is_white, is_king) или None"""
+        bit = SQUARE_BITS[index]
+        if self.white & bit:
+            return True, bool(self.kings & bit)
+        if self.black & bit:
+            return False, bool(self.kings & bit)
+        return None
+
+    def count(self, is_white: bool) -> int:
+        return self.white_count if is_white else self.black_count
+
+    def piece_kind(self, index: int) -> int:
+        bit = SQUARE_BITS[index]
+        if self.kings & bit:
+            return KING
+        return WHITE_MAN if self.white & bit else BLACK_MAN
+
+    def mobility(self, white: Optional[bool] = None) -> Tuple[int, int]:
+        """Маски (фигуры с простым ходом, фигуры со взятием); по умолчанию - для стороны, чей ход"""
+        if white is None or white == self.white_to_move:
+            if self._mobility is None:
+                self._mobility = self._side_mobility(self.white_to_move)
+            return self._mobility
+        return self._side_mobility(white)
+
+    def _side_mobility(self, white: bool) -> Tuple[int, int]:
+        if white:
+            return mobility_masks(self.white, self.black, self.kings, WHITE_MAN)
+        return mobility_masks(self.black, self.white, self.kings, BLACK_MAN)
+
+    def movable_count(self, white: Optional[bool] = None) -> int:
+        """Число фигур, которые могут сделать ход"""
+        movers, jumpers = self.mobility(white)
+        return (jumpers if jumpers else movers).bit_count()
+
+    def capture_count(self, white: Optional[bool] = None) -> int:
+        """Число фигур, которые обязаны бить"""
+        return self.mobility(white)[1].bit_count()
+
+    def has_moves(self) -> bool:
+        """Есть ли ход у стороны, чей ход; без ходов позиция проиграна"""
+        movers, jumpers = self.mobility()
+        return bool(movers | jumpers)
+
+    def make_move(self, move: int):
+        """Применение хода на месте: фигуры, счетчики, дамки, хеш и очередь хода"""
+        from_index = move & MOVE_SQUARE_MASK
+        to_index = (move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK
+        from_bit = SQUARE_BITS[from_index]
+        to_bit = SQUARE_BITS[to_index]
+        captured = move >> MOVE_CAPTURE_SHIFT
+        # XOR, а не OR: цепочка взятий дамкой может закончиться на исходном поле
+        moved = from_bit ^ to_bit
+        kings = self.kings
+
+        if self.ply == len(self._undo_kings):
+            self._undo_kings.extend([0] * UNDO_STACK_SIZE)
+            self._undo_hashes.extend([0] * UNDO_STACK_SIZE)
+        self._undo_kings[self.ply] = kings
+        self._undo_hashes[self.ply] = self.hash
+        self.ply += 1
+
+        if self.white_to_move:
+            self.white ^= moved
+            if captured:
+                self.black ^= captured
+                self.black_count -= captured.bit_count()
+            man_keys, king_keys = ZOBRIST_WHITE_MAN, ZOBRIST_WHITE_KING
+            enemy_man_keys, enemy_king_keys = ZOBRIST_BLACK_MAN, ZOBRIST_BLACK_KING
+        else:
+            self.black ^= moved
+            if captured:
+                self.white ^= captured
+                self.white_count -= captured.bit_count()
+            man_keys, king_keys = ZOBRIST_BLACK_MAN, ZOBRIST_BLACK_KING
+            enemy_man_keys, enemy_king_keys = ZOBRIST_WHITE_MAN, ZOBRIST_WHITE_KING
+
+        # Инкрементальное обновление хеша
+        key = self.hash ^ ZOBRIST_BLACK_TO_MOVE
+        if kings & from_bit:
+            key ^= king_keys[from_index] ^ king_keys[to_index]
+        elif move & MOVE_PROMOTION:
+            key ^= man_keys[from_index] ^ king_keys[to_index]
+        else:
+            key ^= man_keys[from_index] ^ man_keys[to_index]
+        while captured:
+            low = captured & -captured
+            captured ^= low
+            square = low.bit_length() - 1
+            key ^= enemy_king_keys[square] if kings & low else enemy_man_keys[square]
+        self.hash = key
+
+        kings &= ~(move >> MOVE_CAPTURE_SHIFT)
+        if kings & from_bit:
+            kings ^= moved
+        elif move & MOVE_PROMOTION:
+            kings |= to_bit
+        self.kings = kings
+        self.white_to_move = not self.white_to_move
+        self._mobility = None
+
+    def unmake_move(self, move: int):
+        """Точная отмена хода, сделанного make_move"""
+        moved = SQUARE_BITS[move & MOVE_SQUARE_MASK] ^ SQUARE_BITS[(move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK]
+        captured = move >> MOVE_CAPTURE_SHIFT
+
+        self.white_to_move = not self.white_to_move
+        self._mobility = None
+        self.ply -= 1
+        self.kings = self._undo_kings[self.ply]
+        self.hash = self._undo_hashes[self.ply]
+
+        if self.white_to_move:
+            self.white ^= moved
+            if captured:
+                self.black |= captured
+                self.black_count += captured.bit_count()
+        else:
+            self.black ^= moved
+            if captured:
+                self.white |= captured
+                self.white_count += captured.bit_count()
@@ -0,0 +1,442 @@
+"""Двоичный формат архива партий с потоковым чтением и доступом по номеру.
+
+Файл начинается с заголовка MAGIC + версия и дальше только дописывается
+кадрами партий. Кадр - varint длины и данные: флаги, результат, причина
+окончания, зерно, имена движков, начальная позиция (если не начальная
+расстановка), число ходов и сами ходы. Ход хранится как номер в списке
+легальных ходов позиции: generate_legal_moves всегда дает один порядок,
+поэтому ход почти всегда занимает один байт, а при чтении каждый ход
+заодно проверяется на легальность.
+
+Рядом с архивом лежит индекс PATH.idx - смещения кадров по 8 байт, по нему
+партия читается по номеру без просмотра файла.
+
+    python -m checkers_core.records games.ckg
+    python -m checkers_core.records games.ckg --seek
+"""
+
+import argparse
+import os
+import random
+import time
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from checkers_core.history import DEFAULT_CHECKPOINT_INTERVAL, GameHistory
+from checkers_core.movegen import MoveList, generate_legal_moves
+from checkers_core.notation import format_move
+from checkers_core.position import Position
+
+RESULT_WHITE_WIN = "1-0"
+RESULT_BLACK_WIN = "0-1"
+RESULT_DRAW = "1/2-1/2"
+# Партия не доиграна или результат неизвестен (например, "*" в PDN)
+RESULT_UNFINISHED = "*"
+
+# Причины окончания партии
+REASON_NO_MOVES = "no_moves"
+REASON_MAX_PLIES = "max_plies"
+REASON_NO_PROGRESS = "no_progress"
+REASON_REPETITION = "repetition"
+# Причина не из списка (например, партия из PDN без пояснения)
+REASON_UNKNOWN = "unknown"
+
+MAGIC = b"CKGR"
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION])
+INDEX_SUFFIX = ".idx"
+READ_CHUNK_SIZE = 1 << 20
+
+# Коды результата и причины - номера в этих кортежах
+RESULTS = (RESULT_WHITE_WIN, RESULT_BLACK_WIN, RESULT_DRAW, RESULT_UNFINISHED)
+REASONS = (REASON_NO_MOVES, REASON_MAX_PLIES, REASON_NO_PROGRESS, REASON_REPETITION)
+
+FLAG_START_POSITION = 1
+
+
+class GameRecord(NamedTuple):
+    white: str
+    black: str
+    seed: int
+    moves: List[int]
+    result: str
+    reason: str
+    # Начальная позиция (Position.pack) или None для начальной расстановки
+    start: Optional[int] = None
+
+    def start_position(self) -> Position:
+        return Position.unpack(self.start) if self.start is not None else Position.initial()
+
+
+class GameHeader(NamedTuple):
+    """Партия без ходов: для статистики по архиву без повторения партий"""
+    white: str
+    black: str
+    seed: int
+    plies: int
+    result: str
+    reason: str
+    start: Optional[int] = None
+
+
+def moves_notation(moves: List[int], position: Optional[Position] = None) -> List[str]:
+    """Запись ходов партии, сыгранной от position (по умолчанию - от начальной расстановки)"""
+    position = position.copy() if position is not None else Position.initial()
+    notation = []
+    for move in moves:
+        notation.append(format_move(position, move))
+        position.make_move(move)
+    return notation
+
+
+def write_varint(buffer: bytearray, value: int):
+    """Беззнаковое число по 7 бит в байте, младшие биты первыми"""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset: int) -> Tuple[int, int]:
+    """Число и смещение за ним; IndexError, если данные оборваны"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def _write_string(buffer: bytearray, text: str):
+    encoded = text.encode("utf-8")
+    write_varint(buffer, len(encoded))
+    buffer += encoded
+
+
+def _read_string(data, offset: int) -> Tuple[str, int]:
+    length, offset = read_varint(data, offset)
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def encode_game(record: GameRecord) -> bytes:
+    """Данные кадра партии (без префикса длины)"""
+    buffer = bytearray()
+    flags = FLAG_START_POSITION if record.start is not None else 0
+    buffer.append(flags)
+    buffer.append(RESULTS.index(record.result))
+    buffer.append(REASONS.index(record.reason) if record.reason in REASONS else len(REASONS))
+    write_varint(buffer, _zigzag(record.seed))
+    _write_string(buffer, record.white)
+    _write_string(buffer, record.black)
+    if record.start is not None:
+        write_varint(buffer, record.start)
+
+    position = record.start_position()
+    moves = MoveList()
+    write_varint(buffer, len(record.moves))
+    for move in record.moves:
+        generate_legal_moves(position, moves)
+        for index in range(moves.count):
+            if moves.moves[index] == move:
+                break
+        else:
+            raise ValueError(f"illegal move {move} at ply {position.ply} in game record")
+        write_varint(buffer, index)
+        position.make_move(move)
+    return bytes(buffer)
+
+
+def _decode_header(data) -> Tuple[GameHeader, int]:
+    flags, result, reason = data[0], data[1], data[2]
+    seed, offset = read_varint(data, 3)
+    white, offset = _read_string(data, offset)
+    black, offset = _read_string(data, offset)
+    start = None
+    if flags & FLAG_START_POSITION:
+        start, offset = read_varint(data, offset)
+    plies, offset = read_varint(data, offset)
+    header = GameHeader(white, black, _unzigzag(seed), plies, RESULTS[result],
+                        REASONS[reason] if reason < len(REASONS) else REASON_UNKNOWN, start)
+    return header, offset
+
+
+def decode_header(data) -> GameHeader:
+    """Сведения о партии без разбора ходов"""
+    return _decode_header(data)[0]
+
+
+def decode_game(data) -> GameRecord:
+    """Партия из данных кадра; ValueError, если ход не найден среди легальных"""
+    header, offset = _decode_header(data)
+    start = header.start
+    count = header.plies
+
+    record_moves: List[int] = []
+    position = Position.unpack(start) if start is not None else Position.initial()
+    moves = MoveList()
+    for _ in range(count):
+        index, offset = read_varint(data, offset)
+        generate_legal_moves(position, moves)
+        if index >= moves.count:
+            raise ValueError(f"corrupt game record: move index {index} of {moves.count} at ply {position.ply}")
+        move = moves.moves[index]
+        record_moves.append(move)
+        position.make_move(move)
+    return GameRecord(header.white, header.black, header.seed, record_moves, header.result,
+                      header.reason, start)
+
+
+def index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def index_matches(path: str) -> bool:
+    """Индекс есть и сходится с архивом: последнее смещение - кадр, который кончается вместе с файлом.
+
+    Не сходится индекс от копии архива без него или после сбоя между записью
+    смещения и кадра; такой индекс перестраивается по кадрам.
+    """
+    index = index_path(path)
+    if not os.path.exists(index):
+        return False
+    index_size = os.path.getsize(index)
+    size = os.path.getsize(path)
+    if index_size % 8:
+        return False
+    if not index_size:
+        return size == len(HEADER)
+    last = array("Q")
+    with open(index, "rb") as stream:
+        stream.seek(index_size - 8)
+        last.frombytes(stream.read(8))
+    offset = last[0]
+    if not len(HEADER) <= offset < size:
+        return False
+    with open(path, "rb") as stream:
+        stream.seek(offset)
+        head = stream.read(10)
+    try:
+        length, start = read_varint(head, 0)
+    except IndexError:
+        return False
+    return offset + start + length == size
+
+
+class GameWriter:
+    """Дописывание партий в архив и смещений в его индекс"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER)
+            self._file.flush()
+        else:
+            _check_header(path)
+        # Номера и смещения новых партий продолжают индекс - он должен сходиться с архивом
+        if not index_matches(path):
+            rebuild_index(path)
+        self._index = open(index_path(path), "ab")
+        self.count = self._index.tell() // 8
+
+    def write(self, record: GameRecord) -> int:
+        """Запись партии; возвращает ее номер в архиве"""
+        payload = encode_game(record)
+        frame = bytearray()
+        write_varint(frame, len(payload))
+        array("Q", [self._file.tell()]).tofile(self._index)
+        self._file.write(frame)
+        self._file.write(payload)
+        self.count += 1
+        return self.count - 1
+
+    def flush(self):
+        self._file.flush()
+        self._index.flush()
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _check_header(path: str):
+    with open(path, "rb") as stream:
+        if stream.read(len(HEADER)) != HEADER:
+            raise ValueError(f"{path} is not a game archive (version {VERSION})")
+
+
+def _frames(path: str) -> Iterator[Tuple[int, memoryview]]:
+    """Смещения и данные кадров подряд; файл читается большими блоками"""
+    with open(path, "rb") as stream:
+        if stream.read(len(HEADER)) != HEADER:
+            raise ValueError(f"{path} is not a game archive (version {VERSION})")
+        buffer = b""
+        base = len(HEADER)  # Смещение начала buffer в файле
+        while True:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            buffer = buffer + chunk if buffer else chunk
+            view = memoryview(buffer)
+            offset = 0
+            while offset < len(buffer):
+                try:
+                    length, start = read_varint(view, offset)
+                except IndexError:
+                    break
+                if start + length > len(buffer):
+                    break
+                yield base + offset, view[start:start + length]
+                offset = start + length
+            if not chunk:
+                if offset < len(buffer):
+                    raise ValueError(f"{path} ends with a truncated game frame")
+                return
+            base += offset
+            buffer = buffer[offset:]
+
+
+def read_games(path: str) -> Iterator[GameRecord]:
+    """Потоковое чтение всех партий архива по порядку"""
+    for _, payload in _frames(path):
+        yield decode_game(payload)
+
+
+def read_headers(path: str) -> Iterator[GameHeader]:
+    """Потоковое чтение сведений о партиях без разбора и проверки ходов"""
+    for _, payload in _frames(path):
+        yield decode_header(payload)
+
+
+def rebuild_index(path: str) -> int:
+    """Индекс заново по кадрам архива; возвращает число партий"""
+    offsets = array("Q", (offset for offset, _ in _frames(path)))
+    with open(index_path(path), "wb") as stream:
+        offsets.tofile(stream)
+    return len(offsets)
+
+
+class GameArchive:
+    """Чтение партии по номеру через индекс"""
+
+    def __init__(self, path: str):
+        self.path = path
+        _check_header(path)
+        if not index_matches(path):
+            rebuild_index(path)
+        self.offsets = array("Q")
+        with open(index_path(path), "rb") as stream:
+            self.offsets.frombytes(stream.read())
+        self._file = open(path, "rb")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, number: int) -> GameRecord:
+        self._file.seek(self.offsets[number])
+        # Префикс длины занимает не больше 10 байт
+        head = self._file.read(10)
+        length, start = read_varint(head, 0)
+        # Кадр короче 10 байт уже прочитан целиком
+        payload = head[start:] + self._file.read(max(0, length - (len(head) - start)))
+        return decode_game(payload[:length])
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        return read_games(self.path)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def seek_benchmark(path: str, interval: int, seeks_per_game: int = 100):
+    """Среднее время перехода к случайному полуходу по длинам партий"""
+    rng = random.Random(1)
+    # Длина партии с точностью до 50 полуходов -> [число переходов, суммарное время]
+    buckets: Dict[int, List[float]] = {}
+    for record in read_games(path):
+        history = GameHistory.from_moves(record.moves, record.start_position(), interval)
+        targets = [rng.randint(0, len(history)) for _ in range(seeks_per_game)]
+        start = time.perf_counter()
+        for ply in targets:
+            history.seek(ply)
+        elapsed = time.perf_counter() - start
+        bucket = buckets.setdefault(len(history) // 50 * 50, [0, 0.0])
+        bucket[0] += len(targets)
+        bucket[1] += elapsed
+
+    print(f"Переход к полуходу, контрольная позиция каждые {interval} полуходов:")
+    for length, (seeks, elapsed) in sorted(buckets.items()):
+        print(f"  партии {length:>4}-{length + 49:<4} полуходов: {elapsed / seeks * 1e6:6.1f} мкс на переход")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сведения об архиве партий и скорость его чтения")
+    parser.add_argument("path", help="файл архива")
+    parser.add_argument("--game", type=int, help="показать партию по номеру")
+    parser.add_argument("--reindex", action="store_true", help="построить индекс заново")
+    parser.add_argument("--verify", action="store_true", help="разобрать и проверить все ходы")
+    parser.add_argument("--seek", action="store_true",
+                        help="время перехода к случайным полуходам партий (history.GameHistory)")
+    parser.add_argument("--interval", type=int, default=DEFAULT_CHECKPOINT_INTERVAL,
+                        help="полуходов между контрольными позициями для --seek")
+    args = parser.parse_args()
+
+    if args.reindex:
+        print(f"Партий в индексе: {rebuild_index(args.path)}")
+
+    if args.game is not None:
+        with GameArchive(args.path) as archive:
+            record = archive[args.game]
+        print(f"{record.white} - {record.black}  {record.result} ({record.reason}), зерно {record.seed}")
+        print(" ".join(moves_notation(record.moves, record.start_position())))
+        return
+
+    start = time.perf_counter()
+    games = 0
+    plies = 0
+    results = dict.fromkeys(RESULTS, 0)
+    for header in read_headers(args.path):
+        games += 1
+        plies += header.plies
+        results[header.result] += 1
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.path)
+    print(f"Партий: {games} (1-0: {results[RESULT_WHITE_WIN]}, 0-1: {results[RESULT_BLACK_WIN]}, "
+          f"ничьи: {results[RESULT_DRAW]}, не доиграно: {results[RESULT_UNFINISHED]}), полуходов: {plies}, размер: {size} байт "
+          f"({size / games if games else 0:.1f} байт на партию)")
+    print(f"Чтение сведений: {elapsed:.2f} с, {games / elapsed if elapsed else 0:.0f} партий/с")
+
+    if args.verify:
+        start = time.perf_counter()
+        for _ in read_games(args.path):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"Чтение с проверкой ходов: {elapsed:.2f} с, {games / elapsed if elapsed else 0:.0f} партий/с")
+
+    if args.seek:
+        seek_benchmark(args.path, args.interval)
+
+
+if __name__ == "__main__":
+    main()
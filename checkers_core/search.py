@@ -0,0 +1,301 @@
+"""Поиск хода: negamax с альфа-бета отсечением и итеративным углублением.
+
+Порядок ходов: ход из таблицы транспозиций, взятия (больше взятых - раньше),
+ход-убийца, история.
+Поиск ограничен бюджетом времени в миллисекундах и работает на копии
+позиции, поэтому прерывание по времени не требует отката ходов.
+Позиции из таблиц эндшпиля (tablebase) не ищутся глубже: их результат
+известен точно.
+"""
+
+import random
+import time
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional
+
+from checkers_core.features import evaluate
+from checkers_core.movegen import MoveList, generate_legal_moves
+from checkers_core.position import MOVE_CAPTURE_SHIFT, Position
+from checkers_core.tt import (
+    BOUND_EXACT,
+    BOUND_LOWER,
+    BOUND_UPPER,
+    DEFAULT_SIZE_MB,
+    DEPTH_MASK,
+    TranspositionTable,
+)
+from checkers_core.wdl import WDL_DRAW, WDL_WIN
+
+if TYPE_CHECKING:
+    from checkers_core.book import OpeningBook
+    from checkers_core.tablebase import Tablebase
+
+MAX_PLY = 64
+INFINITY = 1_000_000
+WIN_SCORE = 100_000
+MATE_BOUND = WIN_SCORE - MAX_PLY
+# Выигрыш по таблицам эндшпиля: ниже MATE_BOUND, так как до конца партии неизвестно
+# число ходов; к нему прибавляется материал, чтобы движок упрощал выигранную позицию
+TABLEBASE_WIN = WIN_SCORE // 2
+
+# Как часто (в узлах) проверять время
+TIME_CHECK_INTERVAL = 256
+
+# Веса упорядочивания ходов
+CAPTURE_ORDER = 1 << 30
+KILLER_ORDER = 1 << 29
+
+HISTORY_SIZE = 1 << 10  # индекс истории: поле откуда и поле куда
+
+
+class SearchResult(NamedTuple):
+    move: int
+    score: int
+    depth: int
+    nodes: int
+    pv: List[int]
+    elapsed: float
+
+
+class SearchTimeout(Exception):
+    """Бюджет времени исчерпан или поиск остановлен извне"""
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """Оценка выигрыша в таблице хранится относительно текущего узла"""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def tablebase_score(result: int, position: Position, ply: int) -> int:
+    """Оценка позиции с известным по таблицам результатом"""
+    if result == WDL_DRAW:
+        return 0
+    if result == WDL_WIN:
+        return TABLEBASE_WIN + evaluate(position) - ply
+    return -TABLEBASE_WIN + evaluate(position) + ply
+
+
+class Searcher:
+    """Альфа-бета поиск с итеративным углублением и контролем времени"""
+
+    def __init__(self, time_limit_ms: int = 1000, max_depth: int = MAX_PLY,
+                 tt: Optional[TranspositionTable] = None, tt_size_mb: float = DEFAULT_SIZE_MB,
+                 tablebase: Optional["Tablebase"] = None):
+        self.time_limit_ms = time_limit_ms
+        self.max_depth = max_depth
+        self.tt = tt if tt is not None else TranspositionTable(tt_size_mb)
+        self.tablebase = tablebase
+
+        self.move_lists = [MoveList() for _ in range(MAX_PLY + 1)]
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self.history = [0] * HISTORY_SIZE
+        self.pv_table = [[0] * (MAX_PLY + 1) for _ in range(MAX_PLY + 1)]
+        self.pv_length = [0] * (MAX_PLY + 1)
+
+        self.nodes = 0
+        self.tablebase_hits = 0
+        self.deadline = 0.0
+        self.stopped = False
+        self.should_stop: Optional[Callable[[], bool]] = None
+
+    def reset(self):
+        """Сброс эвристик между партиями"""
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        self.history = [0] * HISTORY_SIZE
+
+    def search(self, position: Position, time_limit_ms: Optional[int] = None,
+               max_depth: Optional[int] = None,
+               on_iteration: Optional[Callable[[SearchResult], None]] = None,
+               should_stop: Optional[Callable[[], bool]] = None,
+               skip_size: int = 0, skip_phase: int = 0) -> SearchResult:
+        """Итеративное углубление до исчерпания времени, глубины или внешней остановки.
+
+        skip_size > 0 пропускает глубины, для которых (depth + skip_phase) // skip_size
+        нечетно (кроме max_depth): так расходятся процессы Lazy SMP (parallel.py).
+        """
+        if time_limit_ms is None:
+            time_limit_ms = self.time_limit_ms
+        if max_depth is None:
+            max_depth = self.max_depth
+        max_depth = min(max_depth, MAX_PLY)
+
+        start = time.perf_counter()
+        self.deadline = start + time_limit_ms / 1000
+        self.nodes = 0
+        self.tablebase_hits = 0
+        self.stopped = False
+        self.should_stop = should_stop
+        self.tt.new_search()
+        root = position.copy()
+
+        root_moves = list(generate_legal_moves(root))
+        if not root_moves:
+            return SearchResult(0, -WIN_SCORE, 0, 0, [], 0.0)
+        best = SearchResult(root_moves[0], 0, 0, 0, [root_moves[0]], 0.0)
+        if len(root_moves) == 1:
+            return best
+
+        for depth in range(1, max_depth + 1):
+            if skip_size and depth < max_depth and (depth + skip_phase) // skip_size % 2:
+                continue
+            try:
+                score = self._negamax(root, depth, -INFINITY, INFINITY, 0)
+            except SearchTimeout:
+                self.stopped = True
+                break
+            pv = self.pv_table[0][:self.pv_length[0]]
+            best = SearchResult(pv[0], score, depth, self.nodes, pv, time.perf_counter() - start)
+            if on_iteration:
+                on_iteration(best)
+            # Найден форсированный выигрыш или проигрыш - глубже искать незачем
+            if abs(score) >= MATE_BOUND:
+                break
+
+        return best._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def _order_moves(self, moves: MoveList, ply: int, hash_move: int = 0) -> List[int]:
+        killers = self.killers[ply]
+        history = self.history
+
+        def order(move):
+            if move == hash_move:
+                return INFINITY << 32
+            captured = move >> MOVE_CAPTURE_SHIFT
+            if captured:
+                return CAPTURE_ORDER + captured.bit_count()
+            if move == killers[0] or move == killers[1]:
+                return KILLER_ORDER
+            return history[move & (HISTORY_SIZE - 1)]
+
+        return sorted(moves, key=order, reverse=True)
+
+    def _negamax(self, position: Position, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and (
+                time.perf_counter() >= self.deadline or (self.should_stop and self.should_stop())):
+            raise SearchTimeout
+
+        self.pv_length[ply] = 0
+        # В корне нужен ход, поэтому таблицы эндшпиля спрашиваем только ниже
+        if ply > 0 and self.tablebase is not None:
+            result = self.tablebase.probe(position)
+            if result is not None:
+                self.tablebase_hits += 1
+                return tablebase_score(result, position, ply)
+
+        key = position.hash
+        hash_move = 0
+        entry = self.tt.probe(key)
+        if entry is not None:
+            hash_move = entry.move
+            if ply > 0 and entry.depth >= depth:
+                score = score_from_tt(entry.score, ply)
+                if (entry.bound == BOUND_EXACT or
+                        (entry.bound == BOUND_LOWER and score >= beta) or
+                        (entry.bound == BOUND_UPPER and score <= alpha)):
+                    return score
+
+        moves = generate_legal_moves(position, self.move_lists[ply])
+        if not moves.count:
+            # Позиция без ходов - проигрыш на любой глубине
+            self.tt.store(key, DEPTH_MASK, BOUND_EXACT, -WIN_SCORE, 0)
+            return -WIN_SCORE + ply
+        if ply >= MAX_PLY:
+            return evaluate(position)
+
+        # На нулевой глубине продолжаем только обязательные взятия
+        is_forced_capture = moves.moves[0] >> MOVE_CAPTURE_SHIFT != 0
+        if depth <= 0 and not is_forced_capture:
+            return evaluate(position)
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        for move in self._order_moves(moves, ply, hash_move):
+            position.make_move(move)
+            score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.unmake_move(move)
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+                self._update_pv(ply, move)
+            if alpha >= beta:
+                if not move >> MOVE_CAPTURE_SHIFT:
+                    killers = self.killers[ply]
+                    if killers[0] != move:
+                        killers[1] = killers[0]
+                        killers[0] = move
+                    self.history[move & (HISTORY_SIZE - 1)] += depth * depth
+                break
+
+        if best_score >= beta:
+            bound = BOUND_LOWER
+        elif best_score > original_alpha:
+            bound = BOUND_EXACT
+        else:
+            bound = BOUND_UPPER
+            best_move = 0
+        self.tt.store(key, max(depth, 0), bound, score_to_tt(best_score, ply), best_move)
+        return best_score
+
+    def _update_pv(self, ply: int, move: int):
+        row = self.pv_table[ply]
+        child = self.pv_table[ply + 1]
+        child_length = self.pv_length[ply + 1]
+        row[0] = move
+        row[1:child_length + 1] = child[:child_length]
+        self.pv_length[ply] = child_length + 1
+
+
+class AIPlayer:
+    """Компьютерный игрок за одну из сторон; в дебюте ходит по книге без поиска"""
+
+    def __init__(self, is_white: bool, time_limit_ms: int = 1000, max_depth: int = MAX_PLY,
+                 tt: Optional[TranspositionTable] = None, tt_size_mb: float = DEFAULT_SIZE_MB,
+                 book: Optional["OpeningBook"] = None, seed: Optional[int] = None):
+        self.is_white = is_white
+        self.book = book
+        self.rng = random.Random(seed)
+        self.time_limit_ms = time_limit_ms
+        self.max_depth = max_depth
+        self.tt_size_mb = tt_size_mb
+        self._tt = tt
+        self._searcher: Optional[Searcher] = None
+        self.last_result: Optional[SearchResult] = None
+
+    @property
+    def searcher(self) -> Searcher:
+        # Таблица выделяется при первом поиске: фоновому игроку она не нужна
+        if self._searcher is None:
+            self._searcher = Searcher(self.time_limit_ms, self.max_depth, self._tt, self.tt_size_mb)
+        return self._searcher
+
+    def book_move(self, position: Position) -> Optional[int]:
+        """Ход из дебютной книги или None, если позиции в книге нет"""
+        if self.book is None:
+            return None
+        return self.book.choose(position, self.rng)
+
+    def choose_move(self, position: Position) -> int:
+        """Ход из книги, иначе лучший найденный ход в пределах бюджета времени"""
+        move = self.book_move(position)
+        if move is not None:
+            self.last_result = SearchResult(move, 0, 0, 0, [move], 0.0)
+            return move
+        self.last_result = self.searcher.search(position)
+        return self.last_result.move
@@ -0,0 +1,286 @@
+"""Самоигра без графики: партии между движками для обучающих и регрессионных данных.
+
+Движки: random - случайный ход, greedy - лучший по материалу ход на один
+полуход вперед, alphabeta:D - альфа-бета поиск на глубину D. Каждая партия
+получает свое зерно (seed + номер партии), поэтому результат воспроизводим
+и не зависит от порядка партий. Партии пишутся в файл сразу после
+окончания: по строке JSON, кадрами двоичного архива (--format binary)
+или в PDN (--format pdn). С --book движки в дебюте ходят по книге
+(checkers_core.book) и не тратят время на поиск.
+
+    python -m checkers_core.selfplay --games 1000 --white random --black alphabeta:4 --seed 1 -o games.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import List, TextIO
+
+from checkers_core.book import OpeningBook
+from checkers_core.features import evaluate
+from checkers_core.movegen import MoveList, generate_legal_moves, move_captures, move_from
+from checkers_core.pdn import PdnWriter
+from checkers_core.position import SQUARE_BITS, Position
+from checkers_core.records import (
+    REASON_MAX_PLIES,
+    REASON_NO_MOVES,
+    REASON_NO_PROGRESS,
+    REASON_REPETITION,
+    RESULT_BLACK_WIN,
+    RESULT_DRAW,
+    RESULT_WHITE_WIN,
+    GameRecord,
+    GameWriter,
+    moves_notation,
+)
+from checkers_core.search import Searcher
+
+FORMAT_JSONL = "jsonl"
+FORMAT_BINARY = "binary"
+FORMAT_PDN = "pdn"
+OUTPUT_FORMATS = (FORMAT_JSONL, FORMAT_BINARY, FORMAT_PDN)
+
+DEFAULT_MAX_PLIES = 300
+# Ничья, если 40 ходов каждой стороны не было ни взятий, ни ходов простыми
+DEFAULT_NO_PROGRESS_PLIES = 80
+# Поиск движка alphabeta ограничен глубиной, а не временем
+UNLIMITED_TIME_MS = 10 ** 9
+SELFPLAY_TT_SIZE_MB = 4
+
+
+class Engine:
+    """Движок самоигры: выбирает ход из списка легальных"""
+
+    name = "engine"
+
+    def new_game(self):
+        """Сброс состояния перед партией, чтобы партии не зависели друг от друга"""
+
+    def choose_move(self, position: Position, moves: MoveList, rng: random.Random) -> int:
+        raise NotImplementedError
+
+
+class RandomEngine(Engine):
+    name = "random"
+
+    def choose_move(self, position: Position, moves: MoveList, rng: random.Random) -> int:
+        return moves.moves[rng.randrange(moves.count)]
+
+
+class GreedyEngine(Engine):
+    """Ход с лучшей оценкой после него; из равных выбирается случайный"""
+
+    name = "greedy"
+
+    def choose_move(self, position: Position, moves: MoveList, rng: random.Random) -> int:
+        best_moves = []
+        best_score = None
+        for index in range(moves.count):
+            move = moves.moves[index]
+            position.make_move(move)
+            score = -evaluate(position)
+            position.unmake_move(move)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_moves = [move]
+            elif score == best_score:
+                best_moves.append(move)
+        return rng.choice(best_moves)
+
+
+class AlphaBetaEngine(Engine):
+    """Альфа-бета поиск на фиксированную глубину"""
+
+    def __init__(self, depth: int, tt_size_mb: float = SELFPLAY_TT_SIZE_MB):
+        self.depth = depth
+        self.name = f"alphabeta:{depth}"
+        self.searcher = Searcher(UNLIMITED_TIME_MS, depth, tt_size_mb=tt_size_mb)
+
+    def new_game(self):
+        self.searcher.reset()
+        self.searcher.tt.clear()
+
+    def choose_move(self, position: Position, moves: MoveList, rng: random.Random) -> int:
+        return self.searcher.search(position).move
+
+
+class BookEngine(Engine):
+    """Ход из дебютной книги, а вне книги - ход другого движка"""
+
+    def __init__(self, engine: Engine, book: OpeningBook):
+        self.engine = engine
+        self.book = book
+        # Имя то же: книга не меняет движок в таблице турнира
+        self.name = engine.name
+        self.book_moves = 0
+
+    def new_game(self):
+        self.engine.new_game()
+
+    def choose_move(self, position: Position, moves: MoveList, rng: random.Random) -> int:
+        move = self.book.choose(position, rng)
+        if move is not None:
+            self.book_moves += 1
+            return move
+        return self.engine.choose_move(position, moves, rng)
+
+
+def create_engine(spec: str) -> Engine:
+    """Движок по описанию: random, greedy или alphabeta:D"""
+    name, _, argument = spec.strip().lower().partition(":")
+    if name == "random":
+        return RandomEngine()
+    if name == "greedy":
+        return GreedyEngine()
+    if name in ("alphabeta", "ab"):
+        if not argument.isdigit() or int(argument) < 1:
+            raise ValueError(f"alphabeta engine needs a positive depth, e.g. alphabeta:4, got {spec!r}")
+        return AlphaBetaEngine(int(argument))
+    raise ValueError(f"unknown engine {spec!r}")
+
+
+def play_game(white: Engine, black: Engine, seed: int, max_plies: int = DEFAULT_MAX_PLIES,
+              no_progress_plies: int = DEFAULT_NO_PROGRESS_PLIES, opening_plies: int = 0) -> GameRecord:
+    """Одна партия от начальной расстановки; первые opening_plies ходов случайные"""
+    rng = random.Random(seed)
+    white.new_game()
+    black.new_game()
+
+    position = Position.initial()
+    moves = MoveList()
+    history: List[int] = []
+    quiet_plies = 0
+    # Повторения считаются только с последнего необратимого хода
+    repetitions = {position.hash: 1}
+    while True:
+        generate_legal_moves(position, moves)
+        if not moves.count:
+            result = RESULT_BLACK_WIN if position.white_to_move else RESULT_WHITE_WIN
+            reason = REASON_NO_MOVES
+            break
+        if len(history) >= max_plies:
+            result, reason = RESULT_DRAW, REASON_MAX_PLIES
+            break
+        if quiet_plies >= no_progress_plies:
+            result, reason = RESULT_DRAW, REASON_NO_PROGRESS
+            break
+
+        if len(history) < opening_plies:
+            move = moves.moves[rng.randrange(moves.count)]
+        else:
+            engine = white if position.white_to_move else black
+            move = engine.choose_move(position, moves, rng)
+
+        irreversible = move_captures(move) or not position.kings & SQUARE_BITS[move_from(move)]
+        position.make_move(move)
+        history.append(move)
+        if irreversible:
+            quiet_plies = 0
+            repetitions.clear()
+        else:
+            quiet_plies += 1
+        seen = repetitions.get(position.hash, 0) + 1
+        repetitions[position.hash] = seen
+        if seen >= 3:
+            result, reason = RESULT_DRAW, REASON_REPETITION
+            break
+
+    return GameRecord(white.name, black.name, seed, history, result, reason)
+
+
+def write_record(stream: TextIO, number: int, record: GameRecord):
+    """Партия одной строкой JSON; строка сбрасывается на диск сразу"""
+    stream.write(json.dumps({
+        "game": number,
+        "white": record.white,
+        "black": record.black,
+        "seed": record.seed,
+        "result": record.result,
+        "reason": record.reason,
+        "plies": len(record.moves),
+        "moves": moves_notation(record.moves, record.start_position()),
+    }, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+class JsonLinesWriter:
+    """Партии строками JSON; тот же интерфейс, что у records.GameWriter"""
+
+    def __init__(self, path: str):
+        self.stream = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, record: GameRecord) -> int:
+        write_record(self.stream, self.count, record)
+        self.count += 1
+        return self.count - 1
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+def open_writer(path: str, output_format: str = FORMAT_JSONL):
+    """Приемник партий: JSON Lines, двоичный архив records или PDN"""
+    if output_format == FORMAT_BINARY:
+        if path == "-":
+            raise ValueError("binary game archive needs a file path")
+        return GameWriter(path)
+    if output_format == FORMAT_PDN:
+        return PdnWriter(path)
+    return JsonLinesWriter(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Самоигра движков без графики")
+    parser.add_argument("--games", type=int, default=100, help="число партий")
+    parser.add_argument("--white", default="random", help="движок белых: random, greedy, alphabeta:D")
+    parser.add_argument("--black", default="random", help="движок черных: random, greedy, alphabeta:D")
+    parser.add_argument("--seed", type=int, default=1, help="зерно; партия i получает seed + i")
+    parser.add_argument("-o", "--output", default="-", help="файл для партий, - для stdout")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=FORMAT_JSONL,
+                        help="JSON Lines, двоичный архив (checkers_core.records) или PDN")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES,
+                        help="ничья после стольких полуходов")
+    parser.add_argument("--no-progress", type=int, default=DEFAULT_NO_PROGRESS_PLIES,
+                        help="ничья после стольких полуходов без взятий и ходов простыми")
+    parser.add_argument("--opening-plies", type=int, default=0,
+                        help="число случайных полуходов в начале партии")
+    parser.add_argument("--book", help="дебютная книга для обоих движков")
+    args = parser.parse_args()
+
+    try:
+        white = create_engine(args.white)
+        black = create_engine(args.black)
+        if args.book:
+            book = OpeningBook(args.book)
+            white, black = BookEngine(white, book), BookEngine(black, book)
+        writer = open_writer(args.output, args.format)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    results = {RESULT_WHITE_WIN: 0, RESULT_BLACK_WIN: 0, RESULT_DRAW: 0}
+    start = time.perf_counter()
+    try:
+        for number in range(args.games):
+            record = play_game(white, black, args.seed + number, args.max_plies,
+                               args.no_progress, args.opening_plies)
+            results[record.result] += 1
+            writer.write(record)
+            writer.flush()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    rate = args.games / elapsed if elapsed > 0 else 0.0
+    print(f"Партий: {args.games}  белые: {results[RESULT_WHITE_WIN]}  черные: {results[RESULT_BLACK_WIN]}  "
+          f"ничьи: {results[RESULT_DRAW]}  за {elapsed:.1f} с, {rate:.1f} партий/с", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
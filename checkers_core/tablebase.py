@@ -0,0 +1,362 @@
+"""Таблицы эндшпиля дамок: выигрыш, проигрыш или ничья для каждой позиции.
+
+Таблица на соотношение дамок "своих" (сторона, чей ход) и "чужих":
+файл k2v1.cktb - две дамки у стороны, чей ход, против одной. Позиция
+с ходом черных поворачивается на 180 градусов со сменой цвета
+(поле i -> 31 - i), поэтому хранятся только позиции с ходом "своих".
+Номер позиции - комбинаторный номер полей своих дамок и номер полей
+чужих среди оставшихся; результат занимает 2 бита, 4 позиции в байте.
+
+Построение - ретроградный анализ: позиции без ходов проигрышные,
+взятия ведут в уже построенные таблицы с меньшим числом фигур,
+а от решенных позиций результат распространяется назад по обратным
+ходам дамок. Что не решилось - ничья. Таблицы с одинаковым набором
+фигур ((2, 1) и (1, 2) ссылаются друг на друга) строятся вместе, разные
+наборы одного числа фигур - параллельно в пуле процессов.
+
+Чтение через mmap: файл не загружается в память, ОС подгружает только
+нужные страницы, и одни и те же страницы делят все процессы поиска.
+
+    python -m checkers_core.tablebase --pieces 4
+    python -m checkers_core.tablebase --probe "W:WK1,K5:BK32"
+"""
+
+import argparse
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+from checkers_core.movegen import MoveList, generate_legal_moves, move_captures
+from checkers_core.notation import position_from_fen
+from checkers_core.position import NEIGHBOURS, NUM_SQUARES, SQUARE_BITS, Position
+from checkers_core.wdl import WDL_DRAW, WDL_LOSS, WDL_WIN
+
+DEFAULT_DIRECTORY = "tablebases"
+DEFAULT_MAX_PIECES = 4
+
+# Ничья, решенная при построении (все ходы - взятия); в файле это WDL_DRAW
+_FINAL_DRAW = 3
+
+MAGIC = b"CKTB"
+VERSION = 1
+# MAGIC, версия, свои дамки, чужие дамки, выравнивание, число позиций
+HEADER = struct.Struct("<4sBBBxI")
+FILE_SUFFIX = ".cktb"
+_FILE_RE = re.compile(r"k(\d+)v(\d+)" + re.escape(FILE_SUFFIX))
+
+_BINOMIAL = [[comb(n, k) for k in range(NUM_SQUARES + 1)] for n in range(NUM_SQUARES + 1)]
+_REVERSED_BYTES = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+# Значение в файле для каждого состояния построения
+_FILE_VALUES = bytes([WDL_DRAW, WDL_WIN, WDL_LOSS, WDL_DRAW]) + bytes(252)
+_STEPS = tuple(tuple(square for square in NEIGHBOURS[index] if square >= 0) for index in range(NUM_SQUARES))
+
+
+def table_name(own: int, opp: int) -> str:
+    return f"k{own}v{opp}{FILE_SUFFIX}"
+
+
+def table_size(own: int, opp: int) -> int:
+    return _BINOMIAL[NUM_SQUARES][own] * _BINOMIAL[NUM_SQUARES - own][opp]
+
+
+def rotate(mask: int) -> int:
+    """Поворот доски на 180 градусов: поле i переходит в 31 - i"""
+    return (_REVERSED_BYTES[mask & 0xFF] << 24 | _REVERSED_BYTES[mask >> 8 & 0xFF] << 16 |
+            _REVERSED_BYTES[mask >> 16 & 0xFF] << 8 | _REVERSED_BYTES[mask >> 24])
+
+
+def position_index(own_mask: int, opp_mask: int, own: int) -> int:
+    """Номер позиции в таблице (own, opp): сочетание своих полей, затем чужих среди свободных"""
+    own_rank = 0
+    k = 1
+    pieces = own_mask
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        own_rank += _BINOMIAL[low.bit_length() - 1][k]
+        k += 1
+    opp_rank = 0
+    k = 1
+    pieces = opp_mask
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        # Номер поля среди полей, не занятых своими дамками
+        square = low.bit_length() - 1 - (own_mask & (low - 1)).bit_count()
+        opp_rank += _BINOMIAL[square][k]
+        k += 1
+    return own_rank * _BINOMIAL[NUM_SQUARES - own][k - 1] + opp_rank
+
+
+def normalize(position: Position) -> Tuple[int, int]:
+    """Маски дамок стороны, чей ход, и соперника с ходом "своих" снизу доски"""
+    if position.white_to_move:
+        return position.white, position.black
+    return rotate(position.black), rotate(position.white)
+
+
+class Tablebase:
+    """Таблицы из каталога, отображенные в память; probe - результат позиции или None"""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.tables: Dict[Tuple[int, int], mmap.mmap] = {}
+        self.max_pieces = 0
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            match = _FILE_RE.fullmatch(name)
+            if match is None:
+                continue
+            own, opp = int(match.group(1)), int(match.group(2))
+            with open(os.path.join(directory, name), "rb") as stream:
+                table = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, header_own, header_opp, count = HEADER.unpack_from(table)
+            if (magic, version, header_own, header_opp) != (MAGIC, VERSION, own, opp) or \
+                    count != table_size(own, opp) or len(table) < HEADER.size + (count + 3) // 4:
+                table.close()
+                raise ValueError(f"{name} is not a valid tablebase file (version {VERSION})")
+            self.tables[(own, opp)] = table
+            self.max_pieces = max(self.max_pieces, own + opp)
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def probe(self, position: Position) -> Optional[int]:
+        """WDL_WIN, WDL_LOSS или WDL_DRAW для стороны, чей ход; None, если позиции нет в таблицах"""
+        if position.white_count + position.black_count > self.max_pieces:
+            return None
+        if position.kings != position.white | position.black:
+            return None
+        table = self.tables.get((position.count(position.white_to_move),
+                                 position.count(not position.white_to_move)))
+        if table is None:
+            return None
+        own_mask, opp_mask = normalize(position)
+        index = position_index(own_mask, opp_mask, own_mask.bit_count())
+        return table[HEADER.size + (index >> 2)] >> ((index & 3) << 1) & 3
+
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+        self.tables.clear()
+        self.max_pieces = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _capture_result(position: Position, moves: MoveList, smaller: Tablebase) -> int:
+    """Результат позиции, где все ходы - взятия: по таблицам с меньшим числом фигур"""
+    result = WDL_LOSS
+    for index in range(moves.count):
+        move = moves.moves[index]
+        position.make_move(move)
+        child = smaller.probe(position) if position.black else WDL_LOSS
+        position.unmake_move(move)
+        if child == WDL_LOSS:
+            return WDL_WIN
+        if child == WDL_DRAW:
+            result = _FINAL_DRAW
+    return result
+
+
+def _solve(material: Tuple[int, int], directory: str) -> List[Tuple[int, int, bytes]]:
+    """Ретроградный анализ таблиц (a, b) и (b, a) вместе; результаты упакованы по 2 бита"""
+    a, b = material
+    slices = [(a, b)] if a == b else [(a, b), (b, a)]
+    status = {key: bytearray(table_size(*key)) for key in slices}
+    # Число еще не опровергнутых ходов позиции без взятий
+    counters = {key: bytearray(table_size(*key)) for key in slices}
+    # Очередь решенных позиций: маски (свои | чужие << 32) и номер таблицы с результатом
+    queue_masks = array("Q")
+    queue_info = bytearray()
+
+    moves = MoveList()
+    with Tablebase(directory) as smaller:
+        for slice_number, (own, opp) in enumerate(slices):
+            table_status = status[(own, opp)]
+            table_counters = counters[(own, opp)]
+            for own_squares in combinations(range(NUM_SQUARES), own):
+                own_mask = sum(SQUARE_BITS[square] for square in own_squares)
+                free = [square for square in range(NUM_SQUARES) if not own_mask & SQUARE_BITS[square]]
+                for opp_squares in combinations(free, opp):
+                    opp_mask = sum(SQUARE_BITS[square] for square in opp_squares)
+                    position = Position(own_mask, opp_mask, own_mask | opp_mask, True)
+                    generate_legal_moves(position, moves)
+                    index = position_index(own_mask, opp_mask, own)
+                    if not moves.count:
+                        result = WDL_LOSS
+                    elif move_captures(moves.moves[0]):
+                        result = _capture_result(position, moves, smaller)
+                    else:
+                        table_counters[index] = moves.count
+                        continue
+                    table_status[index] = result
+                    if result != _FINAL_DRAW:
+                        queue_masks.append(own_mask | opp_mask << 32)
+                        queue_info.append(slice_number << 2 | result)
+
+    # Обратные ходы: позицию Q (ход "своих") получили ходом дамки соперника из позиции P
+    # другой таблицы. Проигрыш Q - выигрыш P; выигрыш Q опровергает один ход P
+    head = 0
+    while head < len(queue_masks):
+        masks = queue_masks[head]
+        info = queue_info[head]
+        head += 1
+        own, opp = slices[info >> 2]
+        result = info & 3
+        previous_slice = (opp, own)
+        previous_number = slices.index(previous_slice)
+        previous_status = status[previous_slice]
+        previous_counters = counters[previous_slice]
+        mover = rotate(masks >> 32)
+        defender = rotate(masks & 0xFFFFFFFF)
+        occupied = mover | defender
+        pieces = mover
+        while pieces:
+            low = pieces & -pieces
+            pieces ^= low
+            for origin in _STEPS[low.bit_length() - 1]:
+                origin_bit = SQUARE_BITS[origin]
+                if occupied & origin_bit:
+                    continue
+                previous_own = mover ^ low | origin_bit
+                index = position_index(previous_own, defender, opp)
+                if previous_status[index]:
+                    continue
+                if result == WDL_LOSS:
+                    previous_result = WDL_WIN
+                else:
+                    previous_counters[index] -= 1
+                    if previous_counters[index]:
+                        continue
+                    previous_result = WDL_LOSS
+                previous_status[index] = previous_result
+                queue_masks.append(previous_own | defender << 32)
+                queue_info.append(previous_number << 2 | previous_result)
+
+    return [(own, opp, _pack(status[(own, opp)])) for own, opp in slices]
+
+
+def _pack(status: bytearray) -> bytes:
+    """Результаты по 2 бита, 4 позиции в байте; нерешенные позиции - ничьи"""
+    values = bytes(status).translate(_FILE_VALUES)
+    values += bytes(-len(values) % 4)
+    size = len(values) // 4
+    # Значения меньше 4, поэтому сдвиг всего числа на 2, 4 и 6 бит не переходит границы байта
+    packed = 0
+    for part in range(4):
+        packed |= int.from_bytes(values[part::4], "little") << (2 * part)
+    return packed.to_bytes(size, "little")
+
+
+def write_table(directory: str, own: int, opp: int, packed: bytes):
+    path = os.path.join(directory, table_name(own, opp))
+    # Запись во временный файл: процессы поиска не увидят недописанную таблицу
+    with open(path + ".tmp", "wb") as stream:
+        stream.write(HEADER.pack(MAGIC, VERSION, own, opp, table_size(own, opp)))
+        stream.write(packed)
+    os.replace(path + ".tmp", path)
+
+
+def materials(pieces: int) -> List[Tuple[int, int]]:
+    """Наборы (a, b), a >= b >= 1, с a + b == pieces; каждый дает таблицы (a, b) и (b, a)"""
+    return [(a, pieces - a) for a in range(pieces - 1, 0, -1) if a >= pieces - a]
+
+
+def generate(directory: str = DEFAULT_DIRECTORY, max_pieces: int = DEFAULT_MAX_PIECES,
+             workers: Optional[int] = None, progress=print):
+    """Построение всех таблиц до max_pieces дамок; уже построенные не пересчитываются"""
+    # Пул нужен только построению: import checkers_core не тянет multiprocessing
+    import multiprocessing
+
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    with multiprocessing.get_context().Pool(workers) as pool:
+        # Таблицы уровня ссылаются на уровни с меньшим числом фигур - уровни строго по очереди
+        for pieces in range(2, max_pieces + 1):
+            pending = [(a, b) for a, b in materials(pieces)
+                       if not all(os.path.exists(os.path.join(directory, table_name(*key)))
+                                  for key in ((a, b), (b, a)))]
+            start = time.perf_counter()
+            tasks = [(material, directory) for material in pending]
+            for tables in pool.imap_unordered(_solve_task, tasks):
+                for own, opp, packed in tables:
+                    write_table(directory, own, opp, packed)
+                    progress(f"{table_name(own, opp)}: {table_size(own, opp)} позиций, "
+                             f"{_summary(packed, table_size(own, opp))}")
+            if pending:
+                progress(f"{pieces} фигуры: {time.perf_counter() - start:.1f} с")
+
+
+def _solve_task(task: Tuple[Tuple[int, int], str]) -> List[Tuple[int, int, bytes]]:
+    return _solve(*task)
+
+
+def _summary(packed: bytes, count: int) -> str:
+    totals = [0, 0, 0, 0]
+    for byte in packed:
+        for shift in (0, 2, 4, 6):
+            totals[byte >> shift & 3] += 1
+    # Хвост последнего байта - нули, то есть ничьи
+    totals[WDL_DRAW] -= len(packed) * 4 - count
+    return f"выигрыш {totals[WDL_WIN]}, проигрыш {totals[WDL_LOSS]}, ничья {totals[WDL_DRAW]}"
+
+
+def random_position(rng: random.Random, own: int, opp: int) -> Position:
+    """Случайная позиция из одних дамок; ходят белые"""
+    squares = rng.sample(range(NUM_SQUARES), own + opp)
+    white = sum(SQUARE_BITS[square] for square in squares[:own])
+    black = sum(SQUARE_BITS[square] for square in squares[own:])
+    return Position(white, black, white | black, True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Построение и чтение таблиц эндшпиля дамок")
+    parser.add_argument("--dir", default=DEFAULT_DIRECTORY, help="каталог таблиц")
+    parser.add_argument("--pieces", type=int, default=DEFAULT_MAX_PIECES, help="наибольшее число дамок")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="число процессов")
+    parser.add_argument("--probe", metavar="FEN", help="результат позиции по таблицам")
+    parser.add_argument("--bench", type=int, default=100000, help="число случайных запросов для замера")
+    args = parser.parse_args()
+
+    if args.probe:
+        with Tablebase(args.dir) as tablebase:
+            result = tablebase.probe(position_from_fen(args.probe))
+        names = {WDL_WIN: "выигрыш", WDL_LOSS: "проигрыш", WDL_DRAW: "ничья", None: "нет в таблицах"}
+        print(f"{args.probe}: {names[result]} для стороны, чей ход")
+        return
+
+    start = time.perf_counter()
+    generate(args.dir, args.pieces, args.workers)
+    print(f"Построено за {time.perf_counter() - start:.1f} с")
+
+    with Tablebase(args.dir) as tablebase:
+        if not tablebase.tables:
+            sys.exit(f"no tablebase files in {args.dir}")
+        size = sum(len(table) for table in tablebase.tables.values())
+        rng = random.Random(1)
+        keys = list(tablebase.tables)
+        positions = [random_position(rng, *rng.choice(keys)) for _ in range(args.bench)]
+        start = time.perf_counter()
+        for position in positions:
+            tablebase.probe(position)
+        elapsed = time.perf_counter() - start
+        print(f"Таблиц: {len(tablebase)}, размер: {size} байт; "
+              f"{args.bench / elapsed if elapsed else 0:.0f} запросов/с")
+
+
+if __name__ == "__main__":
+    main()
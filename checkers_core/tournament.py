@@ -0,0 +1,260 @@
+"""Турнир движков на пуле процессов: круговой или гаунтлет.
+
+Каждая партия - отдельная задача пула. Задачи раздаются по одной
+(imap_unordered с chunksize=1): освободившийся процесс сразу берет
+следующую партию, поэтому длинные партии не оставляют ядра без дела.
+Партии пары идут парами с одинаковым зерном и сменой цвета, так что
+обе стороны играют одно и то же случайное начало. Одинаковые движки в
+списке различаются номером места (alphabeta:3#1, alphabeta:3#2): у
+каждого свой объект Engine со своим поиском и таблицей транспозиций.
+
+    python -m checkers_core.tournament --engines random greedy alphabeta:3 --games 200 --workers 8
+    python -m checkers_core.tournament --mode gauntlet --engines alphabeta:4 alphabeta:3 greedy --games 100
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from checkers_core.book import OpeningBook
+from checkers_core.records import RESULT_DRAW, RESULT_WHITE_WIN, GameRecord
+from checkers_core.selfplay import (
+    DEFAULT_MAX_PLIES,
+    DEFAULT_NO_PROGRESS_PLIES,
+    FORMAT_JSONL,
+    OUTPUT_FORMATS,
+    BookEngine,
+    Engine,
+    create_engine,
+    open_writer,
+    play_game,
+)
+
+MODE_ROUND_ROBIN = "round-robin"
+MODE_GAUNTLET = "gauntlet"
+DEFAULT_OPENING_PLIES = 6
+# Квантиль нормального распределения для 95% доверительного интервала
+CONFIDENCE_Z = 1.96
+# Разделитель имени движка и номера места для одинаковых движков
+SEAT_SEPARATOR = "#"
+
+# Движки и книги процесса пула: создаются один раз на процесс
+_engines: Dict[Tuple[str, Optional[str]], Engine] = {}
+_books: Dict[str, OpeningBook] = {}
+
+
+def _engine(name: str, book_path: Optional[str] = None) -> Engine:
+    """Движок участника name (описание движка, возможно с номером места)"""
+    engine = _engines.get((name, book_path))
+    if engine is None:
+        engine = create_engine(name.partition(SEAT_SEPARATOR)[0])
+        if book_path:
+            book = _books.get(book_path)
+            if book is None:
+                book = _books[book_path] = OpeningBook(book_path)
+            engine = BookEngine(engine, book)
+        _engines[(name, book_path)] = engine
+    return engine
+
+
+def _play_task(task: Tuple[int, int, str, str, int, int, int, int, Optional[str]]) -> Tuple[int, int, GameRecord]:
+    pair, number, white, black, seed, max_plies, no_progress, opening_plies, book = task
+    record = play_game(_engine(white, book), _engine(black, book), seed, max_plies, no_progress, opening_plies)
+    return pair, number, record
+
+
+def pairings(engines: List[str], mode: str) -> List[Tuple[str, str]]:
+    """Пары движков: все со всеми или первый против остальных"""
+    if mode == MODE_ROUND_ROBIN:
+        return [(engines[i], engines[j]) for i in range(len(engines)) for j in range(i + 1, len(engines))]
+    if mode == MODE_GAUNTLET:
+        return [(engines[0], opponent) for opponent in engines[1:]]
+    raise ValueError(f"unknown tournament mode {mode!r}")
+
+
+def elo_difference(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """Разница Эло по результату и половина ширины 95% интервала"""
+    games = wins + draws + losses
+    if not games:
+        return 0.0, math.inf
+    score = (wins + draws / 2) / games
+    if score in (0, 1):
+        return _elo(score), math.inf
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = CONFIDENCE_Z * math.sqrt(variance / games)
+    low = _elo(score - margin)
+    high = _elo(score + margin)
+    return _elo(score), (high - low) / 2
+
+
+def _elo(score: float) -> float:
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+class PairingResult:
+    """Счет пары с точки зрения первого движка"""
+
+    def __init__(self, first: str, second: str):
+        self.first = first
+        self.second = second
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def add(self, record: GameRecord, first_is_white: bool):
+        """Учет партии; цвет первого движка известен по номеру партии, а не по имени в записи"""
+        if record.result == RESULT_DRAW:
+            self.draws += 1
+        elif (record.result == RESULT_WHITE_WIN) == first_is_white:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def __str__(self):
+        elo, margin = elo_difference(self.wins, self.draws, self.losses)
+        return (f"{self.first:>14} - {self.second:<14} +{self.wins} ={self.draws} -{self.losses}  "
+                f"Эло {elo:+.0f} ± {margin:.0f}")
+
+
+class Tournament:
+    """Партии всех пар на пуле процессов; результаты приходят по мере готовности"""
+
+    def __init__(self, engines: List[str], mode: str = MODE_ROUND_ROBIN, games: int = 100,
+                 workers: Optional[int] = None, seed: int = 1, opening_plies: int = DEFAULT_OPENING_PLIES,
+                 max_plies: int = DEFAULT_MAX_PLIES, no_progress_plies: int = DEFAULT_NO_PROGRESS_PLIES,
+                 book: Optional[str] = None):
+        # Ошибка в описании движка - до запуска пула; описания приводятся к именам
+        # движков, чтобы ab:2 и alphabeta:2 считались одним движком в таблице
+        engines = [create_engine(spec).name for spec in engines]
+        # Повторы получают номер места: отдельный движок и отдельная строка таблицы
+        engines = [f"{name}{SEAT_SEPARATOR}{seat + 1}" if engines.count(name) > 1 else name
+                   for seat, name in enumerate(engines)]
+        self.pairs = pairings(engines, mode)
+        self.results = [PairingResult(first, second) for first, second in self.pairs]
+        self.games = games
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.opening_plies = opening_plies
+        self.max_plies = max_plies
+        self.no_progress_plies = no_progress_plies
+        # Путь к дебютной книге: каждый процесс пула открывает ее сам через mmap,
+        # поэтому испорченная книга проверяется здесь, до запуска пула
+        if book:
+            OpeningBook(book).close()
+        self.book = book
+        self.elapsed = 0.0
+
+    def tasks(self):
+        """Партии пар; партии 2k и 2k+1 - одно начало с переменой цветов"""
+        for pair, (first, second) in enumerate(self.pairs):
+            for number in range(self.games):
+                seed = self.seed + pair * self.games + number // 2 * 2
+                white, black = (first, second) if number % 2 == 0 else (second, first)
+                yield (pair, number, white, black, seed,
+                       self.max_plies, self.no_progress_plies, self.opening_plies, self.book)
+
+    def run(self, writer=None, progress=None):
+        """Проведение турнира; writer - приемник партий (selfplay.open_writer),
+        progress(сыграно, всего) - ход турнира"""
+        total = len(self.pairs) * self.games
+        played = 0
+        start = time.perf_counter()
+        with multiprocessing.get_context().Pool(self.workers) as pool:
+            for pair, number, record in pool.imap_unordered(_play_task, self.tasks(), chunksize=1):
+                # Четные партии пары первый движок играет белыми (см. tasks)
+                self.results[pair].add(record, number % 2 == 0)
+                if writer is not None:
+                    writer.write(record)
+                played += 1
+                if progress:
+                    progress(played, total)
+        self.elapsed = time.perf_counter() - start
+        return self.results
+
+    def standings(self) -> List[Tuple[str, int, int, int]]:
+        """Сумма побед, ничьих и поражений каждого движка, по набранным очкам"""
+        totals: Dict[str, List[int]] = {}
+        for result in self.results:
+            first = totals.setdefault(result.first, [0, 0, 0])
+            second = totals.setdefault(result.second, [0, 0, 0])
+            first[0] += result.wins
+            first[1] += result.draws
+            first[2] += result.losses
+            second[0] += result.losses
+            second[1] += result.draws
+            second[2] += result.wins
+        table = [(name, wins, draws, losses) for name, (wins, draws, losses) in totals.items()]
+        table.sort(key=lambda row: row[1] + row[2] / 2, reverse=True)
+        return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Турнир движков шашек на пуле процессов")
+    parser.add_argument("--engines", nargs="+", default=["random", "greedy", "alphabeta:3"],
+                        help="движки: random, greedy, alphabeta:D")
+    parser.add_argument("--mode", choices=(MODE_ROUND_ROBIN, MODE_GAUNTLET), default=MODE_ROUND_ROBIN,
+                        help="круговой турнир или первый движок против остальных")
+    parser.add_argument("--games", type=int, default=100, help="число партий в каждой паре")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="число процессов")
+    parser.add_argument("--seed", type=int, default=1, help="зерно турнира")
+    parser.add_argument("--opening-plies", type=int, default=DEFAULT_OPENING_PLIES,
+                        help="число случайных полуходов в начале партии")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES,
+                        help="ничья после стольких полуходов")
+    parser.add_argument("--no-progress", type=int, default=DEFAULT_NO_PROGRESS_PLIES,
+                        help="ничья после стольких полуходов без взятий и ходов простыми")
+    parser.add_argument("-o", "--output", help="файл для партий")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=FORMAT_JSONL,
+                        help="JSON Lines, двоичный архив (checkers_core.records) или PDN")
+    parser.add_argument("--book", help="дебютная книга для всех движков")
+    args = parser.parse_args()
+
+    if len(args.engines) < 2:
+        parser.error("tournament needs at least two engines")
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    try:
+        tournament = Tournament(args.engines, args.mode, args.games, args.workers, args.seed,
+                                args.opening_plies, args.max_plies, args.no_progress, args.book)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    def progress(played: int, total: int):
+        if played == total or played % max(1, total // 10) == 0:
+            print(f"Сыграно {played}/{total}", file=sys.stderr)
+
+    try:
+        writer = open_writer(args.output, args.format) if args.output else None
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    try:
+        results = tournament.run(writer, progress)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    for result in results:
+        print(result)
+    print()
+    for name, wins, draws, losses in tournament.standings():
+        games = wins + draws + losses
+        print(f"{name:>14}  +{wins} ={draws} -{losses}  {100 * (wins + draws / 2) / games:.1f}%")
+    total = len(results) * args.games
+    rate = total / tournament.elapsed if tournament.elapsed else 0.0
+    print(f"\nПартий: {total} за {tournament.elapsed:.1f} с, {rate:.1f} партий/с, процессов: {tournament.workers}")
+
+
+if __name__ == "__main__":
+    main()
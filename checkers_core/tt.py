@@ -0,0 +1,162 @@
+"""Таблица транспозиций фиксированного размера.
+
+Таблица - один заранее выделенный буфер 64-битных слов. Каждая корзина
+хранит две записи: первая заменяется только более глубоким (или устаревшим)
+результатом, вторая заменяется всегда. Запись занимает три слова:
+ключ, упакованные данные (оценка, глубина, тип границы, поколение) и ход.
+
+Буфер можно передать снаружи (например, multiprocessing.shared_memory),
+тогда таблицу без блокировок делят несколько процессов. Вместо ключа
+хранится key ^ data ^ move, поэтому запись, разорванная одновременной
+записью из двух процессов, просто не пройдет проверку при чтении.
+"""
+
+import sys
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+BOUND_NONE = 0
+BOUND_EXACT = 1
+BOUND_LOWER = 2
+BOUND_UPPER = 3
+
+ENTRY_WORDS = 3
+BUCKET_ENTRIES = 2
+BUCKET_WORDS = ENTRY_WORDS * BUCKET_ENTRIES
+BUCKET_BYTES = BUCKET_WORDS * 8
+
+DEFAULT_SIZE_MB = 16
+
+# Упаковка данных записи
+SCORE_OFFSET = 1 << 21
+SCORE_MASK = (1 << 22) - 1
+DEPTH_SHIFT = 22
+DEPTH_MASK = 0xFF
+BOUND_SHIFT = 30
+GENERATION_SHIFT = 32
+GENERATION_MASK = 0xFF
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    bound: int
+    score: int
+    move: int
+
+
+def buckets_for_size(size_mb: float) -> int:
+    """Число корзин (степень двойки), помещающихся в size_mb мегабайт"""
+    buckets = max(1, int(size_mb * 1024 * 1024) // BUCKET_BYTES)
+    return 1 << (buckets.bit_length() - 1)
+
+
+def table_bytes(size_mb: float) -> int:
+    """Точный размер буфера таблицы в байтах"""
+    return buckets_for_size(size_mb) * BUCKET_BYTES
+
+
+class TranspositionTable:
+    """Таблица транспозиций с ограничением памяти в мегабайтах"""
+
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB, buffer=None):
+        self.size_mb = size_mb
+        self.bucket_count = buckets_for_size(size_mb)
+        self.bucket_mask = self.bucket_count - 1
+        self.nbytes = table_bytes(size_mb)
+        if buffer is None:
+            buffer = bytearray(self.nbytes)
+        elif len(buffer) < self.nbytes:
+            raise ValueError(f"buffer of {len(buffer)} bytes is too small, need {self.nbytes}")
+        self._view = memoryview(buffer)[:self.nbytes]
+        self.table = self._view.cast("Q")
+        self.generation = 0
+
+    def release(self):
+        """Освобождение ссылок на внешний буфер (нужно до закрытия shared_memory)"""
+        self.table.release()
+        self._view.release()
+
+    def new_search(self):
+        """Новое поколение: старые записи вытесняются в первую очередь"""
+        self.generation = (self.generation + 1) & GENERATION_MASK
+
+    def clear(self):
+        self._view[:] = bytes(self.nbytes)
+        self.generation = 0
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        table = self.table
+        base = (key & self.bucket_mask) * BUCKET_WORDS
+        for slot in (base, base + ENTRY_WORDS):
+            data = table[slot + 1]
+            move = table[slot + 2]
+            if data and table[slot] ^ data ^ move == key:
+                return TTEntry((data >> DEPTH_SHIFT) & DEPTH_MASK,
+                               (data >> BOUND_SHIFT) & 3,
+                               (data & SCORE_MASK) - SCORE_OFFSET,
+                               move)
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: int):
+        table = self.table
+        base = (key & self.bucket_mask) * BUCKET_WORDS
+        data = ((score + SCORE_OFFSET) | (min(depth, DEPTH_MASK) << DEPTH_SHIFT) |
+                (bound << BOUND_SHIFT) | (self.generation << GENERATION_SHIFT))
+
+        # Запись с большей глубиной (или из старого поиска) идет в первый слот
+        stored = table[base + 1]
+        stored_move = table[base + 2]
+        stored_depth = (stored >> DEPTH_SHIFT) & DEPTH_MASK
+        stored_generation = (stored >> GENERATION_SHIFT) & GENERATION_MASK
+        if (not stored or table[base] ^ stored ^ stored_move == key or depth >= stored_depth or
+                stored_generation != self.generation):
+            slot = base
+        else:
+            slot = base + ENTRY_WORDS
+            stored = table[slot + 1]
+            stored_move = table[slot + 2]
+
+        # Лучший ход сохраняем, даже если новая запись его не знает
+        if not move and stored and table[slot] ^ stored ^ stored_move == key:
+            move = stored_move
+        table[slot] = key ^ data ^ move
+        table[slot + 1] = data
+        table[slot + 2] = move
+
+    def hashfull(self) -> int:
+        """Заполненность в промилле по первой тысяче корзин"""
+        sample = min(self.bucket_count, 1000)
+        used = sum(1 for bucket in range(sample)
+                   for slot in range(BUCKET_ENTRIES)
+                   if self.table[bucket * BUCKET_WORDS + slot * ENTRY_WORDS + 1])
+        return used * 1000 // (sample * BUCKET_ENTRIES)
+
+
+def create_shared_table(size_mb: float = DEFAULT_SIZE_MB) -> Tuple[TranspositionTable, "SharedMemory"]:
+    """Таблица в новом сегменте общей памяти; сегмент закрывает и удаляет создатель"""
+    # multiprocessing импортируется лениво: ядру правил он не нужен
+    from multiprocessing import shared_memory
+
+    segment = shared_memory.SharedMemory(create=True, size=table_bytes(size_mb))
+    return TranspositionTable(size_mb, segment.buf), segment
+
+
+def attach_shared_table(name: str, size_mb: float) -> Tuple[TranspositionTable, "SharedMemory"]:
+    """Подключение к таблице, созданной другим процессом"""
+    from multiprocessing import shared_memory
+
+    # С Python 3.13 чужой сегмент можно не регистрировать в resource_tracker
+    if sys.version_info >= (3, 13):
+        segment = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        segment = shared_memory.SharedMemory(name=name)
+    return TranspositionTable(size_mb, segment.buf), segment
+
+
+def close_shared_table(tt: TranspositionTable, segment: "SharedMemory", unlink: bool = True):
+    tt.release()
+    segment.close()
+    if unlink:
+        segment.unlink()
@@ -0,0 +1,10 @@
+"""Коды результата таблиц эндшпиля для стороны, чей ход.
+
+Их пишет в файлы и возвращает из probe checkers_core.tablebase, а поиск и
+Game только разбирают. Коды вынесены сюда, чтобы формат таблиц не зависел
+от модуля поиска, а поиск и Game не импортировали tablebase.
+"""
+
+WDL_DRAW = 0
+WDL_WIN = 1
+WDL_LOSS = 2
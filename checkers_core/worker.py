@@ -0,0 +1,175 @@
+"""Поиск хода в фоновом процессе.
+
+Игровой цикл arcade однопоточный, поэтому поиск внутри on_update
+останавливал бы анимацию и ввод. SearchWorker запускает поиск в отдельном
+процессе и возвращает отменяемый Future, а последний промежуточный
+результат (глубина, оценка, главный вариант) пишет в слот общей памяти,
+который окно читает без блокировки. Слот - массив RawArray без замка,
+защищенный счетчиком версий (seqlock): нечетный счетчик - запись идет,
+счетчик изменился за время чтения - чтение повторяется на следующем
+кадре. Очередь multiprocessing.Queue для этого не годится: она берет
+замок и держит поток-передатчик. Таблица транспозиций лежит в общей
+памяти, так что ее результаты видны и основному процессу. Таблицы
+эндшпиля процесс открывает сам через mmap.
+"""
+
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from checkers_core.position import Position
+from checkers_core.search import MAX_PLY, Searcher, SearchResult
+from checkers_core.tablebase import Tablebase
+from checkers_core.tt import (
+    DEFAULT_SIZE_MB,
+    attach_shared_table,
+    close_shared_table,
+    create_shared_table,
+)
+
+# Слот промежуточного результата: счетчик версий, номер поиска, поля
+# SearchResult (время в микросекундах), длина главного варианта и сам вариант
+PROGRESS_VERSION = 0
+PROGRESS_SEARCH_ID = 1
+PROGRESS_MOVE = 2
+PROGRESS_SCORE = 3
+PROGRESS_DEPTH = 4
+PROGRESS_NODES = 5
+PROGRESS_ELAPSED_US = 6
+PROGRESS_PV_LENGTH = 7
+PROGRESS_PV = 8
+PROGRESS_SIZE = PROGRESS_PV + MAX_PLY
+
+# Состояние процесса-исполнителя
+_searcher: Optional[Searcher] = None
+_shared_memory = None
+_progress_slot = None
+_active_search = None
+
+
+def _init_worker(progress_slot, active_search, shm_name: str, tt_size_mb: float,
+                 tablebase_dir: Optional[str]):
+    global _searcher, _shared_memory, _progress_slot, _active_search
+    tt, _shared_memory = attach_shared_table(shm_name, tt_size_mb)
+    tablebase = Tablebase(tablebase_dir) if tablebase_dir else None
+    _searcher = Searcher(tt=tt, tablebase=tablebase)
+    _progress_slot = progress_slot
+    _active_search = active_search
+
+
+def write_progress(slot, search_id: int, result: SearchResult):
+    """Запись результата в слот; единственный писатель - процесс-исполнитель"""
+    pv = result.pv[:MAX_PLY]
+    slot[PROGRESS_VERSION] += 1  # Нечетный счетчик: запись идет
+    slot[PROGRESS_SEARCH_ID] = search_id
+    slot[PROGRESS_MOVE] = result.move
+    slot[PROGRESS_SCORE] = result.score
+    slot[PROGRESS_DEPTH] = result.depth
+    slot[PROGRESS_NODES] = result.nodes
+    slot[PROGRESS_ELAPSED_US] = int(result.elapsed * 1_000_000)
+    slot[PROGRESS_PV_LENGTH] = len(pv)
+    slot[PROGRESS_PV:PROGRESS_PV + len(pv)] = pv
+    slot[PROGRESS_VERSION] += 1
+
+
+def read_progress(slot) -> Optional[Tuple[int, int, SearchResult]]:
+    """(версия, номер поиска, результат) из слота; None - слот пуст или пишется"""
+    version = slot[PROGRESS_VERSION]
+    if not version or version % 2:
+        return None
+    fields = slot[:PROGRESS_PV + MAX_PLY]
+    if slot[PROGRESS_VERSION] != version:
+        return None
+    pv_length = fields[PROGRESS_PV_LENGTH]
+    result = SearchResult(fields[PROGRESS_MOVE], fields[PROGRESS_SCORE], fields[PROGRESS_DEPTH],
+                          fields[PROGRESS_NODES], fields[PROGRESS_PV:PROGRESS_PV + pv_length],
+                          fields[PROGRESS_ELAPSED_US] / 1_000_000)
+    return version, fields[PROGRESS_SEARCH_ID], result
+
+
+def _search_task(search_id: int, packed_position: int, time_limit_ms: int, max_depth: int) -> SearchResult:
+    """Поиск в процессе-исполнителе; прерывается, когда активным становится другой поиск"""
+    def report(result: SearchResult):
+        write_progress(_progress_slot, search_id, result)
+
+    def should_stop() -> bool:
+        return _active_search.value != search_id
+
+    return _searcher.search(Position.unpack(packed_position), time_limit_ms, max_depth,
+                            on_iteration=report, should_stop=should_stop)
+
+
+class SearchWorker:
+    """Фоновый поиск с отменой и потоком промежуточных результатов"""
+
+    def __init__(self, tt_size_mb: float = DEFAULT_SIZE_MB, tablebase_dir: Optional[str] = None):
+        self.tt, self._shared_memory = create_shared_table(tt_size_mb)
+        context = multiprocessing.get_context()
+        # Слот промежуточного результата и номер активного поиска - без замков
+        self._progress = context.RawArray("q", PROGRESS_SIZE)
+        self._progress_version = 0
+        self._active_search = context.RawValue("q", 0)
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress, self._active_search, self._shared_memory.name, tt_size_mb,
+                      tablebase_dir),
+        )
+        self._future: Optional[Future] = None
+        self._search_id = 0
+        self.latest: Optional[SearchResult] = None
+
+    def start(self, position: Position, time_limit_ms: int, max_depth: int = MAX_PLY) -> Future:
+        """Запуск нового поиска; предыдущий, если он еще идет, отменяется"""
+        self.cancel()
+        self._search_id += 1
+        self._active_search.value = self._search_id
+        self.latest = None
+        self._future = self._executor.submit(
+            _search_task, self._search_id, position.pack(), time_limit_ms, max_depth
+        )
+        return self._future
+
+    def poll(self) -> List[SearchResult]:
+        """Последний промежуточный результат текущего поиска, если он новый (не блокирует).
+
+        Слот хранит только последнюю итерацию: итерации, завершенные между
+        двумя опросами, окну не нужны.
+        """
+        progress = read_progress(self._progress)
+        if progress is None:
+            return []
+        version, search_id, result = progress
+        if version == self._progress_version or search_id != self._search_id:
+            return []
+        self._progress_version = version
+        self.latest = result
+        return [result]
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def ready(self) -> bool:
+        """Результат текущего поиска готов"""
+        return self._future is not None and self._future.done()
+
+    def result(self) -> SearchResult:
+        """Результат готового поиска; после этого поиск считается завершенным"""
+        future = self._future
+        self._future = None
+        return future.result()
+
+    def cancel(self):
+        if self._future is None:
+            return
+        # Запущенный поиск остановится на ближайшей проверке времени
+        self._active_search.value = -1
+        self._future.cancel()
+        self._future = None
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        close_shared_table(self.tt, self._shared_memory)
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from checkers_core.book import ENTRY, HEADER, MAGIC, VERSION, OpeningBook
+from checkers_core.position import Position
+
+
+class OpeningBookFileTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "opening.book")
+
+    def assert_absent(self, data):
+        with open(self.path, "wb") as stream:
+            stream.write(data)
+        with OpeningBook(self.path) as book:
+            self.assertEqual(len(book), 0)
+            self.assertEqual(book.lookup(Position.initial()), [])
+
+    def test_empty_file_is_an_absent_book(self):
+        self.assert_absent(b"")
+
+    def test_truncated_file_is_an_absent_book(self):
+        header = HEADER.pack(MAGIC, VERSION, 2)
+        self.assert_absent(header[:5])
+        self.assert_absent(header + bytes(ENTRY.size + 3))
+
+    def test_wrong_magic_is_an_error(self):
+        with open(self.path, "wb") as stream:
+            stream.write(HEADER.pack(b"XXXX", VERSION, 0))
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
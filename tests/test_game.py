@@ -0,0 +1,30 @@
+import unittest
+
+from checkers_core.game import Game
+from checkers_core.movegen import move_path
+from checkers_core.notation import format_move, position_from_fen, square_from_number
+
+# Две цепочки взятий 18x9x2 и 18x11x2: общее начало и конец, разные шашки
+TWIN_CAPTURES_FEN = "W:W13,18,22,29:B3,4,6,7,12,14,15,20,28"
+
+
+class FindMoveTest(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(position_from_fen(TWIN_CAPTURES_FEN))
+        self.origin = square_from_number(18)
+        self.target = square_from_number(2)
+
+    def test_twin_captures_are_both_listed(self):
+        moves = self.game.moves_between(self.origin, self.target)
+        self.assertEqual(sorted(format_move(self.game.position, move) for move in moves),
+                         ["18x11x2", "18x9x2"])
+
+    def test_ambiguous_move_needs_a_landing_square(self):
+        self.assertIsNone(self.game.find_move(self.origin, self.target))
+        for landing in (9, 11):
+            move = self.game.find_move(self.origin, self.target, [square_from_number(landing)])
+            self.assertEqual(move_path(self.game.position, move)[1], square_from_number(landing))
+
+
+if __name__ == "__main__":
+    unittest.main()
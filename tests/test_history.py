@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from checkers_core.history import DEFAULT_CHECKPOINT_INTERVAL, GameHistory
+from checkers_core.movegen import generate_legal_moves
+from checkers_core.position import Position
+
+
+def random_moves(plies, seed=0):
+    rng = random.Random(seed)
+    position = Position.initial()
+    moves = []
+    for _ in range(plies):
+        legal = list(generate_legal_moves(position))
+        if not legal:
+            break
+        moves.append(rng.choice(legal))
+        position.make_move(moves[-1])
+    return moves
+
+
+def replay(moves):
+    position = Position.initial()
+    for move in moves:
+        position.make_move(move)
+    return position
+
+
+class GameHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.moves = random_moves(3 * DEFAULT_CHECKPOINT_INTERVAL + 5)
+        self.assertGreater(len(self.moves), 2 * DEFAULT_CHECKPOINT_INTERVAL)
+        self.history = GameHistory.from_moves(self.moves)
+
+    def test_position_at_around_checkpoint(self):
+        for ply in (DEFAULT_CHECKPOINT_INTERVAL - 1, DEFAULT_CHECKPOINT_INTERVAL,
+                    DEFAULT_CHECKPOINT_INTERVAL + 1, 0, len(self.moves)):
+            with self.subTest(ply=ply):
+                self.assertEqual(self.history.position_at(ply), replay(self.moves[:ply]))
+
+    def test_push_after_seek_drops_the_undone_line(self):
+        cut = DEFAULT_CHECKPOINT_INTERVAL + 3
+        position = self.history.seek(cut)
+        move = next(move for move in generate_legal_moves(position) if move != self.moves[cut])
+        position.make_move(move)
+        self.history.push(move, position)
+
+        line = self.moves[:cut] + [move]
+        self.assertEqual(self.history.moves, line)
+        self.assertEqual(self.history.ply, len(line))
+        # Контрольные точки после точки отсечения относились к старому продолжению
+        self.assertEqual(len(self.history.checkpoints), len(line) // DEFAULT_CHECKPOINT_INTERVAL + 1)
+        for ply in range(len(line) + 1):
+            self.assertEqual(self.history.position_at(ply), replay(line[:ply]))
+
+    def test_push_refills_checkpoint_after_cut(self):
+        cut = DEFAULT_CHECKPOINT_INTERVAL - 1
+        position = self.history.seek(cut)
+        move = next(move for move in generate_legal_moves(position) if move != self.moves[cut])
+        position.make_move(move)
+        self.history.push(move, position)
+
+        self.assertEqual(len(self.history.checkpoints), 2)
+        self.assertEqual(self.history.position_at(DEFAULT_CHECKPOINT_INTERVAL),
+                         replay(self.moves[:cut] + [move]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import unittest
+
+from checkers_core.notation import position_to_fen
+from checkers_core.pdn import STANDARD_START_FEN, PdnReader, format_game
+from checkers_core.position import Position
+from checkers_core.records import RESULT_UNFINISHED, RESULT_WHITE_WIN, GameRecord, decode_game, encode_game
+
+# Партия в стандартной записи английских шашек: первыми ходят черные, тегов FEN и GameType нет
+STANDARD_GAME = """[Event "Old Fourteenth"]
+[White "Wyllie, J."]
+[Black "Martins, R."]
+[Result "1/2-1/2"]
+
+1. 11-15 23-19 2. 8-11 22-17 3. 4-8 17-13 4. 15-18 24-20 5. 11-15 28-24
+6. 8-11 26-23 7. 9-14 31-26 8. 6-9 13x6 9. 2x9 26-22 {comment} 10. 1-6 1/2-1/2
+"""
+
+
+def read(text, strict=True):
+    return list(PdnReader(io.StringIO(text), strict))
+
+
+class StandardPdnTest(unittest.TestCase):
+    def test_standard_game_starts_with_black(self):
+        game, = read(STANDARD_GAME)
+        self.assertEqual(len(game.moves), 19)
+        self.assertFalse(game.start_position().white_to_move)
+
+    def test_standard_game_round_trip(self):
+        game, = read(STANDARD_GAME)
+        text = format_game(game.to_record())
+        self.assertIn('[GameType "21"]', text)
+        self.assertIn(f'[FEN "{STANDARD_START_FEN}"]', text)
+        self.assertIn("1. 11-15 23-19 2. 8-11", text)
+        again, = read(text)
+        self.assertEqual(again.moves, game.moves)
+        self.assertEqual(again.start, game.start)
+        self.assertEqual(again.result, game.result)
+
+    def test_export_names_the_white_first_start(self):
+        position = Position.initial()
+        record = GameRecord("a", "b", 7, [], RESULT_WHITE_WIN, "")
+        text = format_game(record)
+        self.assertIn(f'[FEN "{position_to_fen(position)}"]', text)
+        self.assertIn('[GameType "21"]', text)
+        self.assertIsNone(read(text)[0].start)
+
+    def test_untagged_white_first_game_still_reads(self):
+        game, = read('[Result "1-0"]\n\n1. 22-18 11-15 1-0\n')
+        self.assertIsNone(game.start)
+        self.assertEqual(len(game.moves), 2)
+
+    def test_other_game_types_are_rejected(self):
+        self.assertEqual(read('[GameType "20"]\n\n1. 32-28 *\n', strict=False), [])
+
+
+class UnfinishedGameTest(unittest.TestCase):
+    def test_unfinished_result_survives_the_archive(self):
+        game, = read("1. 22-18 *\n")
+        self.assertEqual(game.result, RESULT_UNFINISHED)
+        record = decode_game(encode_game(game.to_record()))
+        self.assertEqual(record.result, RESULT_UNFINISHED)
+        self.assertEqual(record.moves, game.moves)
+
+
+if __name__ == "__main__":
+    unittest.main()
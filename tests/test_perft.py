@@ -0,0 +1,25 @@
+import unittest
+
+from checkers_core.notation import position_from_fen
+from checkers_core.perft import REFERENCE_POSITIONS, Perft
+
+# Глубже эталоны проверяет python -m checkers_core.perft --verify
+MAX_DEPTH = 6
+
+
+class PerftTest(unittest.TestCase):
+    def test_reference_positions(self):
+        counter = Perft()
+        for fen, expected in REFERENCE_POSITIONS:
+            position = position_from_fen(fen)
+            for depth, nodes in sorted(expected.items()):
+                if depth > MAX_DEPTH:
+                    continue
+                with self.subTest(fen=fen, depth=depth):
+                    self.assertEqual(counter.count(position, depth), nodes)
+            # Ход и возврат хода не должны менять позицию
+            self.assertEqual(position, position_from_fen(fen))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from checkers_core.records import REASON_UNKNOWN, RESULT_DRAW, GameArchive, GameRecord, GameWriter, index_path
+from checkers_core.selfplay import GreedyEngine, RandomEngine, play_game
+
+
+def sample_games(count):
+    return [play_game(RandomEngine(), GreedyEngine(), seed) for seed in range(count)]
+
+
+class GameArchiveIndexTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "games.ckg")
+        self.games = sample_games(6)
+
+    def write(self, games):
+        with GameWriter(self.path) as writer:
+            return [writer.write(record) for record in games]
+
+    def assert_archive(self, games):
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), len(games))
+            for number, record in enumerate(games):
+                self.assertEqual(archive[number], record)
+
+    def test_append_without_index(self):
+        self.write(self.games[:3])
+        os.remove(index_path(self.path))
+        self.assertEqual(self.write(self.games[3:]), [3, 4, 5])
+        self.assert_archive(self.games)
+
+    def test_append_with_stale_index(self):
+        self.write(self.games[:3])
+        with open(index_path(self.path), "r+b") as stream:
+            stream.truncate(8)
+        self.assertEqual(self.write(self.games[3:]), [3, 4, 5])
+        self.assert_archive(self.games)
+
+    def test_index_entry_without_frame(self):
+        # Сбой между записью смещения и кадра: в индексе лишнее смещение
+        self.write(self.games[:3])
+        with open(index_path(self.path), "ab") as stream:
+            stream.write(os.path.getsize(self.path).to_bytes(8, "little"))
+        self.assert_archive(self.games[:3])
+
+    def test_short_frame_reads_only_itself(self):
+        short = GameRecord("", "", 0, [], RESULT_DRAW, REASON_UNKNOWN)
+        self.write([short] + self.games)
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive[0], short)
+            # Кадр короче префикса в 10 байт: дальше следующего кадра читать нельзя
+            self.assertLessEqual(archive._file.tell(), archive.offsets[1] + 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from checkers_core.records import RESULT_BLACK_WIN, RESULT_WHITE_WIN, GameRecord
+from checkers_core.tournament import PairingResult, Tournament, _engine
+
+
+class PairingResultTest(unittest.TestCase):
+    def test_score_by_colour_not_by_name(self):
+        result = PairingResult("alphabeta:2", "random")
+        # Имя в записи не совпадает с описанием пары - счет идет по цвету
+        result.add(GameRecord("ab:2", "random", 1, [], RESULT_WHITE_WIN, ""), True)
+        result.add(GameRecord("random", "ab:2", 1, [], RESULT_BLACK_WIN, ""), False)
+        self.assertEqual((result.wins, result.draws, result.losses), (2, 0, 0))
+
+
+class TournamentTest(unittest.TestCase):
+    def test_engine_aliases_are_canonical(self):
+        tournament = Tournament(["AB:2", " random"], games=4, workers=1, opening_plies=0)
+        self.assertEqual(tournament.pairs, [("alphabeta:2", "random")])
+        result, = tournament.run()
+        self.assertEqual((result.wins, result.draws, result.losses), (4, 0, 0))
+        self.assertEqual(tournament.standings()[0], ("alphabeta:2", 4, 0, 0))
+
+    def test_identical_engines_get_separate_seats(self):
+        tournament = Tournament(["ab:1", "alphabeta:1"], games=2, workers=1, opening_plies=0)
+        self.assertEqual(tournament.pairs, [("alphabeta:1#1", "alphabeta:1#2")])
+        self.assertIsNot(_engine("alphabeta:1#1"), _engine("alphabeta:1#2"))
+        tournament.run()
+        self.assertEqual(sorted(row[0] for row in tournament.standings()), ["alphabeta:1#1", "alphabeta:1#2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
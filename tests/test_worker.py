@@ -0,0 +1,45 @@
+import multiprocessing
+import time
+import unittest
+
+from checkers_core.position import Position
+from checkers_core.search import SearchResult
+from checkers_core.worker import PROGRESS_SIZE, PROGRESS_VERSION, SearchWorker, read_progress, write_progress
+
+
+class ProgressSlotTest(unittest.TestCase):
+    def setUp(self):
+        self.slot = multiprocessing.RawArray("q", PROGRESS_SIZE)
+
+    def test_round_trip(self):
+        self.assertIsNone(read_progress(self.slot))
+        result = SearchResult(move=1234, score=-56, depth=7, nodes=89012, pv=[1234, 5, 6], elapsed=0.25)
+        write_progress(self.slot, 3, result)
+        self.assertEqual(read_progress(self.slot), (2, 3, result))
+
+    def test_slot_being_written_is_skipped(self):
+        write_progress(self.slot, 1, SearchResult(1, 0, 1, 1, [1], 0.0))
+        self.slot[PROGRESS_VERSION] += 1
+        self.assertIsNone(read_progress(self.slot))
+
+
+class SearchWorkerTest(unittest.TestCase):
+    def test_progress_and_result(self):
+        worker = SearchWorker(tt_size_mb=1)
+        self.addCleanup(worker.shutdown)
+        worker.start(Position.initial(), time_limit_ms=10_000, max_depth=4)
+        deadline = time.monotonic() + 30
+        while not worker.ready() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(worker.ready())
+        result = worker.result()
+        progress = worker.poll()
+        self.assertEqual(worker.latest.depth, result.depth)
+        self.assertEqual(worker.latest.move, result.move)
+        # Повторный опрос без новой итерации ничего не возвращает
+        self.assertTrue(progress)
+        self.assertEqual(worker.poll(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()